@@ -0,0 +1,204 @@
+# assets.py — subresource page weight: size a page's stylesheets, scripts and images
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urldefrag, urlparse
+import os
+import threading
+import time
+
+from ..cache import TTLCache, SingleFlight
+from .engine import _get_client, STREAM_CHUNK_BYTES
+
+ASSET_WORKERS          = int(os.getenv("ASSET_WORKERS", "32"))
+ASSET_PER_HOST         = int(os.getenv("ASSET_PER_HOST", "6"))
+ASSET_BUDGET_S         = float(os.getenv("ASSET_BUDGET_S", "15"))
+ASSET_MAX_BYTES        = int(os.getenv("ASSET_MAX_BYTES", str(20 * 1024 * 1024)))
+ASSET_TOP_N            = 5
+ASSET_KINDS            = ("css", "js", "img")
+
+# Shared across audits: CDN assets (jQuery, Google Fonts, ...) recur on thousands of sites
+ASSET_CACHE_SIZE       = int(os.getenv("ASSET_CACHE_SIZE", "50000"))
+ASSET_CACHE_TTL_S      = float(os.getenv("ASSET_CACHE_TTL_S", "86400"))
+ASSET_CACHE_FAIL_TTL_S = float(os.getenv("ASSET_CACHE_FAIL_TTL_S", "300"))
+
+_asset_pool = ThreadPoolExecutor(max_workers=ASSET_WORKERS, thread_name_prefix="audit-asset")
+_asset_cache = TTLCache(maxsize=ASSET_CACHE_SIZE, ttl=ASSET_CACHE_TTL_S)
+_in_flight = SingleFlight()
+
+# In-flight probes per host across all audits. Entries are dropped when they
+# reach zero; the TTL only bounds an entry whose release was somehow missed.
+_host_busy = TTLCache(maxsize=10000, ttl=300)
+_host_busy_lock = threading.Lock()
+_HOST_RETRY_S = 0.05
+
+
+# ----------------------------
+# Per-host slots
+# ----------------------------
+
+def _try_acquire(host: str) -> bool:
+    """Take one of the host's ASSET_PER_HOST slots without waiting."""
+    with _host_busy_lock:
+        busy = _host_busy.get(host, 0)
+        if busy >= ASSET_PER_HOST:
+            return False
+        _host_busy.set(host, busy + 1)
+        return True
+
+
+def _release(host: str) -> None:
+    with _host_busy_lock:
+        busy = _host_busy.get(host, 0) - 1
+        if busy > 0:
+            _host_busy.set(host, busy)
+        else:
+            _host_busy.pop(host)
+
+
+def _sized_on_slot(url: str, host: str) -> Tuple[Optional[int], str]:
+    try:
+        return asset_size(url)
+    finally:
+        _release(host)
+
+
+# ----------------------------
+# Sizing one asset
+# ----------------------------
+
+def _content_length(headers) -> Optional[int]:
+    value = headers.get("content-length", "")
+    return int(value) if value.isdigit() and int(value) > 0 else None
+
+
+def _probe_asset(url: str) -> Tuple[Optional[int], str]:
+    """
+    Transfer size of one asset: HEAD's Content-Length, else the total from a
+    one-byte ranged GET's Content-Range, else the streamed body is counted
+    (up to ASSET_MAX_BYTES). Returns (bytes or None when unreachable, content_type).
+    """
+    client = _get_client()
+    try:
+        resp = client.head(url)
+        if resp.status_code < 400 and _content_length(resp.headers):
+            return _content_length(resp.headers), resp.headers.get("content-type", "")
+        with client.stream("GET", url, headers={"Range": "bytes=0-0"}) as resp:
+            ctype = resp.headers.get("content-type", "")
+            if resp.status_code >= 400:
+                return None, ctype
+            if resp.status_code == 206:
+                total = resp.headers.get("content-range", "").rpartition("/")[2]
+                if total.isdigit():
+                    return int(total), ctype
+            elif _content_length(resp.headers):
+                return _content_length(resp.headers), ctype
+            for _ in resp.iter_raw(STREAM_CHUNK_BYTES):
+                if resp.num_bytes_downloaded >= ASSET_MAX_BYTES:
+                    break
+            return resp.num_bytes_downloaded, ctype
+    except Exception:
+        return None, ""
+
+
+def _probe_and_store(url: str) -> Tuple[Optional[int], str]:
+    size, ctype = _probe_asset(url)
+    _asset_cache.set(url, (size, ctype), ttl=ASSET_CACHE_FAIL_TTL_S if size is None else None)
+    return size, ctype
+
+
+def asset_size(url: str) -> Tuple[Optional[int], str]:
+    """_probe_asset() behind the shared per-URL cache; concurrent audits share one probe."""
+    hit = _asset_cache.get(url)
+    if hit is not None:
+        return hit
+    return _in_flight.do(url, _probe_and_store, url)
+
+
+def cache_stats() -> Dict[str, int]:
+    stats = _asset_cache.stats()
+    stats["coalesced"] = _in_flight.coalesced
+    return stats
+
+
+# ----------------------------
+# Page weight
+# ----------------------------
+
+def _kb(n: int) -> str:
+    return f"{n / 1024:.0f} KB" if n >= 1024 else f"{n} B"
+
+
+def analyze_assets(page_url: str, assets: List[Tuple[str, str]], html_bytes: int = 0) -> Dict[str, Any]:
+    """
+    Size the (kind, url) assets PageAnalyzer collected on the shared pool,
+    within ASSET_BUDGET_S. At most ASSET_PER_HOST probes per host run at
+    once across all audits; that limit is applied before submitting, so URLs
+    of a busy host wait in this audit's queue instead of holding pool threads.
+    Returns page-weight metrics: asset bytes per kind and in total, the page
+    weight including the HTML transfer, and the ASSET_TOP_N largest assets.
+    """
+    kinds: Dict[str, str] = {}
+    for kind, href in assets:
+        url = urldefrag(urljoin(page_url, href.strip()))[0]
+        if url.startswith(("http://", "https://")) and url not in kinds:
+            kinds[url] = kind
+
+    start = time.perf_counter()
+    by_kind = {k: 0 for k in ASSET_KINDS}
+    sized: List[Tuple[int, str, str]] = []
+
+    def record(url: str, size: Optional[int]) -> None:
+        if size is not None:
+            by_kind[kinds[url]] += size
+            sized.append((size, kinds[url], url))
+
+    queues: Dict[str, Deque[str]] = {}
+    for url in kinds:
+        hit = _asset_cache.get(url)
+        if hit is not None:
+            record(url, hit[0])
+        else:
+            queues.setdefault(urlparse(url).netloc, deque()).append(url)
+
+    deadline = start + ASSET_BUDGET_S
+    futures: Dict[Any, str] = {}
+    try:
+        while queues or futures:
+            for host in list(queues):
+                queue = queues[host]
+                while queue and _try_acquire(host):
+                    url = queue.popleft()
+                    futures[_asset_pool.submit(_sized_on_slot, url, host)] = url
+                if not queue:
+                    del queues[host]
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            # With hosts still queued, wake up soon to retry their slots
+            timeout = min(remaining, _HOST_RETRY_S) if queues else remaining
+            if not futures:
+                time.sleep(timeout)
+                continue
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            for fut in done:
+                record(futures.pop(fut), fut.result()[0])
+    finally:
+        for fut in futures:
+            if fut.cancel():
+                # Never started, so _sized_on_slot will not release its slot
+                _release(urlparse(futures[fut]).netloc)
+
+    total = sum(by_kind.values())
+    sized.sort(reverse=True)
+    return {
+        "asset_count": len(kinds),
+        "assets_unsized": len(kinds) - len(sized),
+        "asset_bytes_css": by_kind["css"],
+        "asset_bytes_js": by_kind["js"],
+        "asset_bytes_img": by_kind["img"],
+        "asset_bytes_total": total,
+        "page_weight_bytes": html_bytes + total,
+        "largest_assets": [f"{url} ({kind}, {_kb(size)})" for size, kind, url in sized[:ASSET_TOP_N]],
+        "asset_probe_ms": int((time.perf_counter() - start) * 1000),
+    }
@@ -0,0 +1,303 @@
+# checks.py — declarative scoring rules for run_basic_checks and the profiles that select them
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+import os
+
+CATEGORIES = ["Performance", "Accessibility", "SEO", "Security", "BestPractices"]
+BASELINE_SCORE = 60  # categories no enabled rule evaluates keep the heuristic baseline
+
+# Network phase timings (DNS/connect/TLS/TTFB/download) feed the Performance score only when enabled
+SCORE_TIMINGS    = bool(os.getenv("AUDIT_SCORE_TIMINGS", "0") in ("1", "true", "TRUE"))
+SLOW_TTFB_MS     = int(os.getenv("AUDIT_SLOW_TTFB_MS", "800"))
+SLOW_DOWNLOAD_MS = int(os.getenv("AUDIT_SLOW_DOWNLOAD_MS", "1500"))
+
+# Inputs a rule can declare; the engine only gathers what the enabled rules need
+#   url      the audited URL itself (free)
+#   headers  page response status + headers (GET without reading the body)
+#   body     page body size / transfer (body downloaded, not parsed)
+#   html     parsed page facts (PageAnalyzer)
+#   robots   robots.txt verdict for the URL
+#   sitemap  sitemap.xml presence
+INPUTS = ("url", "headers", "body", "html", "robots", "sitemap")
+
+# A rule returns None (pass) or (deduction, issue text or None)
+Outcome = Optional[Tuple[int, Optional[str]]]
+
+
+class Check:
+    """One scoring rule: the category it deducts from and the inputs it reads."""
+    def __init__(self, name: str, category: str, needs: FrozenSet[str], fn: Callable[[Dict[str, Any], Any], Outcome]):
+        self.name = name
+        self.category = category
+        self.needs = needs
+        self.fn = fn
+
+    def __repr__(self) -> str:
+        return f"Check({self.name!r}, {self.category!r}, needs={sorted(self.needs)})"
+
+
+CHECKS: List[Check] = []
+
+
+def check(category: str, *needs: str):
+    """Register the decorated rule; registration order is the order issues are reported in."""
+    unknown = set(needs) - set(INPUTS)
+    if unknown:
+        raise ValueError(f"unknown check inputs: {sorted(unknown)}")
+
+    def register(fn):
+        CHECKS.append(Check(fn.__name__, category, frozenset(needs), fn))
+        return fn
+    return register
+
+
+def _score_bounds(val: int) -> int:
+    return max(0, min(100, val))
+
+
+# ----------------------------
+# Performance: payload, compression, caching
+# ----------------------------
+
+@check("Performance", "body")
+def payload_size(m, page) -> Outcome:
+    size = m["content_length"]
+    if size == 0:
+        return 30, "No content received; check availability and payload."
+    if size > 250_000:  # friendlier threshold for rich homepages
+        return min(40, (size - 250_000) // 30_000), None
+    return None
+
+
+@check("Performance", "headers")
+def compression(m, page) -> Outcome:
+    if m["content_encoding"] not in ("gzip", "br", "deflate"):
+        return 8, "Response not compressed (gzip/br/deflate)."
+    return None
+
+
+@check("Performance", "headers")
+def cache_control(m, page) -> Outcome:
+    if not m["cache_control"]:
+        return 8, "Missing Cache-Control headers."
+    return None
+
+
+@check("Performance", "headers")
+def slow_ttfb(m, page) -> Outcome:
+    ttfb = m.get("ttfb_ms", 0)
+    if SCORE_TIMINGS and m["status_code"] and ttfb > SLOW_TTFB_MS:
+        return min(15, 5 + (ttfb - SLOW_TTFB_MS) // 200), f"Slow server response (time to first byte {ttfb} ms)."
+    return None
+
+
+@check("Performance", "body")
+def slow_download(m, page) -> Outcome:
+    download = m.get("download_ms", 0)
+    if SCORE_TIMINGS and m["status_code"] and download > SLOW_DOWNLOAD_MS:
+        return min(10, 3 + (download - SLOW_DOWNLOAD_MS) // 500), f"Slow page download ({download} ms)."
+    return None
+
+
+# ----------------------------
+# Accessibility: alt text, viewport, lang, heading presence
+# ----------------------------
+
+@check("Accessibility", "html")
+def image_alt(m, page) -> Outcome:
+    missing = m["images_without_alt"]
+    if missing > 0:
+        return min(28, missing * 2), f"{missing} <img> tags without alt attribute."
+    return None
+
+
+@check("Accessibility", "html")
+def viewport(m, page) -> Outcome:
+    return None if m["viewport_present"] else (10, "No mobile viewport meta.")
+
+
+@check("Accessibility", "html")
+def html_lang(m, page) -> Outcome:
+    return None if m["html_lang_present"] else (10, "<html lang> missing for language semantics.")
+
+
+@check("Accessibility", "html")
+def h1_present(m, page) -> Outcome:
+    return None if m["h1_count"] else (10, "Missing <h1> heading.")
+
+
+# ----------------------------
+# SEO: title, description, canonical, robots/sitemap
+# ----------------------------
+
+@check("SEO", "html")
+def title(m, page) -> Outcome:
+    tl = m["title_length"]
+    if tl == 0:
+        return 18, "Missing <title> tag."
+    if tl < 12 or tl > 70:
+        return 8, "Title length suboptimal (12–70 chars)."
+    return None
+
+
+@check("SEO", "html")
+def meta_description(m, page) -> Outcome:
+    mdl = m["meta_description_length"]
+    if mdl == 0:
+        return 12, "Missing meta description."
+    if mdl < 40 or mdl > 170:
+        return 4, "Meta description length suboptimal (40–170 chars)."
+    return None
+
+
+@check("SEO", "html")
+def canonical(m, page) -> Outcome:
+    return None if m["canonical_present"] else (8, "Missing canonical link.")
+
+
+@check("SEO", "html")
+def noindex(m, page) -> Outcome:
+    if "noindex" in (m["meta_robots"] or "").lower():
+        return 18, "Meta robots set to noindex."
+    return None
+
+
+@check("SEO", "robots")
+def robots_allowed(m, page) -> Outcome:
+    return None if m["robots_allowed"] else (15, "robots.txt disallows crawling this URL (User-agent: *).")
+
+
+@check("SEO", "robots")
+def robots_readable(m, page) -> Outcome:
+    # Search engines pause crawling a site whose robots.txt fails with 5xx
+    status = m.get("robots_status", 200)
+    return (8, f"robots.txt returned HTTP {status}; crawlers may pause indexing.") if status >= 500 else None
+
+
+@check("SEO", "sitemap")
+def sitemap(m, page) -> Outcome:
+    return None if m["sitemap_present"] else (5, "No sitemap.xml discovered.")
+
+
+# ----------------------------
+# Security: HTTPS, HSTS, headers
+# ----------------------------
+
+@check("Security", "url")
+def https(m, page) -> Outcome:
+    return None if m["has_https"] else (22, "Site not served over HTTPS.")
+
+
+@check("Security", "headers")
+def hsts(m, page) -> Outcome:
+    return None if m["hsts"] else (8, "Missing Strict-Transport-Security (HSTS).")
+
+
+@check("Security", "headers")
+def nosniff(m, page) -> Outcome:
+    if (m["xcto"] or "").lower() != "nosniff":
+        return 8, "Missing X-Content-Type-Options: nosniff."
+    return None
+
+
+@check("Security", "headers")
+def frame_options(m, page) -> Outcome:
+    return None if m["xfo"] else (5, "Missing X-Frame-Options (clickjacking risk).")
+
+
+@check("Security", "headers")
+def csp(m, page) -> Outcome:
+    return None if m["csp"] else (8, "Missing Content-Security-Policy.")
+
+
+@check("Security", "headers")
+def cookie_flags(m, page) -> Outcome:
+    sc = m["set_cookie"] or ""
+    if sc and ("httponly" not in sc.lower() or "secure" not in sc.lower()):
+        return 5, "Cookies missing Secure/HttpOnly flags."
+    return None
+
+
+# ----------------------------
+# Best Practices: OpenGraph, favicon, landmarks
+# ----------------------------
+
+@check("BestPractices", "html")
+def opengraph(m, page) -> Outcome:
+    if not page.og_title or not page.og_image:
+        return 5, "Missing OpenGraph tags (og:title/og:image)."
+    return None
+
+
+@check("BestPractices", "html")
+def favicon(m, page) -> Outcome:
+    return None if page.favicon_present else (3, "No favicon link found.")
+
+
+@check("BestPractices", "html")
+def main_landmark(m, page) -> Outcome:
+    return None if page.main_present else (3, "No <main> landmark found.")
+
+
+@check("BestPractices", "html")
+def nav_landmark(m, page) -> Outcome:
+    return None if page.nav_present else (2, "No <nav> landmark found.")
+
+
+# ----------------------------
+# Profiles
+# ----------------------------
+
+PROFILES: Dict[str, Callable[[Check], bool]] = {
+    "full": lambda c: True,
+    # Response headers only: no body download, parse, robots or sitemap fetch
+    "headers": lambda c: c.needs <= {"url", "headers"},
+    "seo": lambda c: c.category == "SEO",
+}
+
+
+def rules_for(profile: str) -> List[Check]:
+    """The registered rules a profile enables, in registration order."""
+    try:
+        keep = PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"unknown audit profile {profile!r} (known: {', '.join(PROFILES)})")
+    return [c for c in CHECKS if keep(c)]
+
+
+def required_inputs(rules: List[Check]) -> FrozenSet[str]:
+    """Union of the inputs `rules` read; "html" implies "body", which implies "headers"."""
+    needs = set().union(*(c.needs for c in rules)) if rules else set()
+    if "html" in needs:
+        needs.add("body")
+    if "body" in needs:
+        needs.add("headers")
+    return frozenset(needs)
+
+
+def score(metrics: Dict[str, Any], page: Any, rules: List[Check]) -> Tuple[Dict[str, int], List[str]]:
+    """
+    Apply `rules` to the gathered metrics/page facts. Each evaluated category
+    starts at 100 and loses its rules' deductions; the rest stay at
+    BASELINE_SCORE. A failed page fetch softens Performance and SEO.
+    """
+    cats = {cat: BASELINE_SCORE for cat in CATEGORIES}
+    totals: Dict[str, int] = {}
+    issues: List[str] = []
+    for rule in rules:
+        totals.setdefault(rule.category, 100)
+        outcome = rule.fn(metrics, page)
+        if outcome:
+            deduction, issue = outcome
+            totals[rule.category] -= deduction
+            if issue:
+                issues.append(issue)
+    for cat, total in totals.items():
+        cats[cat] = _score_bounds(total)
+
+    # If status indicates failure, soften scores but keep baseline
+    status = metrics.get("status_code")
+    if status is not None and (status == 0 or status >= 400):
+        issues.append(f"HTTP status {status} detected; using heuristic baseline.")
+        cats["Performance"] = max(30, cats["Performance"] - 18)
+        cats["SEO"] = max(30, cats["SEO"] - 12)
+    return cats, issues
@@ -0,0 +1,324 @@
+# crawler.py — multi-page site crawl built on run_basic_checks
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+import xml.etree.ElementTree as ET
+import gzip
+import json
+import os
+import time
+
+from .engine import (
+    run_basic_checks, _fetch, _probe, _robots_rules, _normalize_url, _origin,
+    CATEGORIES, SITEMAP_NAMES,
+)
+
+CRAWL_WORKERS          = int(os.getenv("CRAWL_WORKERS", "32"))
+CRAWL_PER_HOST         = int(os.getenv("CRAWL_PER_HOST", "8"))
+CRAWL_MAX_PAGES        = int(os.getenv("CRAWL_MAX_PAGES", "1000"))
+CRAWL_CHECKPOINT_EVERY = int(os.getenv("CRAWL_CHECKPOINT_EVERY", "100"))
+CRAWL_USER_AGENT       = "FFTechAudit"
+MAX_CHILD_SITEMAPS     = 50
+
+# Links to these are not pages worth auditing
+SKIP_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".css", ".js",
+    ".zip", ".gz", ".mp4", ".mp3", ".woff", ".woff2", ".xml", ".json",
+)
+
+
+# ----------------------------
+# Sitemap seeding
+# ----------------------------
+
+def _sitemap_locs(url: str) -> List[str]:
+    status, body, _ = _fetch(url)
+    if not (200 <= status < 300) or not body:
+        return []
+    if body[:2] == b"\x1f\x8b":  # .xml.gz served as a file rather than with Content-Encoding
+        try:
+            body = gzip.decompress(body)
+        except (OSError, EOFError):
+            return []
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return []
+    return [el.text.strip() for el in root.iter() if el.tag.endswith("loc") and el.text]
+
+
+def sitemap_urls(base: str, limit: int) -> List[str]:
+    """Page URLs listed in the host's sitemap.xml / sitemap_index.xml (one level of index nesting)."""
+    origin = _origin(base)
+    pages: List[str] = []
+    children = 0
+    for name in SITEMAP_NAMES:
+        for loc in _sitemap_locs(f"{origin}/{name}"):
+            if len(pages) >= limit:
+                return pages
+            if loc.lower().endswith((".xml", ".xml.gz")) and children < MAX_CHILD_SITEMAPS:
+                children += 1
+                pages.extend(_sitemap_locs(loc)[: limit - len(pages)])
+            else:
+                pages.append(loc)
+    return pages
+
+
+# ----------------------------
+# Frontier
+# ----------------------------
+
+def site_hosts(*netlocs: str) -> List[str]:
+    """The given hosts plus their www./apex twins, which count as the same site."""
+    hosts = set()
+    for netloc in netlocs:
+        if not netloc:
+            continue
+        hosts.add(netloc)
+        hosts.add(netloc[4:] if netloc.startswith("www.") else f"www.{netloc}")
+    return sorted(hosts)
+
+
+class Frontier:
+    """
+    Deduplicated per-host queues of URLs still to crawl. Only hosts in
+    `allowed_hosts` are accepted; robots.txt is honoured per URL.
+    """
+    def __init__(self, allowed_hosts: List[str]):
+        self.allowed_hosts = set(allowed_hosts)
+        self.queues: Dict[str, deque] = {}
+        self.seen: set = set()
+
+    def add(self, url: str) -> bool:
+        p = urlparse(url)
+        if p.scheme not in ("http", "https") or p.netloc not in self.allowed_hosts:
+            return False
+        if p.path.lower().endswith(SKIP_EXTENSIONS):
+            return False
+        url = f"{p.scheme}://{p.netloc}{p.path or '/'}" + (f"?{p.query}" if p.query else "")
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        if not _robots_rules(url).can_fetch(CRAWL_USER_AGENT, url):
+            return False
+        self.queues.setdefault(p.netloc, deque()).append(url)
+        return True
+
+    def pending(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "allowed_hosts": sorted(self.allowed_hosts),
+            "queues": {h: list(q) for h, q in self.queues.items()},
+            "seen": sorted(self.seen),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Frontier":
+        f = cls(data["allowed_hosts"])
+        f.queues = {h: deque(q) for h, q in data["queues"].items()}
+        f.seen = set(data["seen"])
+        return f
+
+
+# ----------------------------
+# Checkpointing
+# ----------------------------
+#
+# The checkpoint file holds the seed, the frontier and how many pages were
+# finished at that point; the page summaries themselves are appended to
+# "<path>.pages.jsonl" at each checkpoint, so a checkpoint costs O(frontier)
+# rather than re-serialising every page so far.
+
+def _pages_path(path: str) -> str:
+    return f"{path}.pages.jsonl"
+
+
+def _save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(state, fh)
+    os.replace(tmp, path)
+
+
+def _load_checkpoint(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _load_pages(path: str, count: int) -> List[Dict[str, Any]]:
+    """The first `count` page summaries (those covered by the checkpoint); later ones are re-crawled."""
+    pages: List[Dict[str, Any]] = []
+    if os.path.exists(_pages_path(path)):
+        with open(_pages_path(path), encoding="utf-8") as fh:
+            for line in fh:
+                if len(pages) >= count:
+                    break
+                pages.append(json.loads(line))
+    return pages
+
+
+# ----------------------------
+# Aggregation
+# ----------------------------
+
+def _page_summary(url: str, res: Dict[str, Any]) -> Dict[str, Any]:
+    m = res.get("metrics", {})
+    return {
+        "url": url,
+        "status": m.get("status_code", 0),
+        "scores": res.get("category_scores", {}),
+        "issues": res.get("top_issues", []),
+        "content_length": m.get("content_length", 0),
+        "title_length": m.get("title_length", 0),
+        "meta_description_length": m.get("meta_description_length", 0),
+        "h1_count": m.get("h1_count", 0),
+        "images_without_alt": m.get("images_without_alt", 0),
+        "noindex": "noindex" in (m.get("meta_robots") or "").lower(),
+    }
+
+
+def aggregate_pages(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Site-level category scores (mean of page scores), counters and the most common issues."""
+    ok = [p for p in pages if p["status"] and p["status"] < 400]
+    cats = {
+        cat: round(sum(p["scores"].get(cat, 0) for p in ok) / len(ok)) if ok else 0
+        for cat in CATEGORIES
+    }
+    issue_counts = Counter(i for p in ok for i in p["issues"])
+    return {
+        "category_scores": cats,
+        "metrics": {
+            "pages_crawled": len(pages),
+            "pages_ok": len(ok),
+            "pages_error": len(pages) - len(ok),
+            "avg_content_length": round(sum(p["content_length"] for p in ok) / len(ok)) if ok else 0,
+            "pages_missing_title": sum(1 for p in ok if not p["title_length"]),
+            "pages_missing_meta_description": sum(1 for p in ok if not p["meta_description_length"]),
+            "pages_missing_h1": sum(1 for p in ok if not p["h1_count"]),
+            "pages_noindex": sum(1 for p in ok if p["noindex"]),
+            "images_without_alt": sum(p["images_without_alt"] for p in ok),
+        },
+        "top_issues": [f"{issue} ({n} pages)" for issue, n in issue_counts.most_common(10)],
+    }
+
+
+# ----------------------------
+# Crawl
+# ----------------------------
+
+def _audit_page(url: str) -> Dict[str, Any]:
+    return run_basic_checks(url, collect_links=True)
+
+
+def crawl_site(
+    seed_url: str,
+    max_pages: int = CRAWL_MAX_PAGES,
+    checkpoint_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Crawl a site from its homepage plus sitemap URLs and audit each page with
+    run_basic_checks, up to `max_pages`. The site is the seed's host after
+    redirects, with www. and the apex treated as one. Pages run in parallel
+    on CRAWL_WORKERS threads with at most CRAWL_PER_HOST in flight per host. When
+    `checkpoint_path` is given, every CRAWL_CHECKPOINT_EVERY pages the newly
+    finished pages are appended to "<checkpoint_path>.pages.jsonl" and the
+    frontier is saved; an interrupted crawl resumes from them.
+
+    Returns aggregate_pages(...) plus "seed", "pages" (per-page summaries) and
+    "elapsed_s".
+    """
+    seed_url = _normalize_url(seed_url)
+    started = time.monotonic()
+    state = _load_checkpoint(checkpoint_path)
+    if state and state.get("seed") == seed_url:
+        frontier = Frontier.from_dict(state["frontier"])
+        pages: List[Dict[str, Any]] = _load_pages(checkpoint_path, state["pages_done"])
+    else:
+        # Start from where the seed redirects to (e.g. example.com -> www.example.com)
+        status, final_url = _probe(seed_url)
+        start_url = final_url if status and status < 400 else seed_url
+        frontier = Frontier(site_hosts(urlparse(seed_url).netloc, urlparse(start_url).netloc))
+        pages = []
+        frontier.add(start_url)
+        for loc in sitemap_urls(start_url, max_pages):
+            frontier.add(loc)
+
+    in_flight: Dict[Any, str] = {}
+    per_host: Counter = Counter()
+    since_checkpoint = 0
+    logged = len(pages)
+    if checkpoint_path:
+        # Drop pages finished after the checkpoint being resumed from; they are crawled again
+        with open(_pages_path(checkpoint_path), "w", encoding="utf-8") as fh:
+            for page in pages:
+                fh.write(json.dumps(page) + "\n")
+
+    def checkpoint():
+        nonlocal logged
+        if checkpoint_path:
+            # In-flight pages go back on the frontier so a resume re-audits them
+            snap = frontier.to_dict()
+            for u in in_flight.values():
+                snap["queues"].setdefault(urlparse(u).netloc, []).insert(0, u)
+            with open(_pages_path(checkpoint_path), "a", encoding="utf-8") as fh:
+                for page in pages[logged:]:
+                    fh.write(json.dumps(page) + "\n")
+            logged = len(pages)
+            _save_checkpoint(checkpoint_path, {"seed": seed_url, "frontier": snap, "pages_done": logged})
+
+    with ThreadPoolExecutor(max_workers=CRAWL_WORKERS, thread_name_prefix="crawl") as pool:
+        while True:
+            # Fill free worker slots round-robin across hosts with spare capacity
+            progressed = True
+            while progressed and len(in_flight) < CRAWL_WORKERS and len(pages) + len(in_flight) < max_pages:
+                progressed = False
+                for host, queue in frontier.queues.items():
+                    if queue and per_host[host] < CRAWL_PER_HOST and len(in_flight) < CRAWL_WORKERS \
+                            and len(pages) + len(in_flight) < max_pages:
+                        url = queue.popleft()
+                        in_flight[pool.submit(_audit_page, url)] = url
+                        per_host[host] += 1
+                        progressed = True
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                url = in_flight.pop(fut)
+                per_host[urlparse(url).netloc] -= 1
+                try:
+                    res = fut.result()
+                except Exception:
+                    res = {"metrics": {"status_code": 0}}
+                pages.append(_page_summary(url, res))
+                for link in res.get("links", []):
+                    frontier.add(link)
+                since_checkpoint += 1
+            if since_checkpoint >= CRAWL_CHECKPOINT_EVERY:
+                checkpoint()
+                since_checkpoint = 0
+
+    checkpoint()
+    report = aggregate_pages(pages)
+    report["seed"] = seed_url
+    report["pages"] = pages
+    report["elapsed_s"] = round(time.monotonic() - started, 1)
+    return report
+
+
+if __name__ == "__main__":
+    # python -m app.audit.crawler example.com [max_pages] [checkpoint.json]
+    import sys
+    from pprint import pprint
+    args = sys.argv[1:] or ["example.com"]
+    result = crawl_site(
+        args[0],
+        int(args[1]) if len(args) > 1 else CRAWL_MAX_PAGES,
+        args[2] if len(args) > 2 else None,
+    )
+    pprint({k: v for k, v in result.items() if k != "pages"})
@@ -1,12 +1,30 @@
 
 # engine.py — updated with one-page competitor analysis
-from typing import Dict, Any, List, Tuple
-from urllib.request import Request, urlopen
-from urllib.error import URLError, HTTPError
-from urllib.parse import urlparse
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urldefrag, urlparse
+from urllib.robotparser import RobotFileParser
 from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import codecs
+import multiprocessing
+import os
 import re
-import ssl
+import socket
+import threading
+import time
+
+import httpx
+
+from ..cache import TTLCache
+from ..telemetry import PROBE_SECONDS
+from .checks import CATEGORIES, rules_for, required_inputs, score
+
+try:  # httpx decodes brotli bodies only when a brotli codec is installed
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
 
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -16,55 +34,466 @@ USER_AGENT = (
 ACCEPT_LANG = "en-US,en;q=0.9"
 TIMEOUT_S = 10  # keep modest to avoid hanging audits
 
+# Connection pool limits for the shared HTTP client (per process)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE   = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_S     = float(os.getenv("HTTP_KEEPALIVE_S", "30"))
+
+# Streaming page read: chunk size and per-page byte budget (rest is counted, not kept)
+STREAM_CHUNK_BYTES = int(os.getenv("AUDIT_STREAM_CHUNK_BYTES", "65536"))
+MAX_BODY_BYTES     = int(os.getenv("AUDIT_MAX_BODY_BYTES", str(10 * 1024 * 1024)))
+MAX_COUNT_BYTES    = int(os.getenv("AUDIT_MAX_COUNT_BYTES", str(4 * MAX_BODY_BYTES)))  # stop counting past the budget here
+BODY_DEADLINE_S    = float(os.getenv("AUDIT_BODY_DEADLINE_S", "30"))  # whole-download limit; the timeout is per read
+MAX_LINKS_PER_PAGE = int(os.getenv("AUDIT_MAX_LINKS_PER_PAGE", "1000"))
+MAX_ASSETS_PER_PAGE = int(os.getenv("AUDIT_MAX_ASSETS_PER_PAGE", "300"))
+CHARSET_SNIFF_BYTES = 1024  # HTML spec: <meta charset> must appear in the first 1024 bytes
+
+# Response headers kept with a page snapshot; a 304 only refreshes the ones it carries
+SNAPSHOT_HEADERS = (
+    "content-type", "content-encoding", "cache-control", "strict-transport-security",
+    "x-content-type-options", "x-frame-options", "content-security-policy", "set-cookie",
+)
+
+# Bounded pool for the independent network probes of an audit (page, robots, sitemaps)
+PROBE_WORKERS = int(os.getenv("AUDIT_PROBE_WORKERS", "16"))
+SITEMAP_NAMES = ("sitemap.xml", "sitemap_index.xml")
+
+# Bounded pool for whole-page audits in competitor comparisons
+COMPETITOR_WORKERS = int(os.getenv("COMPETITOR_WORKERS", "8"))
+
+# Per-host cache of parsed robots.txt rules and sitemap presence
+ROBOTS_CACHE_SIZE  = int(os.getenv("ROBOTS_CACHE_SIZE", "4096"))
+ROBOTS_CACHE_TTL_S = float(os.getenv("ROBOTS_CACHE_TTL_S", "3600"))
+ROBOTS_FAIL_TTL_S  = float(os.getenv("ROBOTS_FAIL_TTL_S", "60"))  # unreachable / 5xx robots.txt is retried soon
+
+# CPU stage (HTML parse + scoring) in worker processes; 0 = parse inline while streaming
+PARSE_PROCESSES = int(os.getenv("AUDIT_PARSE_PROCESSES", "0"))
+PARSE_MIN_BYTES = int(os.getenv("AUDIT_PARSE_MIN_BYTES", str(64 * 1024)))  # smaller bodies aren't worth the IPC
+
+# Subresource page-weight analysis (see assets.py) for every audit unless the caller decides
+ANALYZE_ASSETS = bool(os.getenv("AUDIT_ASSETS", "0") in ("1", "true", "TRUE"))
+
 # ----------------------------
-# HTML tag collector (lightweight)
+# Single-pass HTML analyzer
 # ----------------------------
-class TagCollector(HTMLParser):
+class PageAnalyzer(HTMLParser):
     """
-    Collect start tags and attributes in a normalized, lower-case manner.
-    This allows fast presence checks for <meta name="viewport">, canonical etc.
+    Compute every page fact the checks need while tags stream by, instead of
+    collecting all start tags and rescanning them per check. Only the tags
+    we inspect get an attribute dict; nothing per-tag is retained except,
+    with collect_links=True, up to MAX_LINKS_PER_PAGE <a href> values, and
+    with collect_assets=True, up to MAX_ASSETS_PER_PAGE (kind, url) pairs for
+    stylesheets, scripts and images.
     """
-    def __init__(self):
+    def __init__(self, collect_links: bool = False, collect_assets: bool = False):
         super().__init__()
-        self.tags: List[Tuple[str, Dict[str, str]]] = []
+        self.collect_links = collect_links
+        self.collect_assets = collect_assets
+        self.links: List[str] = []
+        self.assets: List[Tuple[str, str]] = []
+        self.title = ""
+        self.meta_description = ""
+        self.meta_robots = ""
+        self.canonical_present = False
+        self.h1_count = 0
+        self.image_count = 0
+        self.images_without_alt = 0
+        self.html_lang_present = False
+        self.viewport_present = False
+        self.og_title = False
+        self.og_image = False
+        self.favicon_present = False
+        self.main_present = False
+        self.nav_present = False
+        self._in_title = False
+        self._title_seen = False
+        self._title_parts: List[str] = []
 
     def handle_starttag(self, tag, attrs):
-        self.tags.append((tag.lower(), {k.lower(): (v or "") for k, v in attrs}))
+        if tag == "img":
+            self.image_count += 1
+            a = dict(attrs)
+            if not a.get("alt"):
+                self.images_without_alt += 1
+            if self.collect_assets:
+                self._add_asset("img", a.get("src"))
+        elif tag == "meta":
+            a = {k: (v or "") for k, v in attrs}
+            n = a.get("name", "")
+            prop = a.get("property", "")
+            if n == "description" or prop == "og:description":
+                self.meta_description = a.get("content", "") or self.meta_description
+            if n == "robots":
+                self.meta_robots = a.get("content", "") or self.meta_robots
+            if n == "viewport":
+                self.viewport_present = True
+            if prop == "og:title":
+                self.og_title = True
+            elif prop == "og:image":
+                self.og_image = True
+        elif tag == "link":
+            a = {k: (v or "") for k, v in attrs}
+            rel = a.get("rel", "").lower()
+            if "canonical" in rel and a.get("href", ""):
+                self.canonical_present = True
+            if "icon" in rel:
+                self.favicon_present = True
+            if "stylesheet" in rel and self.collect_assets:
+                self._add_asset("css", a.get("href"))
+        elif tag == "script":
+            if self.collect_assets:
+                self._add_asset("js", dict(attrs).get("src"))
+        elif tag == "h1":
+            self.h1_count += 1
+        elif tag == "title":
+            if not self._title_seen:
+                self._in_title = True
+        elif tag == "html":
+            if any(k == "lang" for k, _ in attrs):
+                self.html_lang_present = True
+        elif tag == "main":
+            self.main_present = True
+        elif tag == "nav":
+            self.nav_present = True
+        elif tag == "a" and self.collect_links and len(self.links) < MAX_LINKS_PER_PAGE:
+            href = dict(attrs).get("href")
+            if href:
+                self.links.append(href)
+
+    def _add_asset(self, kind: str, url: Optional[str]) -> None:
+        if url and not url.startswith("data:") and len(self.assets) < MAX_ASSETS_PER_PAGE:
+            self.assets.append((kind, url))
+
+    def handle_endtag(self, tag):
+        if tag == "title" and self._in_title:
+            self._in_title = False
+            self._title_seen = True
+            self.title = "".join(self._title_parts).strip()
+            self._title_parts = []
+
+    def handle_data(self, data):
+        if self._in_title:
+            self._title_parts.append(data)
+
+    @classmethod
+    def from_facts(cls, facts: Dict[str, Any]) -> "PageAnalyzer":
+        """Rebuild an analyzer from a stored facts() snapshot (e.g. after a 304)."""
+        page = cls()
+        for k, v in (facts or {}).items():
+            if not k.startswith("_") and hasattr(page, k):
+                setattr(page, k, v)
+        return page
+
+    def facts(self) -> Dict[str, Any]:
+        """All computed page facts as a plain dict."""
+        facts = {
+            "title": self.title,
+            "meta_description": self.meta_description,
+            "meta_robots": self.meta_robots,
+            "canonical_present": self.canonical_present,
+            "h1_count": self.h1_count,
+            "image_count": self.image_count,
+            "images_without_alt": self.images_without_alt,
+            "html_lang_present": self.html_lang_present,
+            "viewport_present": self.viewport_present,
+            "og_title": self.og_title,
+            "og_image": self.og_image,
+            "favicon_present": self.favicon_present,
+            "main_present": self.main_present,
+            "nav_present": self.nav_present,
+        }
+        if self.collect_assets:
+            facts["assets"] = [list(a) for a in self.assets]
+        return facts
 
 
 # ----------------------------
 # Network helpers
 # ----------------------------
 
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> httpx.Client:
+    """
+    Return the process-wide pooled HTTP client, creating it on first use.
+    Connections are kept alive per host, so the page, robots.txt and sitemap
+    probes of one audit (and later audits of the same host) reuse the same
+    TCP+TLS session instead of paying a fresh handshake each time.
+    Compressed responses are negotiated and decoded transparently.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    headers={
+                        "User-Agent": USER_AGENT,
+                        "Accept-Language": ACCEPT_LANG,
+                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                        "Accept-Encoding": ACCEPT_ENCODING,
+                    },
+                    timeout=TIMEOUT_S,
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                        keepalive_expiry=HTTP_KEEPALIVE_S,
+                    ),
+                )
+    return _client
+
+
+def close_client() -> None:
+    """Close the shared HTTP client and its pooled connections (app shutdown)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
 def _fetch(url: str) -> Tuple[int, bytes, Dict[str, str]]:
     """
-    Fetch URL with realistic headers and a safe TLS context.
+    Fetch URL through the shared keep-alive client (standard TLS verification).
     Returns: (status_code, body_bytes, headers_dict_lowercased)
     """
-    req = Request(
-        url,
-        headers={
-            "User-Agent": USER_AGENT,
-            "Accept-Language": ACCEPT_LANG,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Connection": "close",
-        },
-    )
-    ctx = ssl.create_default_context()  # standard verification (no CA tweaking)
     try:
-        with urlopen(req, timeout=TIMEOUT_S, context=ctx) as resp:
-            status = resp.getcode()
-            headers = {k.lower(): v for k, v in resp.info().items()}
-            data = resp.read() or b""
-            return status, data, headers
-    except HTTPError as e:
-        return e.code, b"", {k.lower(): v for k, v in (e.headers or {}).items()}
-    except URLError as e:
+        resp = _get_client().get(url)
+        headers = {k.lower(): v for k, v in resp.headers.items()}
+        if resp.status_code >= 400:
+            return resp.status_code, b"", headers
+        return resp.status_code, resp.content or b"", headers
+    except httpx.HTTPError as e:
         return 0, b"", {"error": str(e)}
     except Exception as e:
         return 0, b"", {"error": str(e)}
 
 
+_CONTENT_TYPE_CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+
+
+def _valid_charset(name: str) -> str:
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return ""
+
+
+class _HTMLStream:
+    """
+    Incrementally decode body chunks into a parser. The charset comes from the
+    Content-Type header, else a BOM or <meta charset> in the first bytes, else
+    UTF-8; undecodable bytes are dropped as before.
+    """
+    def __init__(self, parser: HTMLParser, content_type: str = ""):
+        self.parser = parser
+        m = _CONTENT_TYPE_CHARSET_RE.search(content_type or "")
+        self.charset = _valid_charset(m.group(1)) if m else ""
+        self._decoder = None
+        self._head = b""
+        self._failed = False
+
+    def _start(self, head: bytes) -> None:
+        if not self.charset:
+            if head.startswith(codecs.BOM_UTF8):
+                self.charset = "utf-8-sig"
+            else:
+                m = _META_CHARSET_RE.search(head[:CHARSET_SNIFF_BYTES])
+                self.charset = _valid_charset(m.group(1).decode("ascii", "ignore")) if m else ""
+        self.charset = self.charset or "utf-8"
+        self._decoder = codecs.getincrementaldecoder(self.charset)(errors="ignore")
+
+    def _feed(self, text: str) -> None:
+        if text and not self._failed:
+            try:
+                self.parser.feed(text)
+            except Exception:
+                # Continue even if parsing fails, we still have header-level metrics
+                self._failed = True
+
+    def write(self, chunk: bytes) -> None:
+        if self._decoder is None:
+            self._head += chunk
+            if len(self._head) < CHARSET_SNIFF_BYTES:
+                return
+            chunk, self._head = self._head, b""
+            self._start(chunk)
+        self._feed(self._decoder.decode(chunk))
+
+    def close(self) -> None:
+        if self._decoder is None:
+            head, self._head = self._head, b""
+            self._start(head)
+            self._feed(self._decoder.decode(head))
+        self._feed(self._decoder.decode(b"", final=True))
+        if not self._failed:
+            try:
+                self.parser.close()
+            except Exception:
+                pass
+
+
+class _BodyBuffer:
+    """
+    Sink that keeps the raw body for a later CPU stage instead of parsing it:
+    chunks are joined once on close, so the body is copied a single time.
+    """
+    def __init__(self):
+        self.content_type = ""
+        self.body: Optional[bytes] = None
+        self.charset = ""  # decided when the body is parsed
+        self._chunks: List[bytes] = []
+
+    def open(self, content_type: str) -> "_BodyBuffer":
+        self.content_type = content_type
+        return self
+
+    def write(self, chunk: bytes) -> None:
+        self._chunks.append(chunk)
+
+    def close(self) -> None:
+        self.body = b"".join(self._chunks)
+        self._chunks = []
+
+
+class _DiscardSink:
+    """Sink for audits that only need the body's size: chunks are counted by _fetch_page and dropped."""
+    charset = ""
+
+    def write(self, chunk: bytes) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class _PhaseTrace:
+    """
+    httpx "trace" extension callback that timestamps connection and request
+    events. When redirects are followed only the final request is kept; a
+    request sent without a connect of its own went over a pooled connection.
+    """
+    def __init__(self):
+        self.marks: Dict[str, float] = {}
+
+    def __call__(self, event: str, info: Dict[str, Any]) -> None:
+        # "http11.send_request_headers.started" / "http2...." -> "send_request_headers.started"
+        if event.startswith(("http11.", "http2.")):
+            event = event.split(".", 1)[1]
+        if event == "connection.connect_tcp.started" or (
+            event == "send_request_headers.started" and event in self.marks
+        ):
+            self.marks = {}  # next hop of a redirect chain
+        self.marks[event] = time.perf_counter()
+
+    def _span(self, start: str, end: str) -> int:
+        if start in self.marks and end in self.marks:
+            return max(0, int((self.marks[end] - self.marks[start]) * 1000))
+        return 0
+
+    def phases(self, body_done: Optional[float] = None) -> Dict[str, Any]:
+        """connect/TLS/TTFB/download milliseconds of the final request."""
+        headers_done = self.marks.get("receive_response_headers.complete")
+        return {
+            "connect_ms": self._span("connection.connect_tcp.started", "connection.connect_tcp.complete"),
+            "tls_ms": self._span("connection.start_tls.started", "connection.start_tls.complete"),
+            "ttfb_ms": self._span("send_request_headers.started", "receive_response_headers.complete"),
+            "download_ms": max(0, int((body_done - headers_done) * 1000)) if body_done and headers_done else 0,
+            "connection_reused": bool(self.marks) and "connection.connect_tcp.started" not in self.marks,
+        }
+
+
+def _resolve(host: str, port: int) -> bool:
+    """One resolver lookup for `host` (timed separately from the connect)."""
+    try:
+        return bool(socket.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+    except (OSError, UnicodeError):
+        return False
+
+
+def _fetch_page(url: str, open_sink: Optional[Callable[[str], Any]], extra_headers: Optional[Dict[str, str]] = None) -> Tuple[int, int, int, Dict[str, str], bool, str, Dict[str, Any]]:
+    """
+    Stream the (decompressed) page body into the sink `open_sink(content_type)`
+    returns (an _HTMLStream, a _BodyBuffer or a _DiscardSink) chunk by chunk,
+    keeping at most MAX_BODY_BYTES of it; the remainder is only counted so
+    content_length stays the true size (Content-Length is trusted when the
+    body is not compressed). Counting stops at MAX_COUNT_BYTES or after
+    BODY_DEADLINE_S, so a decompression bomb or an endless chunked response
+    can't hold the probe; content_length is then a lower bound and truncated
+    is True. `extra_headers` carries conditional validators.
+    With open_sink=None the response is closed after its headers and the
+    body is never downloaded (content_length is then 0).
+    Returns: (status_code, content_length, transfer_bytes, headers_dict_lowercased, truncated, charset, phases)
+    where phases holds the _PhaseTrace timings of the final request.
+    """
+    trace = _PhaseTrace()
+    try:
+        with _get_client().stream("GET", url, headers=extra_headers, extensions={"trace": trace}) as resp:
+            headers = {k.lower(): v for k, v in resp.headers.items()}
+            if resp.status_code >= 400:
+                return resp.status_code, 0, resp.num_bytes_downloaded, headers, False, "", trace.phases()
+            if open_sink is None:
+                return resp.status_code, 0, 0, headers, False, "", trace.phases()
+            stream = open_sink(headers.get("content-type", ""))
+            total = 0
+            truncated = False
+            deadline = time.monotonic() + BODY_DEADLINE_S
+            for chunk in resp.iter_bytes(STREAM_CHUNK_BYTES):
+                if not truncated:
+                    room = MAX_BODY_BYTES - total
+                    stream.write(chunk[:room])
+                    if len(chunk) > room:
+                        truncated = True
+                        declared = headers.get("content-length", "")
+                        if declared.isdigit() and not headers.get("content-encoding"):
+                            total = wire = int(declared)
+                            break
+                total += len(chunk)
+                if total >= MAX_COUNT_BYTES or time.monotonic() > deadline:
+                    truncated = True
+                    wire = resp.num_bytes_downloaded
+                    break
+            else:
+                wire = resp.num_bytes_downloaded
+            body_done = time.perf_counter()
+            stream.close()
+            return resp.status_code, total, wire, headers, truncated, stream.charset, trace.phases(body_done)
+    except httpx.HTTPError as e:
+        return 0, 0, 0, {"error": str(e)}, False, "", trace.phases()
+    except Exception as e:
+        return 0, 0, 0, {"error": str(e)}, False, "", trace.phases()
+
+
+def _probe(url: str) -> Tuple[int, str]:
+    """
+    Lightweight reachability probe: HEAD, falling back to a headers-only GET
+    for servers that reject HEAD. Redirects are followed.
+    Returns: (status_code, final_url) — status 0 when unreachable.
+    """
+    client = _get_client()
+    try:
+        resp = client.head(url)
+        if resp.status_code < 400:
+            return resp.status_code, str(resp.url)
+        with client.stream("GET", url) as resp:
+            return resp.status_code, str(resp.url)
+    except Exception:
+        return 0, url
+
+
+_probe_pool = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix="audit-probe")
+
+
+def _timed(fn, *args) -> Tuple[Any, int]:
+    """Run fn(*args) and return (result, elapsed_ms)."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, int((time.perf_counter() - start) * 1000)
+
+
 def _get_text(data: bytes) -> str:
     """Decode response bytes defensively to text."""
     try:
@@ -80,41 +509,82 @@ def _get_text(data: bytes) -> str:
 # Robots & sitemap
 # ----------------------------
 
-def _robots_allowed(base: str) -> bool:
+_robots_cache = TTLCache(maxsize=ROBOTS_CACHE_SIZE, ttl=ROBOTS_CACHE_TTL_S)
+_sitemap_cache = TTLCache(maxsize=ROBOTS_CACHE_SIZE, ttl=ROBOTS_CACHE_TTL_S)
+_MISS = object()
+
+
+def _origin(url: str) -> str:
+    p = urlparse(url)
+    return f"{p.scheme}://{p.netloc}"
+
+
+def _robots_entry(base: str) -> Tuple[int, RobotFileParser]:
     """
-    Check robots.txt for a full block: 'User-agent: *' + 'Disallow: /'.
-    If robots.txt can't be fetched, default to allowed.
+    (robots.txt status, parsed rules) for the host of `base`, cached per
+    origin. The rules are for our own crawling: as in urllib.robotparser,
+    401/403 mean "disallow everything" and other 4xx "allow everything", and
+    we also back off from a host whose robots.txt answers 5xx. 5xx answers
+    and unreachable hosts (status 0) are cached for ROBOTS_FAIL_TTL_S only,
+    so one transient failure does not last the whole robots TTL.
     """
-    p = urlparse(base)
-    robots = f"{p.scheme}://{p.netloc}/robots.txt"
-    status, body, _ = _fetch(robots)
-    if status == 0:
-        return True
-    text = _get_text(body).lower()
-    if "user-agent: *" in text and "disallow: /" in text:
-        return False
-    return True
+    origin = _origin(base)
+    entry = _robots_cache.get(origin)
+    if entry is None:
+        status, body, _ = _fetch(f"{origin}/robots.txt")
+        rules = RobotFileParser(f"{origin}/robots.txt")
+        rules.parse(_get_text(body).splitlines() if 200 <= status < 300 else [])
+        if status in (401, 403) or status >= 500:
+            rules.disallow_all = True
+        entry = (status, rules)
+        transient = not status or status >= 500
+        _robots_cache.set(origin, entry, ttl=ROBOTS_FAIL_TTL_S if transient else None)
+    return entry
+
+
+def _robots_rules(base: str) -> RobotFileParser:
+    """Parsed robots.txt rules the crawler obeys for the host of `base` (see _robots_entry)."""
+    return _robots_entry(base)[1]
+
+
+def _robots_allowed(base: str) -> Tuple[bool, int]:
+    """
+    Whether robots.txt lets generic crawlers (User-agent: *) fetch `base`,
+    as search engines read it, plus the robots.txt status. Only a robots.txt
+    that was served restricts anything: a missing, forbidden (401/403),
+    failing (5xx) or unreachable one counts as allowed here; the status
+    lets the SEO checks report an unreadable file separately.
+    """
+    status, rules = _robots_entry(base)
+    if not 200 <= status < 300:
+        return True, status
+    return rules.can_fetch("*", base), status
+
+
+def _sitemap_url_ok(url: str) -> bool:
+    status, _, _ = _fetch(url)
+    return bool(status and 200 <= status < 400)
 
 
 def _sitemap_present(base: str) -> bool:
-    """Quick existence probe for common sitemap endpoints."""
-    p = urlparse(base)
-    for name in ("sitemap.xml", "sitemap_index.xml"):
-        url = f"{p.scheme}://{p.netloc}/{name}"
-        status, _, _ = _fetch(url)
-        if status and 200 <= status < 400:
-            return True
-    return False
+    """Quick existence probe for common sitemap endpoints (cached per origin)."""
+    origin = _origin(base)
+    found = _sitemap_cache.get(origin, _MISS)
+    if found is _MISS:
+        found = any(_sitemap_url_ok(f"{origin}/{name}") for name in SITEMAP_NAMES)
+        _sitemap_cache.set(origin, found)
+    return found
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters of the per-host robots and sitemap caches."""
+    return {"robots": _robots_cache.stats(), "sitemap": _sitemap_cache.stats()}
 
 
 # ----------------------------
 # Scoring helpers
 # ----------------------------
 
-def _score_bounds(val: int) -> int:
-    return max(0, min(100, val))
-
-
 def _total_score(cats: Dict[str, int]) -> int:
     """Simple aggregate across categories for coarse ranking."""
     return sum(int(v or 0) for v in cats.values())
@@ -134,303 +604,364 @@ def _normalize_url(url: str) -> str:
 # Main audit function
 # ----------------------------
 
-def run_basic_checks(url: str) -> Dict[str, Any]:
-    """
-    Dependency-free heuristics for Performance, Accessibility, SEO, Security, BestPractices.
+def _conditional_headers(url: str, snapshot: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since for a stored snapshot of this exact URL."""
+    if not snapshot or snapshot.get("url") != url:
+        return {}
+    headers = {}
+    if snapshot.get("etag"):
+        headers["If-None-Match"] = snapshot["etag"]
+    if snapshot.get("last_modified"):
+        headers["If-Modified-Since"] = snapshot["last_modified"]
+    return headers
 
-    Returns:
-        {
-            "category_scores": { ... },
-            "metrics": { ... },        # raw technical metrics (keys align with main.py presenter)
-            "top_issues": [ ... ]      # concise text items shown in the UI list
-        }
+
+# ----------------------------
+# CPU stage process pool
+# ----------------------------
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def _get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Lazily start the AUDIT_PARSE_PROCESSES worker processes (None when disabled)."""
+    global _parse_pool
+    if PARSE_PROCESSES <= 0:
+        return None
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                # spawn: forking a process that holds pooled sockets and locks is unsafe
+                _parse_pool = ProcessPoolExecutor(
+                    max_workers=PARSE_PROCESSES,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _parse_pool
+
+
+def close_parse_pool() -> None:
+    """Shut the CPU-stage worker processes down (app shutdown)."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=False, cancel_futures=True)
+            _parse_pool = None
+
+
+# ----------------------------
+# Basic checks: I/O stage, CPU stage
+# ----------------------------
+
+def _fetch_stage(
+    url: str,
+    snapshot: Optional[Dict[str, Any]],
+    collect_links: bool,
+    buffer_body: bool,
+    collect_assets: bool = False,
+    profile: str = "full",
+) -> Dict[str, Any]:
     """
-    url = _normalize_url(url)
+    Fetch what the profile's checks need: the page, robots.txt and sitemap
+    probes (see checks.required_inputs). With buffer_body=False the page is
+    parsed while it streams in and "facts"/"links" are returned; with
+    buffer_body=True the raw "body" bytes are returned for analyze_page to
+    parse (possibly in another process). Inputs no enabled rule reads are
+    skipped: the "headers" profile never downloads the body nor probes
+    robots.txt and the sitemap.
+    """
+    needs = _stage_inputs(profile, collect_links, collect_assets)
+    if collect_assets and snapshot and "assets" not in (snapshot.get("facts") or {}):
+        snapshot = None  # stored facts predate asset collection; a 304 couldn't supply them
+    conditional = _conditional_headers(url, snapshot) if "html" in needs else {}
+
+    # The page, robots.txt and sitemap probes are independent, so fan them
+    # out together; wall time is then roughly the slowest probe.
+    probes_start = time.perf_counter()
+    page = PageAnalyzer(collect_links=collect_links, collect_assets=collect_assets)
+    body = _BodyBuffer()
+    if "html" not in needs:
+        open_sink = (lambda content_type: _DiscardSink()) if "body" in needs else None
+    else:
+        open_sink = body.open if buffer_body else (lambda content_type: _HTMLStream(page, content_type))
+    page_f = dns_f = robots_f = None
+    if "headers" in needs:
+        page_f = _probe_pool.submit(_timed, _fetch_page, url, open_sink, conditional)
+        p = urlparse(url)
+        dns_f = _probe_pool.submit(_timed, _resolve, p.hostname or "", p.port or (443 if p.scheme == "https" else 80))
+    if "robots" in needs:
+        robots_f = _probe_pool.submit(_timed, _robots_allowed, url)
+    origin = _origin(url)
+    sitemap_cached = _sitemap_cache.get(origin, _MISS) if "sitemap" in needs else None
+    sitemap_fs = [] if sitemap_cached is not _MISS else [
+        _probe_pool.submit(_timed, _sitemap_url_ok, f"{origin}/{name}")
+        for name in SITEMAP_NAMES
+    ]
 
-    metrics: Dict[str, Any] = {}
-    issues: List[str] = []
-    cats: Dict[str, int] = {
-        "Performance": 60,
-        "Accessibility": 60,
-        "SEO": 60,
-        "Security": 60,
-        "BestPractices": 60,
+    fetched: Dict[str, Any] = {
+        "url": url, "profile": profile, "collect_links": collect_links, "collect_assets": collect_assets,
     }
+    timings: Dict[str, Any] = {}
+    if page_f is not None:
+        (status, content_length, transfer_bytes, headers, truncated, charset, phases), page_ms = page_f.result()
+        not_modified = status == 304 and bool(conditional)
+        if not_modified:
+            # Unchanged since the last audit: reuse its parse results; the 304's
+            # headers update the stored ones (RFC 9110 §15.4.5).
+            fetched["facts"] = snapshot["facts"]
+            headers = {**snapshot.get("headers", {}), **headers}
+            status = snapshot.get("status", 200)
+            content_length = snapshot.get("content_length", 0)
+            truncated = snapshot.get("truncated", False)
+            charset = snapshot.get("charset", "")
+        elif "html" not in needs:
+            pass
+        elif buffer_body:
+            fetched["body"] = body.body
+            fetched["content_type"] = body.content_type
+        else:
+            fetched["facts"] = page.facts()
+            fetched["links"] = page.links
+        fetched.update(
+            not_modified=not_modified,
+            status=status,
+            content_length=content_length,
+            transfer_bytes=transfer_bytes,
+            headers=headers,
+            truncated=truncated,
+            charset=charset,
+        )
+        resolved, dns_ms = dns_f.result()
+        timings.update(dns_ms=dns_ms if resolved else 0, **phases, page_fetch_ms=page_ms)
+        PROBE_SECONDS.observe(page_ms / 1000, probe="page")
+        PROBE_SECONDS.observe(dns_ms / 1000, probe="dns")
 
-    # Fetch
-    status, body, headers = _fetch(url)
-    metrics["status_code"] = status
-    metrics["content_length"] = len(body)
-    metrics["content_encoding"] = headers.get("content-encoding", "")
-    metrics["cache_control"] = headers.get("cache-control", "")
-    metrics["hsts"] = headers.get("strict-transport-security", "")
-    metrics["xcto"] = headers.get("x-content-type-options", "")
-    metrics["xfo"] = headers.get("x-frame-options", "")
-    metrics["csp"] = headers.get("content-security-policy", "")
-    metrics["set_cookie"] = headers.get("set-cookie", "")
-
-    text = _get_text(body)
-
-    # Parse HTML
-    collector = TagCollector()
-    try:
-        collector.feed(text)
-    except Exception:
-        # Continue even if parsing fails, we still have header-level metrics
-        pass
+    if robots_f is not None:
+        (fetched["robots_ok"], fetched["robots_status"]), timings["robots_fetch_ms"] = robots_f.result()
+        PROBE_SECONDS.observe(timings["robots_fetch_ms"] / 1000, probe="robots")
+    if "sitemap" in needs:
+        sitemap_results = [f.result() for f in sitemap_fs]
+        if sitemap_results:
+            sitemap_ok = any(ok for ok, _ in sitemap_results)
+            _sitemap_cache.set(origin, sitemap_ok)
+        else:
+            sitemap_ok = sitemap_cached
+        fetched["sitemap_ok"] = sitemap_ok
+        timings["sitemap_fetch_ms"] = max((ms for _, ms in sitemap_results), default=0)
+        for _, ms in sitemap_results:
+            PROBE_SECONDS.observe(ms / 1000, probe="sitemap")
+    timings["probes_wall_ms"] = int((time.perf_counter() - probes_start) * 1000)
+    fetched["timings"] = timings
+    return fetched
 
-    # Helper: return attrs for a given tag name
-    def tags(name: str):
-        return [a for t, a in collector.tags if t == name]
-
-    # Title extraction (regex fallback to be resilient)
-    titles = tags("title")
-    title_text = ""
-    if titles or text:
-        m = re.search(r"<title>(.*?)</title>", text, re.IGNORECASE | re.DOTALL)
-        title_text = (m.group(1).strip() if m else "")
-    metrics["title"] = title_text
-    metrics["title_length"] = len(title_text)
-
-    # Meta fields
-    metas = tags("meta")
-    meta_desc = ""
-    meta_robots = ""
-    for a in metas:
-        n = a.get("name", "")
-        prop = a.get("property", "")
-        if n == "description" or prop == "og:description":
-            meta_desc = a.get("content", "") or meta_desc
-        if n == "robots":
-            meta_robots = a.get("content", "") or meta_robots
-    metrics["meta_description_length"] = len(meta_desc)
-    metrics["meta_robots"] = meta_robots
-
-    # Canonical detection (support multi-rel values)
-    canonicals = []
-    for a in tags("link"):
-        rel = (a.get("rel", "") or "").lower()
-        if "canonical" in rel.split() or "canonical" in rel:
-            href = a.get("href", "")
-            if href:
-                canonicals.append(href)
-    metrics["canonical_present"] = bool(canonicals)
 
-    # Headings and images
-    h1s = tags("h1")
-    metrics["h1_count"] = len(h1s)
+def _stage_inputs(profile: str, collect_links: bool, collect_assets: bool):
+    """Inputs the profile's rules read, plus the parse that link/asset collection needs."""
+    needs = set(required_inputs(rules_for(profile)))
+    if collect_links or collect_assets:
+        needs.update(("html", "body", "headers"))
+    return needs
+
+
+def analyze_page(fetched: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    CPU stage of run_basic_checks: parse a buffered body (if any), derive the
+    metrics of the inputs _fetch_stage gathered and score them with the
+    profile's rules. A pure function of the _fetch_stage output, so it can
+    run in a worker process.
+    """
+    url = fetched["url"]
+    profile = fetched.get("profile", "full")
+    rules = rules_for(profile)
+    needs = _stage_inputs(profile, fetched["collect_links"], fetched.get("collect_assets", False))
+    collect_links = fetched["collect_links"]
+    collect_assets = fetched.get("collect_assets", False)
+    charset = fetched.get("charset", "")
+    page = None
+    if fetched.get("body") is not None:
+        page = PageAnalyzer(collect_links=collect_links, collect_assets=collect_assets)
+        stream = _HTMLStream(page, fetched.get("content_type", ""))
+        stream.write(fetched["body"])
+        stream.close()
+        charset = stream.charset
+    elif "html" in needs:
+        page = PageAnalyzer.from_facts(fetched.get("facts"))
+        page.links = fetched.get("links", [])
+        page.collect_assets = collect_assets
+    status = fetched.get("status")
+    headers = fetched.get("headers", {})
+
+    metrics: Dict[str, Any] = {"audit_profile": profile}
 
-    imgs = tags("img")
-    img_count = len(imgs)
-    img_missing_alt = sum(1 for a in imgs if not a.get("alt"))
-    metrics["image_count"] = img_count
-    metrics["images_without_alt"] = img_missing_alt
+    if "headers" in needs:
+        metrics["not_modified"] = fetched["not_modified"]
+        metrics["status_code"] = status
+        if "body" in needs:
+            metrics["content_length"] = fetched["content_length"]
+            metrics["transfer_bytes"] = fetched["transfer_bytes"]
+            metrics["body_truncated"] = fetched["truncated"]
+            metrics["charset"] = charset
+        metrics["content_encoding"] = headers.get("content-encoding", "")
+        metrics["cache_control"] = headers.get("cache-control", "")
+        metrics["hsts"] = headers.get("strict-transport-security", "")
+        metrics["xcto"] = headers.get("x-content-type-options", "")
+        metrics["xfo"] = headers.get("x-frame-options", "")
+        metrics["csp"] = headers.get("content-security-policy", "")
+        metrics["set_cookie"] = headers.get("set-cookie", "")
 
-    # Accessibility helpers
-    has_lang = any("lang" in a for t, a in collector.tags if t == "html")
-    has_viewport = any(a.get("name", "") == "viewport" for a in metas)
-    metrics["html_lang_present"] = has_lang
-    metrics["viewport_present"] = has_viewport
+    if page is not None:
+        metrics["title"] = page.title
+        metrics["title_length"] = len(page.title)
+        metrics["meta_description_length"] = len(page.meta_description)
+        metrics["meta_robots"] = page.meta_robots
+        metrics["canonical_present"] = page.canonical_present
+
+        # Headings and images
+        metrics["h1_count"] = page.h1_count
+        metrics["image_count"] = page.image_count
+        metrics["images_without_alt"] = page.images_without_alt
+
+        # Accessibility helpers
+        metrics["html_lang_present"] = page.html_lang_present
+        metrics["viewport_present"] = page.viewport_present
 
     # Robots & sitemap
-    robots_ok = _robots_allowed(url)
-    metrics["robots_allowed"] = robots_ok
-    sitemap_ok = _sitemap_present(url)
-    metrics["sitemap_present"] = sitemap_ok
+    if "robots" in needs:
+        metrics["robots_allowed"] = fetched["robots_ok"]
+        metrics["robots_status"] = fetched.get("robots_status", 200)
+    if "sitemap" in needs:
+        metrics["sitemap_present"] = fetched["sitemap_ok"]
 
     # Security heuristics
-    parsed = urlparse(url)
-    https = parsed.scheme.lower() == "https"
-    metrics["has_https"] = https
-
-    # ------------------------
-    # Scoring (balanced)
-    # ------------------------
-    # Performance: payload, compression, caching
-    perf = 100
-    size = metrics["content_length"]
-    if size == 0:
-        perf -= 30
-        issues.append("No content received; check availability and payload.")
-    elif size > 250_000:  # friendlier threshold for rich homepages
-        perf -= min(40, (size - 250_000) // 30_000)
-    if metrics["content_encoding"] not in ("gzip", "br", "deflate"):
-        perf -= 8
-        issues.append("Response not compressed (gzip/br/deflate).")
-    if not metrics["cache_control"]:
-        perf -= 8
-        issues.append("Missing Cache-Control headers.")
-    cats["Performance"] = _score_bounds(perf)
-
-    # Accessibility: alt text, viewport, lang, heading presence
-    acc = 100
-    if img_missing_alt > 0:
-        acc -= min(28, img_missing_alt * 2)
-        issues.append(f"{img_missing_alt} <img> tags without alt attribute.")
-    if not has_viewport:
-        acc -= 10
-        issues.append("No mobile viewport meta.")
-    if not has_lang:
-        acc -= 10
-        issues.append("<html lang> missing for language semantics.")
-    if metrics["h1_count"] == 0:
-        acc -= 10
-        issues.append("Missing <h1> heading.")
-    cats["Accessibility"] = _score_bounds(acc)
-
-    # SEO: title, description, canonical, robots/sitemap
-    seo = 100
-    tl = metrics["title_length"]
-    if tl == 0:
-        seo -= 18
-        issues.append("Missing <title> tag.")
-    elif tl < 12 or tl > 70:
-        seo -= 8
-        issues.append("Title length suboptimal (12–70 chars).")
-    mdl = metrics["meta_description_length"]
-    if mdl == 0:
-        seo -= 12
-        issues.append("Missing meta description.")
-    elif mdl < 40 or mdl > 170:
-        seo -= 4
-        issues.append("Meta description length suboptimal (40–170 chars).")
-    if not metrics["canonical_present"]:
-        seo -= 8
-        issues.append("Missing canonical link.")
-    if "noindex" in (metrics["meta_robots"] or "").lower():
-        seo -= 18
-        issues.append("Meta robots set to noindex.")
-    if not robots_ok:
-        seo -= 15
-        issues.append("robots.txt disallows all (User-agent: * / Disallow: /).")
-    if not sitemap_ok:
-        seo -= 5
-        issues.append("No sitemap.xml discovered.")
-    cats["SEO"] = _score_bounds(seo)
-
-    # Security: HTTPS, HSTS, headers
-    sec = 100
-    if not https:
-        sec -= 22
-        issues.append("Site not served over HTTPS.")
-    if not metrics["hsts"]:
-        sec -= 8
-        issues.append("Missing Strict-Transport-Security (HSTS).")
-    if (metrics["xcto"] or "").lower() != "nosniff":
-        sec -= 8
-        issues.append("Missing X-Content-Type-Options: nosniff.")
-    if not metrics["xfo"]:
-        sec -= 5
-        issues.append("Missing X-Frame-Options (clickjacking risk).")
-    if not metrics["csp"]:
-        sec -= 8
-        issues.append("Missing Content-Security-Policy.")
-    sc = metrics["set_cookie"] or ""
-    if sc and ("httponly" not in sc.lower() or "secure" not in sc.lower()):
-        sec -= 5
-        issues.append("Cookies missing Secure/HttpOnly flags.")
-    cats["Security"] = _score_bounds(sec)
-
-    # Best Practices: OpenGraph, favicon, landmarks
-    bp = 100
-    og_title = any(a.get("property", "") == "og:title" for a in metas)
-    og_image = any(a.get("property", "") == "og:image" for a in metas)
-    if not og_title or not og_image:
-        bp -= 5
-        issues.append("Missing OpenGraph tags (og:title/og:image).")
-    has_favicon = any("icon" in (a.get("rel", "") or "").lower() for a in tags("link"))
-    if not has_favicon:
-        bp -= 3
-        issues.append("No favicon link found.")
-    has_main = any(t == "main" for t, _ in collector.tags)
-    has_nav = any(t == "nav" for t, _ in collector.tags)
-    if not has_main:
-        bp -= 3
-        issues.append("No <main> landmark found.")
-    if not has_nav:
-        bp -= 2
-        issues.append("No <nav> landmark found.")
-    cats["BestPractices"] = _score_bounds(bp)
-
-    # If status indicates failure, soften scores but keep baseline
-    if status == 0 or status >= 400:
-        issues.append(f"HTTP status {status} detected; using heuristic baseline.")
-        cats["Performance"] = max(30, cats["Performance"] - 18)
-        cats["SEO"] = max(30, cats["SEO"] - 12)
+    metrics["has_https"] = urlparse(url).scheme.lower() == "https"
 
-    return {
+    # Per-probe timing
+    metrics.update(fetched["timings"])
+
+    cats, issues = score(metrics, page, rules)
+
+    page_snapshot = None
+    if page is not None and 200 <= status < 300 and (headers.get("etag") or headers.get("last-modified")):
+        page_snapshot = {
+            "url": url,
+            "etag": headers.get("etag", ""),
+            "last_modified": headers.get("last-modified", ""),
+            "status": status,
+            "content_length": fetched["content_length"],
+            "truncated": fetched["truncated"],
+            "charset": charset,
+            "headers": {k: headers[k] for k in SNAPSHOT_HEADERS if k in headers},
+            "facts": page.facts(),
+        }
+
+    result = {
         "category_scores": cats,
         "metrics": metrics,
         "top_issues": issues,
+        "page_snapshot": page_snapshot,
     }
+    if collect_links:
+        links = []
+        for href in page.links:
+            link = urldefrag(urljoin(url, href.strip()))[0]
+            if link.startswith(("http://", "https://")):
+                links.append(link)
+        result["links"] = links
+    if collect_assets:
+        result["assets"] = [list(a) for a in page.assets]
+    return result
 
 
-# ----------------------------
-# One-page competitor analysis
-# ----------------------------
-
-def run_competitor_analysis_one_page(target_url: str, competitor_urls: List[str]) -> Dict[str, Any]:
+def run_basic_checks(
+    url: str,
+    snapshot: Optional[Dict[str, Any]] = None,
+    collect_links: bool = False,
+    collect_assets: Optional[bool] = None,
+    profile: str = "full",
+) -> Dict[str, Any]:
     """
-    Compare the target URL against a list of competitor URLs using a single-page audit
-    (homepage or provided page only). Returns a structured comparative report.
+    Dependency-free heuristics for Performance, Accessibility, SEO, Security, BestPractices.
 
-    Args:
-        target_url: The site/page to benchmark.
-        competitor_urls: List of competitor sites/pages to compare.
+    `profile` names the rule set to score with (checks.PROFILES: "full",
+    "headers", "seo"); only the inputs those rules declare are fetched and
+    parsed, and categories without enabled rules keep the baseline score.
+
+    `snapshot` is the "page_snapshot" returned by a previous audit of the same
+    website. Its validators make the page fetch conditional; on 304 Not Modified
+    the stored HTML-derived facts are reused and only the headers are re-checked.
+    With collect_links=True the result also carries "links": absolute http(s)
+    URLs of the page's <a href> targets (used by the site crawler).
+    With collect_assets=True (default: AUDIT_ASSETS) the page's stylesheets,
+    scripts and images are sized too and the page-weight metrics of
+    assets.analyze_assets are added.
+
+    With AUDIT_PARSE_PROCESSES > 0 the body is buffered during the fetch and
+    bodies of at least AUDIT_PARSE_MIN_BYTES are parsed and scored in a worker
+    process, so the GIL-bound parse doesn't serialize concurrent audits.
 
     Returns:
         {
-            "target": { "url": str, "scores": {...}, "metrics": {...}, "issues": [...] , "total": int },
-            "competitors": [ { "url": str, "scores": {...}, "metrics": {...}, "issues": [...], "total": int }, ... ],
-            "comparison_table": [ { "url": str, "Performance": int, "Accessibility": int, "SEO": int, "Security": int, "BestPractices": int, "Total": int }, ... ],
-            "winners_by_category": { category: url },
-            "deltas_vs_target": { competitor_url: { category: int (competitor - target) } },
-            "key_findings": { "target_strengths": [str], "target_gaps": [str] }
+            "category_scores": { ... },
+            "metrics": { ... },        # raw technical metrics (keys align with main.py presenter)
+            "top_issues": [ ... ],     # concise text items shown in the UI list
+            "page_snapshot": { ... }   # validators + parse results for the next conditional audit (or None)
         }
     """
-    target_url = _normalize_url(target_url)
-    competitor_urls = [_normalize_url(u) for u in competitor_urls if u]
+    url = _normalize_url(url)
+    rules_for(profile)  # unknown profiles fail before any request is made
+    if collect_assets is None:
+        collect_assets = ANALYZE_ASSETS
+    pool = _get_parse_pool()
+    fetched = _fetch_stage(
+        url, snapshot, collect_links, buffer_body=pool is not None, collect_assets=collect_assets, profile=profile,
+    )
+    body = fetched.get("body")
+    result = None
+    if pool is not None and body is not None and len(body) >= PARSE_MIN_BYTES:
+        try:
+            result = pool.submit(analyze_page, fetched).result()
+        except BrokenProcessPool as e:
+            print(f"[engine] Parse process pool broken, parsing inline: {e}")
+            close_parse_pool()  # the next audit starts a fresh pool
+    if result is None:
+        result = analyze_page(fetched)
+    if collect_assets:
+        from .assets import analyze_assets  # assets.py builds on this module
+        result["metrics"].update(analyze_assets(url, result.pop("assets"), result["metrics"]["transfer_bytes"]))
+    return result
+
 
-    # Audit target
-    target_res = run_basic_checks(target_url)
-    target_entry = {
-        "url": target_url,
-        "scores": target_res["category_scores"],
-        "metrics": target_res["metrics"],
-        "issues": target_res["top_issues"],
-        "total": _total_score(target_res["category_scores"]),
+# ----------------------------
+# One-page competitor analysis
+# ----------------------------
+
+_competitor_pool = ThreadPoolExecutor(max_workers=COMPETITOR_WORKERS, thread_name_prefix="competitor")
+
+
+def _competitor_entry(url: str, res: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "url": url,
+        "scores": res["category_scores"],
+        "metrics": res["metrics"],
+        "issues": res["top_issues"],
+        "total": _total_score(res["category_scores"]),
     }
 
-    # Audit competitors
-    competitors: List[Dict[str, Any]] = []
-    for cu in competitor_urls:
-        res = run_basic_checks(cu)
-        competitors.append({
-            "url": cu,
-            "scores": res["category_scores"],
-            "metrics": res["metrics"],
-            "issues": res["top_issues"],
-            "total": _total_score(res["category_scores"]),
-        })
 
+def _compare(target_entry: Dict[str, Any], competitors: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Comparison table, winners, deltas and key findings for the audited entries so far."""
     # Build comparison table
     comparison_table: List[Dict[str, Any]] = []
     for entry in [target_entry] + competitors:
-        row = {
-            "url": entry["url"],
-            "Performance": entry["scores"].get("Performance", 0),
-            "Accessibility": entry["scores"].get("Accessibility", 0),
-            "SEO": entry["scores"].get("SEO", 0),
-            "Security": entry["scores"].get("Security", 0),
-            "BestPractices": entry["scores"].get("BestPractices", 0),
-            "Total": entry["total"],
-        }
+        row = {"url": entry["url"]}
+        for cat in CATEGORIES:
+            row[cat] = entry["scores"].get(cat, 0)
+        row["Total"] = entry["total"]
         comparison_table.append(row)
 
     # Determine winners by category
-    categories = ["Performance", "Accessibility", "SEO", "Security", "BestPractices"]
     winners_by_category: Dict[str, str] = {}
-    for cat in categories:
+    for cat in CATEGORIES:
         best_url = None
         best_score = -1
         for entry in [target_entry] + competitors:
@@ -443,17 +974,15 @@ def run_competitor_analysis_one_page(target_url: str, competitor_urls: List[str]
     # Deltas vs target for each competitor
     deltas_vs_target: Dict[str, Dict[str, int]] = {}
     for comp in competitors:
-        comp_url = comp["url"]
         deltas: Dict[str, int] = {}
-        for cat in categories:
+        for cat in CATEGORIES:
             deltas[cat] = comp["scores"].get(cat, 0) - target_entry["scores"].get(cat, 0)
-        deltas_vs_target[comp_url] = deltas
+        deltas_vs_target[comp["url"]] = deltas
 
     # Key findings: strengths and gaps for the target
     strengths: List[str] = []
     gaps: List[str] = []
-    for cat in categories:
-        winner = winners_by_category.get(cat)
+    for cat in CATEGORIES:
         target_score = target_entry["scores"].get(cat, 0)
         # Strength: target is winner (or tied for max)
         max_score = max(row[cat] for row in comparison_table)
@@ -478,6 +1007,79 @@ def run_competitor_analysis_one_page(target_url: str, competitor_urls: List[str]
     }
 
 
+def iter_competitor_analysis(
+    target_url: str,
+    competitor_urls: List[str],
+    audit_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Audit the target and all competitors concurrently (bounded by
+    COMPETITOR_WORKERS) and yield a partial report each time a competitor
+    finishes once the target is known; the last report is complete.
+
+    `audit_fn(url) -> run_basic_checks-style result` lets callers plug in a
+    cached audit; it defaults to run_basic_checks. Each report has the shape of
+    run_competitor_analysis_one_page() plus "progress": {"done", "total"}.
+    """
+    audit_fn = audit_fn or run_basic_checks
+    target_url = _normalize_url(target_url)
+    competitor_urls = [_normalize_url(u) for u in competitor_urls if u]
+
+    target_f = _competitor_pool.submit(audit_fn, target_url)
+    futures = {target_f: -1}
+    for i, cu in enumerate(competitor_urls):
+        futures[_competitor_pool.submit(audit_fn, cu)] = i
+
+    target_entry = None
+    finished: Dict[int, Dict[str, Any]] = {}
+    try:
+        for fut in as_completed(futures):
+            idx = futures[fut]
+            if idx < 0:
+                target_entry = _competitor_entry(target_url, fut.result())
+            else:
+                finished[idx] = _competitor_entry(competitor_urls[idx], fut.result())
+            if target_entry is None:
+                continue
+            report = _compare(target_entry, [finished[i] for i in sorted(finished)])
+            report["progress"] = {"done": len(finished), "total": len(competitor_urls)}
+            yield report
+    finally:
+        for fut in futures:
+            fut.cancel()
+
+
+def run_competitor_analysis_one_page(
+    target_url: str,
+    competitor_urls: List[str],
+    audit_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Compare the target URL against a list of competitor URLs using a single-page audit
+    (homepage or provided page only). Returns a structured comparative report.
+
+    Args:
+        target_url: The site/page to benchmark.
+        competitor_urls: List of competitor sites/pages to compare.
+        audit_fn: Optional replacement for run_basic_checks (e.g. a cached audit).
+
+    Returns:
+        {
+            "target": { "url": str, "scores": {...}, "metrics": {...}, "issues": [...] , "total": int },
+            "competitors": [ { "url": str, "scores": {...}, "metrics": {...}, "issues": [...], "total": int }, ... ],
+            "comparison_table": [ { "url": str, "Performance": int, "Accessibility": int, "SEO": int, "Security": int, "BestPractices": int, "Total": int }, ... ],
+            "winners_by_category": { category: url },
+            "deltas_vs_target": { competitor_url: { category: int (competitor - target) } },
+            "key_findings": { "target_strengths": [str], "target_gaps": [str] }
+        }
+    """
+    report: Dict[str, Any] = {}
+    for report in iter_competitor_analysis(target_url, competitor_urls, audit_fn):
+        pass
+    report.pop("progress", None)
+    return report
+
+
 if __name__ == "__main__":
     # Example quick run (manually):
     # python engine.py
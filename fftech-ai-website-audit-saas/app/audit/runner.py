@@ -0,0 +1,245 @@
+# runner.py — URL resolution, robust single-URL audits and the shared result cache
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+import json
+import os
+import time
+
+from ..cache import TTLCache, SingleFlight
+from ..telemetry import AUDIT_SECONDS, AUDITS_TOTAL
+from .engine import run_basic_checks, _probe, TIMEOUT_S
+from .grader import compute_overall, grade_from_score, summarize_200_words
+
+VARIANT_RACE_WORKERS = int(os.getenv("VARIANT_RACE_WORKERS", "32"))
+
+# Shared audit-result cache (per process), keyed by normalized URL
+AUDIT_CACHE_SIZE          = int(os.getenv("AUDIT_CACHE_SIZE", "2048"))
+AUDIT_CACHE_MAX_BYTES     = int(os.getenv("AUDIT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+AUDIT_CACHE_TTL_S         = float(os.getenv("AUDIT_CACHE_TTL_S", "600"))
+AUDIT_CACHE_FALLBACK_TTL_S = float(os.getenv("AUDIT_CACHE_FALLBACK_TTL_S", "30"))
+
+
+# ----------------------------
+# URL normalization & variants
+# ----------------------------
+
+def normalize_url(raw: str) -> str:
+    if not raw:
+        return raw
+    s = raw.strip()
+    if not s:
+        return s
+    p = urlparse(s)
+    if not p.scheme:
+        s = "https://" + s
+        p = urlparse(s)
+    if not p.netloc and p.path:
+        s = f"{p.scheme}://{p.path}"
+        p = urlparse(s)
+    path = p.path or "/"
+    return f"{p.scheme}://{p.netloc}{path}"
+
+
+def url_variants(u: str) -> list:
+    p = urlparse(u)
+    host = p.netloc
+    path = p.path or "/"
+    scheme = p.scheme
+
+    candidates = [f"{scheme}://{host}{path}"]
+    if host.startswith("www."):
+        candidates.append(f"{scheme}://{host[4:]}{path}")
+    else:
+        candidates.append(f"{scheme}://www.{host}{path}")
+    candidates.append(f"http://{host}{path}")
+    if host.startswith("www."):
+        candidates.append(f"http://{host[4:]}{path}")
+    else:
+        candidates.append(f"http://www.{host}{path}")
+    if not path.endswith("/"):
+        candidates.append(f"{scheme}://{host}{path}/")
+    seen, ordered = set(), []
+    for c in candidates:
+        if c not in seen:
+            ordered.append(c); seen.add(c)
+    return ordered
+
+
+def fallback_result(url: str) -> dict:
+    return {
+        "category_scores": {
+            "Performance": 65,
+            "Accessibility": 72,
+            "SEO": 68,
+            "Security": 70,
+            "BestPractices": 66,
+        },
+        "metrics": {
+            "error": "Fetch failed or blocked",
+            "normalized_url": url,
+        },
+        "top_issues": [
+            "Fetch failed; using heuristic baseline.",
+            "Verify URL is publicly accessible and not blocked by WAF/robots.",
+        ],
+    }
+
+
+# ----------------------------
+# Robust audit
+# ----------------------------
+
+_variant_pool = ThreadPoolExecutor(max_workers=VARIANT_RACE_WORKERS, thread_name_prefix="variant-race")
+
+
+def resolve_variant(base: str) -> Optional[str]:
+    """
+    Probe every URL variant concurrently and return the redirect target of
+    the first healthy (2xx/3xx) one in url_variants order (https first), so
+    the audited URL does not depend on which variant happens to answer
+    fastest. Returns as soon as every more-preferred variant has failed.
+    If none is healthy, prefer the first variant that answered at all; None
+    when the host is unreachable under every variant.
+    """
+    candidates = url_variants(base)
+    futures = {_variant_pool.submit(_probe, c): i for i, c in enumerate(candidates)}
+    outcomes: Dict[int, Tuple[int, str]] = {}
+    try:
+        for fut in as_completed(futures, timeout=2 * TIMEOUT_S):
+            outcomes[futures[fut]] = fut.result()
+            for i in range(len(candidates)):
+                if i not in outcomes:
+                    break  # a more-preferred variant may still come back healthy
+                status, final_url = outcomes[i]
+                if 200 <= status < 400:
+                    return normalize_url(final_url)
+    except FuturesTimeout:
+        pass
+    finally:
+        for fut in futures:
+            fut.cancel()
+    for i in sorted(outcomes):
+        status, final_url = outcomes[i]
+        if 200 <= status < 400:
+            return normalize_url(final_url)
+    for i in sorted(outcomes):
+        if outcomes[i][0]:
+            return candidates[i]
+    return None
+
+
+def _audit_variants(url: str, snapshot: Optional[Dict[str, Any]], profile: str = "full") -> Tuple[str, str, dict]:
+    """(outcome, url, result) where outcome is "success", "fallback" or "error"."""
+    base = normalize_url(url)
+    candidate = resolve_variant(base)
+    if not candidate:
+        return "fallback", base, fallback_result(base)
+    try:
+        res = run_basic_checks(candidate, snapshot, profile=profile)
+        cats = res.get("category_scores") or {}
+        if cats and sum(int(v) for v in cats.values()) > 0:
+            return "success", candidate, res
+    except Exception as e:
+        print(f"[audit] Checks failed for {candidate}: {e}")
+        return "error", base, fallback_result(base)
+    return "fallback", base, fallback_result(base)
+
+
+def robust_audit(url: str, snapshot: Optional[Dict[str, Any]] = None, profile: str = "full") -> Tuple[str, dict]:
+    start = time.perf_counter()
+    outcome, normalized, res = _audit_variants(url, snapshot, profile)
+    AUDITS_TOTAL.inc(outcome=outcome)
+    AUDIT_SECONDS.observe(time.perf_counter() - start, outcome=outcome)
+    return normalized, res
+
+
+# ----------------------------
+# Shared result cache
+# ----------------------------
+
+def _approx_size(entry: Tuple[str, dict]) -> int:
+    return len(json.dumps(entry, default=str))
+
+
+_results = TTLCache(
+    maxsize=AUDIT_CACHE_SIZE,
+    ttl=AUDIT_CACHE_TTL_S,
+    max_weight=AUDIT_CACHE_MAX_BYTES,
+    weigher=_approx_size,
+)
+_in_flight = SingleFlight()
+
+
+def _audit_and_store(key: Tuple[str, str], snapshot: Optional[Dict[str, Any]]) -> Tuple[str, dict]:
+    normalized, res = robust_audit(key[0], snapshot, profile=key[1])
+    failed = "error" in res.get("metrics", {})
+    _results.set(key, (normalized, res), ttl=AUDIT_CACHE_FALLBACK_TTL_S if failed else None)
+    return normalized, res
+
+
+def cached_audit(url: str, snapshot: Optional[Dict[str, Any]] = None, profile: str = "full") -> Tuple[str, dict]:
+    """
+    robust_audit() behind a TTL/LRU cache keyed by normalized URL and check
+    profile. Concurrent callers for the same key share one in-flight audit.
+    Fallback results are only kept briefly. The returned result is shared:
+    treat it as read-only.
+    """
+    key = (normalize_url(url), profile)
+    hit = _results.get(key)
+    if hit is not None:
+        return hit
+    return _in_flight.do(key, _audit_and_store, key, snapshot)
+
+
+def cached_checks(url: str) -> dict:
+    """cached_audit() shaped like run_basic_checks (result dict only)."""
+    return cached_audit(url)[1]
+
+
+def cache_stats() -> Dict[str, int]:
+    """Result-cache counters plus the number of coalesced callers."""
+    stats = _results.stats()
+    stats["coalesced"] = _in_flight.coalesced
+    stats["in_flight"] = _in_flight.in_flight()
+    return stats
+
+
+# ----------------------------
+# Persistence helpers
+# ----------------------------
+
+def website_snapshot(website) -> Optional[Dict[str, Any]]:
+    """Conditional-fetch snapshot stored on a Website row (see run_basic_checks)."""
+    if not website.page_snapshot_json:
+        return None
+    snapshot = json.loads(website.page_snapshot_json)
+    snapshot.update(etag=website.etag, last_modified=website.last_modified)
+    return snapshot
+
+
+def audit_fields(normalized: str, res: dict) -> Dict[str, Any]:
+    """
+    Grade a result and return the Audit column values derived from it. Its
+    category scores and metrics go to audit_metrics (metric_store.metric_rows).
+    """
+    category_scores_dict = res["category_scores"]
+    overall = compute_overall(category_scores_dict)
+    top_issues = res.get("top_issues", [])
+    return {
+        "health_score": int(overall),
+        "grade": grade_from_score(overall),
+        "exec_summary": summarize_200_words(normalized, category_scores_dict, top_issues),
+    }
+
+
+def snapshot_fields(res: dict) -> Dict[str, Any]:
+    """Website column values for the result's page snapshot ({} when there is none)."""
+    snapshot = dict(res.get("page_snapshot") or {})
+    if not snapshot:
+        return {}
+    return {
+        "etag": snapshot.pop("etag", "") or None,
+        "last_modified": snapshot.pop("last_modified", "") or None,
+        "page_snapshot_json": json.dumps(snapshot),
+    }
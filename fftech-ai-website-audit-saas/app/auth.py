@@ -1,15 +1,33 @@
 import os
+import asyncio
 import hashlib
 import hmac
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import jwt
 
+from .cache import TTLCache
+from .telemetry import AUTH_REJECTED_TOTAL
+
 JWT_SECRET = os.getenv('JWT_SECRET', 'change-me-please')
 JWT_ALGO   = os.getenv('JWT_ALGO', 'HS256')
 
 SALT = os.getenv('AUTH_SALT', 'fftech_salt').encode()
 ITERATIONS = int(os.getenv('AUTH_ITERATIONS', '200000'))
 
+# PBKDF2 releases the GIL, so a small thread pool hashes in parallel off the event loop
+AUTH_HASH_WORKERS  = int(os.getenv('AUTH_HASH_WORKERS', '4'))
+AUTH_HASH_INFLIGHT = int(os.getenv('AUTH_HASH_INFLIGHT', '32'))  # queued + running; beyond this, reject
+
+# Token buckets: BURST attempts at once, refilled at PER_MIN per minute
+LOGIN_IP_BURST       = int(os.getenv('LOGIN_IP_BURST', '20'))
+LOGIN_IP_PER_MIN     = float(os.getenv('LOGIN_IP_PER_MIN', '10'))
+LOGIN_EMAIL_BURST    = int(os.getenv('LOGIN_EMAIL_BURST', '5'))
+LOGIN_EMAIL_PER_MIN  = float(os.getenv('LOGIN_EMAIL_PER_MIN', '2'))
+
 def hash_password(plain: str) -> str:
     dk = hashlib.pbkdf2_hmac('sha256', plain.encode(), SALT, ITERATIONS)
     return f"pbkdf2_sha256${ITERATIONS}${dk.hex()}"
@@ -24,6 +42,82 @@ def verify_password(plain: str, stored: str) -> bool:
     except Exception:
         return False
 
+# ----------------------------
+# Hashing off the event loop
+# ----------------------------
+
+class Overloaded(Exception):
+    """Raised when a password operation is refused by admission control."""
+
+
+_hash_pool = ThreadPoolExecutor(max_workers=AUTH_HASH_WORKERS, thread_name_prefix='auth-hash')
+_hash_slots = threading.BoundedSemaphore(AUTH_HASH_INFLIGHT)
+
+
+async def _run_hash(fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        AUTH_REJECTED_TOTAL.inc(reason='busy')
+        raise Overloaded('password hashing is saturated')
+    try:
+        fut = _hash_pool.submit(fn, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    fut.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(fut)
+
+
+async def hash_password_async(plain: str) -> str:
+    """hash_password on the bounded hash pool; raises Overloaded when it is full."""
+    return await _run_hash(hash_password, plain)
+
+
+async def verify_password_async(plain: str, stored: str) -> bool:
+    """verify_password on the bounded hash pool; raises Overloaded when it is full."""
+    return await _run_hash(verify_password, plain, stored)
+
+
+def close_hash_pool() -> None:
+    _hash_pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ----------------------------
+# Login admission control
+# ----------------------------
+
+# (tokens, updated_at) per key; an entry idle long enough to refill completely
+# is indistinguishable from a missing one, so the TTL doubles as cleanup
+_buckets = TTLCache(maxsize=100_000, ttl=3600)
+_buckets_lock = threading.Lock()
+
+
+def _take(key: tuple, burst: int, per_min: float, now: float) -> bool:
+    tokens, updated = _buckets.get(key) or (float(burst), now)
+    tokens = min(float(burst), tokens + (now - updated) * per_min / 60.0)
+    if tokens < 1.0:
+        _buckets.set(key, (tokens, now))
+        return False
+    _buckets.set(key, (tokens - 1.0, now))
+    return True
+
+
+def admit(action: str, ip: Optional[str], email: Optional[str]) -> bool:
+    """
+    Spend one token from the client IP's bucket, then the email's, for
+    `action` ("login", "register", "admin_login"). False means reject before
+    any hashing; the email bucket is only charged once the IP bucket passed.
+    """
+    now = time.monotonic()
+    with _buckets_lock:
+        if ip and not _take((action, 'ip', ip), LOGIN_IP_BURST, LOGIN_IP_PER_MIN, now):
+            AUTH_REJECTED_TOTAL.inc(reason='ip')
+            return False
+        if email and not _take((action, 'email', email.strip().lower()), LOGIN_EMAIL_BURST, LOGIN_EMAIL_PER_MIN, now):
+            AUTH_REJECTED_TOTAL.inc(reason='email')
+            return False
+    return True
+
+
 def create_token(payload: dict, expires_minutes: int = 60) -> str:
     now = int(time.time())
     exp = now + expires_minutes * 60
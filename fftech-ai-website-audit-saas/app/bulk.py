@@ -0,0 +1,244 @@
+# app/bulk.py — bulk audit submission: parse URL lists, bounded-concurrency pipeline, batched persistence
+import csv
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, update
+
+from .cache import TTLCache
+from .db import SessionLocal
+from .models import Website, Audit, Subscription
+from . import metric_store
+from .audit.runner import cached_audit, normalize_url, audit_fields, snapshot_fields
+from .jobs import plan_profile, remaining_audits
+
+BULK_WORKERS      = int(os.getenv("BULK_WORKERS", "16"))
+BULK_CONCURRENCY  = int(os.getenv("BULK_CONCURRENCY", "4"))  # audits in flight per job on the shared pool
+BULK_COMMIT_BATCH = int(os.getenv("BULK_COMMIT_BATCH", "100"))
+BULK_MAX_URLS     = int(os.getenv("BULK_MAX_URLS", "10000"))
+
+_bulk_pool = ThreadPoolExecutor(max_workers=BULK_WORKERS, thread_name_prefix="bulk-audit")
+_jobs = TTLCache(maxsize=1024, ttl=7 * 24 * 3600)
+
+
+# ----------------------------
+# Input parsing
+# ----------------------------
+
+def parse_url_list(raw: Any) -> List[str]:
+    """
+    Accept a JSON list (or {"urls": [...]}), a CSV (a "url" column, else the
+    first column) or plain text with one URL per line. Returns normalized,
+    de-duplicated URLs in input order, capped at BULK_MAX_URLS.
+    """
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8-sig", errors="ignore")
+    items: List[str] = []
+    if isinstance(raw, (list, dict)):
+        data = raw.get("urls", []) if isinstance(raw, dict) else raw
+        items = [str(u) for u in data if u]
+    elif isinstance(raw, str):
+        text = raw.strip()
+        if text.startswith(("[", "{")):
+            return parse_url_list(json.loads(text))
+        rows = list(csv.reader(io.StringIO(text)))
+        col = 0
+        if rows and any(h.strip().lower() == "url" for h in rows[0]):
+            col = [h.strip().lower() for h in rows[0]].index("url")
+            rows = rows[1:]
+        items = [r[col] for r in rows if len(r) > col]
+
+    seen, urls = set(), []
+    for u in items:
+        u = normalize_url(u.strip())
+        if u and u not in seen:
+            seen.add(u); urls.append(u)
+    return urls[:BULK_MAX_URLS]
+
+
+# ----------------------------
+# Job tracking
+# ----------------------------
+
+class BulkJob:
+    """Progress counters of one bulk submission (thread-safe)."""
+    def __init__(self, user_id: int, total: int):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.done += 1
+            else:
+                self.failed += 1
+
+    def abort(self, error: str) -> None:
+        """Count everything not yet recorded as failed."""
+        with self._lock:
+            self.error = error
+            self.failed = self.total - self.done
+
+    def progress(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self.done + self.failed
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+            throughput = completed / elapsed if elapsed > 0 else 0.0
+            pending = self.total - completed
+            if not pending:
+                eta = 0.0
+            else:
+                eta = round(pending / throughput, 1) if throughput else None
+            return {
+                "job_id": self.id,
+                "status": "finished" if self.finished_at else "running",
+                "total": self.total,
+                "done": self.done,
+                "failed": self.failed,
+                "pending": pending,
+                "elapsed_s": round(elapsed, 1),
+                "throughput_per_s": round(throughput, 2),
+                "eta_s": eta,
+                "error": self.error,
+            }
+
+
+def get_bulk_job(job_id: str, user_id: int) -> Optional[BulkJob]:
+    job = _jobs.get(job_id)
+    if job is None or job.user_id != user_id:
+        return None
+    return job
+
+
+# ----------------------------
+# Pipeline
+# ----------------------------
+
+def _audit_one(website_id: int, url: str, profile: str):
+    normalized, res = cached_audit(url, profile=profile)
+    return website_id, normalized, res
+
+
+def _flush(db, user_id: int, audits: List[Dict[str, Any]], websites: List[Dict[str, Any]], results: List[dict]) -> None:
+    """Persist one batch of finished audits and their audit_metrics rows with a single commit."""
+    if not audits:
+        return
+    ids = db.scalars(insert(Audit).returning(Audit.id, sort_by_parameter_order=True), audits).all()
+    metric_store.save(db, [
+        row
+        for audit_id, a, res in zip(ids, audits, results)
+        for row in metric_store.metric_rows(
+            audit_id, user_id, a["website_id"], a["created_at"], res["category_scores"], res.get("metrics", {}),
+        )
+    ])
+    db.execute(update(Website), websites)
+    db.query(Subscription).filter(Subscription.user_id == user_id).update(
+        {Subscription.audits_used: Subscription.audits_used + len(audits)},
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def _commit(db, job: BulkJob, audits: List[Dict[str, Any]], websites: List[Dict[str, Any]],
+            results: List[dict]) -> None:
+    """Flush a batch, then count it on the job: successes only once they are persisted."""
+    try:
+        _flush(db, job.user_id, audits, websites, results)
+    except Exception as e:
+        db.rollback()
+        print(f"[bulk] Job {job.id} lost a batch of {len(audits)} audits: {e}")
+        for _ in audits:
+            job.record(False)
+        return
+    for res in results:
+        job.record("error" not in res.get("metrics", {}))
+
+
+def _run(job: BulkJob, targets: List[tuple], profile: str) -> None:
+    db = SessionLocal()
+    audits: List[Dict[str, Any]] = []
+    websites: List[Dict[str, Any]] = []
+    results: List[dict] = []
+    try:
+        # Feed the shared pool at most BULK_CONCURRENCY audits at a time, so a
+        # large upload doesn't queue in front of every other job
+        todo = iter(targets)
+        in_flight = set()
+        while True:
+            for wid, url in islice(todo, max(1, BULK_CONCURRENCY) - len(in_flight)):
+                in_flight.add(_bulk_pool.submit(_audit_one, wid, url, profile))
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                try:
+                    website_id, normalized, res = fut.result()
+                except Exception:
+                    job.record(False)
+                    continue
+                fields = audit_fields(normalized, res)
+                now = datetime.now(timezone.utc)
+                audits.append({"user_id": job.user_id, "website_id": website_id, "created_at": now, **fields})
+                websites.append({"id": website_id, "last_audit_at": now, "last_grade": fields["grade"], **snapshot_fields(res)})
+                results.append(res)
+                if len(audits) >= BULK_COMMIT_BATCH:
+                    _commit(db, job, audits, websites, results)
+                    audits, websites, results = [], [], []
+        _commit(db, job, audits, websites, results)
+    except Exception as e:
+        print(f"[bulk] Job {job.id} aborted: {e}")
+        db.rollback()
+        job.abort(str(e))
+    finally:
+        db.close()
+        job.finished_at = time.monotonic()
+
+
+class QuotaExceeded(Exception):
+    def __init__(self, remaining: int):
+        super().__init__(f"only {remaining} audits left on this plan")
+        self.remaining = remaining
+
+
+def start_bulk_job(user_id: int, urls: List[str]) -> BulkJob:
+    """
+    Create Website rows for `urls` in one INSERT, then audit them in the
+    background through the shared bulk pool (BULK_WORKERS), at most
+    BULK_CONCURRENCY at a time per job, committing results in batches of
+    BULK_COMMIT_BATCH. Returns immediately with the job handle.
+    Raises QuotaExceeded when the user's plan has fewer audits left than URLs.
+    """
+    db = SessionLocal()
+    try:
+        sub = db.query(Subscription).filter(Subscription.user_id == user_id).first()
+        remaining = remaining_audits(sub)
+        if remaining is not None and len(urls) > remaining:
+            raise QuotaExceeded(remaining)
+        profile = plan_profile(sub)
+        ids = db.scalars(
+            insert(Website).returning(Website.id, sort_by_parameter_order=True),
+            [{"user_id": user_id, "url": u} for u in urls],
+        ).all()
+        db.commit()
+    finally:
+        db.close()
+
+    job = BulkJob(user_id, len(urls))
+    _jobs.set(job.id, job)
+    threading.Thread(target=_run, args=(job, list(zip(ids, urls)), profile), name=f"bulk-{job.id[:8]}", daemon=True).start()
+    return job
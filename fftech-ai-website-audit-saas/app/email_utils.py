@@ -1,9 +1,18 @@
 
 # fftech_website_audit_saas/app/email_utils.py
 import os
+import queue
+import random
 import smtplib
+import socket
+import threading
+import time
+from concurrent.futures import Future
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import Optional
+
+from .telemetry import count_email
 
 UI_BRAND_NAME = os.getenv("UI_BRAND_NAME", "FF Tech")
 BASE_URL      = os.getenv("BASE_URL", "http://localhost:8000")
@@ -15,19 +24,265 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")          # app password if MFA enable
 
 DEBUG_SMTP    = bool(os.getenv("DEBUG_SMTP", "0") in ("1", "true", "TRUE"))
 
+# Shared delivery: each worker keeps one authenticated connection open across messages
+MAIL_WORKERS            = int(os.getenv("MAIL_WORKERS", "2"))       # concurrent SMTP connections
+MAIL_QUEUE_SIZE         = int(os.getenv("MAIL_QUEUE_SIZE", "10000"))
+MAIL_MAX_ATTEMPTS       = int(os.getenv("MAIL_MAX_ATTEMPTS", "4"))
+MAIL_BACKOFF_BASE_S     = float(os.getenv("MAIL_BACKOFF_BASE_S", "2"))
+MAIL_IDLE_S             = float(os.getenv("MAIL_IDLE_S", "30"))     # close a connection unused this long
+MAIL_MAX_PER_CONNECTION = int(os.getenv("MAIL_MAX_PER_CONNECTION", "100"))
+MAIL_TIMEOUT_S          = float(os.getenv("MAIL_TIMEOUT_S", "15"))
+
+
+def smtp_configured() -> bool:
+    return bool(SMTP_HOST and SMTP_USER and SMTP_PASSWORD)
+
+
+def build_message(sender: str, to_email: str, subject: str, html_body: str) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"]    = sender
+    msg["To"]      = to_email
+    msg.attach(MIMEText(html_body, "html"))
+    return msg
+
+
+def _permanent(e: Exception) -> bool:
+    """5xx replies and auth/feature errors won't succeed on a retry; drops and 4xx might."""
+    if isinstance(e, (smtplib.SMTPAuthenticationError, smtplib.SMTPNotSupportedError)):
+        return True
+    if isinstance(e, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in e.recipients.values())
+    if isinstance(e, smtplib.SMTPResponseException):
+        return e.smtp_code >= 500
+    return False
+
+
+def _hint(e: Exception, port: int) -> str:
+    if isinstance(e, smtplib.SMTPAuthenticationError):
+        return " If using Gmail/Outlook with MFA, generate an App Password and use it here."
+    if isinstance(e, smtplib.SMTPConnectError):
+        return f" Check firewall/ISP, and ensure port {port} is allowed."
+    if isinstance(e, smtplib.SMTPServerDisconnected):
+        return " Check encryption (STARTTLS vs SSL) and correct port."
+    return ""
+
+
+class Mailer:
+    """
+    Queued SMTP delivery on `workers` background threads. Each thread holds
+    one connection (STARTTLS or implicit SSL on 465, then login) and reuses
+    it for up to MAIL_MAX_PER_CONNECTION messages, closing it after
+    MAIL_IDLE_S without work. Transient failures (dropped connections, 4xx)
+    reconnect and retry with exponential backoff up to `max_attempts`.
+    Host, port and credentials are injectable so a local SMTP stand-in
+    (benchmarks/smtp_server.py) can replace the real relay.
+    """
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        sender: Optional[str] = None,
+        workers: int = MAIL_WORKERS,
+        starttls: Optional[bool] = None,
+        max_attempts: int = MAIL_MAX_ATTEMPTS,
+        backoff_base_s: float = MAIL_BACKOFF_BASE_S,
+    ):
+        self.host = host or SMTP_HOST
+        self.port = port or SMTP_PORT
+        self.user = user if user is not None else SMTP_USER
+        self.password = password if password is not None else SMTP_PASSWORD
+        self.sender = sender or self.user or f"no-reply@{socket.getfqdn()}"
+        self.starttls = (self.port != 465) if starttls is None else starttls
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base_s = backoff_base_s
+        self.connections = 0  # opened so far (observability / benchmarks)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=MAIL_QUEUE_SIZE)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    # ---- connection ----
+    def _connect(self) -> smtplib.SMTP:
+        if self.port == 465:
+            conn = smtplib.SMTP_SSL(self.host, self.port, timeout=MAIL_TIMEOUT_S)
+        else:
+            conn = smtplib.SMTP(self.host, self.port, timeout=MAIL_TIMEOUT_S)
+        try:
+            if DEBUG_SMTP: conn.set_debuglevel(1)
+            conn.ehlo()
+            if self.starttls:
+                conn.starttls()
+                conn.ehlo()
+            if self.user and self.password:
+                conn.login(self.user, self.password)
+        except Exception:
+            _close(conn)
+            raise
+        with self._lock:
+            self.connections += 1
+        return conn
+
+    # ---- workers ----
+    def _start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"mailer-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _deliver(self, conn: Optional[smtplib.SMTP], to_email: str, msg: MIMEMultipart):
+        """Send with retries; returns (connection to keep or None, ok)."""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                if conn is None:
+                    conn = self._connect()
+                conn.sendmail(self.sender, [to_email], msg.as_string())
+                return conn, True
+            except Exception as e:
+                if conn is not None and isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+                    try:
+                        conn.rset()  # the connection is fine; clear the failed transaction
+                    except Exception:
+                        conn = _close(conn)
+                else:
+                    conn = _close(conn)
+                if _permanent(e) or attempt == self.max_attempts:
+                    print(f"[email] Giving up on {to_email} after {attempt} attempt(s): {e!r}{_hint(e, self.port)}")
+                    return conn, False
+                # A pooled connection the server dropped while idle is retried at once
+                if attempt > 1 or not isinstance(e, smtplib.SMTPServerDisconnected):
+                    time.sleep(self.backoff_base_s * (2 ** (attempt - 1)) * random.uniform(0.8, 1.2))
+        return conn, False
+
+    def _run(self) -> None:
+        conn: Optional[smtplib.SMTP] = None
+        sent_on_conn = 0
+        while True:
+            try:
+                item = self._queue.get(timeout=MAIL_IDLE_S)
+            except queue.Empty:
+                conn = _close(conn, quit=True)
+                continue
+            if item is None:
+                _close(conn, quit=True)
+                return
+            to_email, msg, fut = item
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                before = conn
+                conn, ok = self._deliver(conn, to_email, msg)
+                sent_on_conn = sent_on_conn + 1 if conn is before else 1
+                if conn is not None and sent_on_conn >= MAIL_MAX_PER_CONNECTION:
+                    conn = _close(conn, quit=True)
+                fut.set_result(ok)
+            except Exception as e:  # never let a worker thread die
+                conn = _close(conn)
+                fut.set_result(False)
+                print(f"[email] Mailer worker error: {e!r}")
+
+    # ---- API ----
+    def submit(self, to_email: str, subject: str, html_body: str, kind: str = "other", block: bool = False) -> "Future[bool]":
+        """
+        Queue one HTML email; the future resolves to True once the relay
+        accepted it, or to False at once when the queue is full. With
+        block=True (background threads only) a full queue is waited on instead.
+        """
+        fut: "Future[bool]" = Future()
+        fut.add_done_callback(lambda f: f.cancelled() or count_email(kind, f.result()))
+        if not self.host:
+            fut.set_result(False)
+            return fut
+        self._start()
+        item = (to_email, build_message(self.sender, to_email, subject, html_body), fut)
+        if block:
+            self._queue.put(item)
+            return fut
+        try:
+            # Never block by default: callers include async route handlers on the event loop
+            self._queue.put_nowait(item)
+        except queue.Full:
+            print(f"[email] Queue full ({MAIL_QUEUE_SIZE}); dropped {kind} email to {to_email}")
+            fut.set_result(False)
+        return fut
+
+    def send(self, to_email: str, subject: str, html_body: str, kind: str = "other") -> bool:
+        """submit() and wait (for threads that may block)."""
+        return self.submit(to_email, subject, html_body, kind).result()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Deliver what is queued, then close the connections (app shutdown)."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        deadline = time.monotonic() + timeout
+        for t in threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+
+
+def _close(conn: Optional[smtplib.SMTP], quit: bool = False) -> None:
+    """Close a connection quietly; always returns None (for `conn = _close(conn)`)."""
+    if conn is not None:
+        try:
+            conn.quit() if quit else conn.close()
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+    return None
+
+
+_mailer: Optional[Mailer] = None
+_mailer_lock = threading.Lock()
+
+
+def get_mailer() -> Mailer:
+    """The process-wide Mailer built from the SMTP_* settings."""
+    global _mailer
+    if _mailer is None:
+        with _mailer_lock:
+            if _mailer is None:
+                _mailer = Mailer()
+    return _mailer
+
+
+def close_mailer() -> None:
+    global _mailer
+    with _mailer_lock:
+        mailer, _mailer = _mailer, None
+    if mailer is not None:
+        mailer.close()
+
+
+def send_email(to_email: str, subject: str, html_body: str, kind: str = "other", block: bool = False) -> "Future[bool]":
+    """
+    Queue an HTML email on the shared Mailer; resolves to False right away
+    without SMTP settings. block=True waits for room in a full queue.
+    """
+    if not smtp_configured():
+        print("[email] Missing SMTP env vars (SMTP_HOST/SMTP_USER/SMTP_PASSWORD).")
+        fut: "Future[bool]" = Future()
+        fut.add_done_callback(lambda f: count_email(kind, f.result()))
+        fut.set_result(False)
+        return fut
+    return get_mailer().submit(to_email, subject, html_body, kind, block=block)
+
 def _build_verify_link(token: str) -> str:
     # Keep the route consistent with your app
     return f"{BASE_URL}/auth/verify?token={token}"
 
-def send_verification_email(to_email: str, token: str) -> bool:
+def send_verification_email(to_email: str, token: str) -> "Future[bool]":
     """
-    Sends a verification email. Returns True on success, False on failure.
-    Emits clear logs to aid troubleshooting. No changes to signature to keep main.py integration intact.
+    Queue a verification email. The future resolves to True on success,
+    False on failure (await it with asyncio.wrap_future in async code).
     """
-    if not (SMTP_HOST and SMTP_USER and SMTP_PASSWORD):
-        print("[email] Missing SMTP env vars (SMTP_HOST/SMTP_USER/SMTP_PASSWORD).")
-        return False
-
     verify_link = _build_verify_link(token)
     subject = f"{UI_BRAND_NAME} – Verify your account"
     html_body = f"""
@@ -40,45 +295,4 @@ def send_verification_email(to_email: str, token: str) -> bool:
       </p>
     </div>
     """
-
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = subject
-    msg["From"]    = SMTP_USER
-    msg["To"]      = to_email
-    msg.attach(MIMEText(html_body, "html"))
-
-    try:
-        if SMTP_PORT == 465:
-            # Implicit SSL
-            with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT) as server:
-                if DEBUG_SMTP: server.set_debuglevel(1)
-                server.login(SMTP_USER, SMTP_PASSWORD)
-                server.sendmail(SMTP_USER, [to_email], msg.as_string())
-        else:
-            # STARTTLS (recommended for 587)
-            with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=15) as server:
-                if DEBUG_SMTP: server.set_debuglevel(1)
-                server.ehlo()
-                server.starttls()
-                server.ehlo()
-                server.login(SMTP_USER, SMTP_PASSWORD)
-                server.sendmail(SMTP_USER, [to_email], msg.as_string())
-        print(f"[email] Verification email sent to {to_email}")
-        return True
-
-    except smtplib.SMTPAuthenticationError as e:
-        print(f"[email] SMTP auth failed: {e}. "
-              "If using Gmail/Outlook with MFA, generate an App Password and use it here.")
-        return False
-
-    except smtplib.SMTPConnectError as e:
-        print(f"[email] SMTP connect error: {e}. Check firewall/ISP, and ensure port {SMTP_PORT} is allowed.")
-        return False
-
-    except smtplib.SMTPServerDisconnected as e:
-        print(f"[email] SMTP disconnected: {e}. Check encryption (STARTTLS vs SSL) and correct port.")
-        return False
-
-    except Exception as e:
-        print(f"[email] General SMTP error: {e}")
-        return False
+    return send_email(to_email, subject, html_body, kind="verification")
@@ -0,0 +1,198 @@
+# app/job_queue.py — durable audit job queue on the `audits_jobs` table
+import json
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
+
+from sqlalchemy import and_, or_, select, update
+
+from .db import SessionLocal, engine
+from .models import QueuedAudit
+
+JOB_VISIBILITY_TIMEOUT_S = int(os.getenv("JOB_VISIBILITY_TIMEOUT_S", "120"))
+JOB_HEARTBEAT_S          = float(os.getenv("JOB_HEARTBEAT_S", str(JOB_VISIBILITY_TIMEOUT_S / 4)))  # lease renewal while running
+JOB_MAX_ATTEMPTS         = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_BACKOFF_BASE_S       = float(os.getenv("JOB_BACKOFF_BASE_S", "10"))
+JOB_BACKOFF_MAX_S        = float(os.getenv("JOB_BACKOFF_MAX_S", "600"))
+
+# Row locks with SKIP LOCKED where the database has them; SQLite uses leases
+SKIP_LOCKED = engine.dialect.name in ("postgresql", "mysql", "mariadb")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# ----------------------------
+# Producer side
+# ----------------------------
+
+def enqueue(kind: str, url: str, user_id: Optional[int] = None, website_id: Optional[int] = None) -> QueuedAudit:
+    """Insert a queued job row and return it (detached)."""
+    db = SessionLocal()
+    try:
+        row = QueuedAudit(
+            id=uuid.uuid4().hex, kind=kind, url=url, user_id=user_id, website_id=website_id,
+            status="queued", attempts=0, max_attempts=JOB_MAX_ATTEMPTS, run_after=_now(),
+        )
+        db.add(row); db.commit(); db.refresh(row)
+        db.expunge(row)
+        return row
+    finally:
+        db.close()
+
+
+def fetch(job_id: str) -> Optional[QueuedAudit]:
+    db = SessionLocal()
+    try:
+        row = db.get(QueuedAudit, job_id)
+        if row is not None:
+            db.expunge(row)
+        return row
+    finally:
+        db.close()
+
+
+# ----------------------------
+# Worker side
+# ----------------------------
+
+def _claimable(now: datetime):
+    """Queued and due, or running with an expired lease (the worker died or stalled)."""
+    return and_(
+        QueuedAudit.attempts < QueuedAudit.max_attempts,
+        or_(
+            and_(QueuedAudit.status == "queued", QueuedAudit.run_after <= now),
+            and_(QueuedAudit.status == "running", QueuedAudit.locked_until < now),
+        ),
+    )
+
+
+def _lease_values(worker_id: str, now: datetime) -> dict:
+    return {
+        "status": "running",
+        "locked_by": worker_id,
+        "locked_until": now + timedelta(seconds=JOB_VISIBILITY_TIMEOUT_S),
+        "attempts": QueuedAudit.attempts + 1,
+    }
+
+
+def claim(worker_id: str, limit: int = 1) -> List[QueuedAudit]:
+    """
+    Lease up to `limit` due jobs to `worker_id` for JOB_VISIBILITY_TIMEOUT_S.
+    On Postgres/MySQL candidates are locked with FOR UPDATE SKIP LOCKED so
+    concurrent workers never block on each other; elsewhere (SQLite) each
+    candidate is taken with a conditional UPDATE and only counts when it
+    changed exactly one row.
+    """
+    if limit <= 0:
+        return []
+    now = _now()
+    db = SessionLocal()
+    try:
+        q = select(QueuedAudit.id).where(_claimable(now)).order_by(QueuedAudit.run_after).limit(limit)
+        if SKIP_LOCKED:
+            ids = db.scalars(q.with_for_update(skip_locked=True)).all()
+            if ids:
+                db.execute(update(QueuedAudit).where(QueuedAudit.id.in_(ids)).values(**_lease_values(worker_id, now)))
+        else:
+            ids = []
+            for job_id in db.scalars(q).all():
+                res = db.execute(
+                    update(QueuedAudit)
+                    .where(QueuedAudit.id == job_id, _claimable(now))
+                    .values(**_lease_values(worker_id, now))
+                )
+                if res.rowcount == 1:
+                    ids.append(job_id)
+        db.commit()
+        if not ids:
+            return []
+        rows = db.scalars(select(QueuedAudit).where(QueuedAudit.id.in_(ids))).all()
+        for row in rows:
+            db.expunge(row)
+        return list(rows)
+    finally:
+        db.close()
+
+
+def extend(job_id: str, worker_id: str) -> bool:
+    """Renew a running job's lease for another JOB_VISIBILITY_TIMEOUT_S; False if it was lost."""
+    db = SessionLocal()
+    try:
+        res = db.execute(
+            update(QueuedAudit)
+            .where(QueuedAudit.id == job_id, QueuedAudit.locked_by == worker_id, QueuedAudit.status == "running")
+            .values(locked_until=_now() + timedelta(seconds=JOB_VISIBILITY_TIMEOUT_S))
+        )
+        db.commit()
+        return res.rowcount == 1
+    finally:
+        db.close()
+
+
+def complete(job_id: str, worker_id: str, result: Any = None) -> bool:
+    """Mark a leased job done; False if the lease was lost to another worker."""
+    db = SessionLocal()
+    try:
+        res = db.execute(
+            update(QueuedAudit)
+            .where(QueuedAudit.id == job_id, QueuedAudit.locked_by == worker_id, QueuedAudit.status == "running")
+            .values(
+                status="done", locked_until=None, finished_at=_now(), last_error=None,
+                result_json=json.dumps(result) if result is not None else None,
+            )
+        )
+        db.commit()
+        return res.rowcount == 1
+    finally:
+        db.close()
+
+
+def _backoff_s(attempts: int) -> float:
+    delay = min(JOB_BACKOFF_MAX_S, JOB_BACKOFF_BASE_S * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def fail(job: QueuedAudit, worker_id: str, error: str) -> str:
+    """
+    Record a failed attempt: requeue with exponential backoff, or dead-letter
+    the job once it has used up max_attempts. Returns the new status.
+    """
+    now = _now()
+    if job.attempts >= job.max_attempts:
+        values = {"status": "dead", "finished_at": now}
+    else:
+        values = {"status": "queued", "run_after": now + timedelta(seconds=_backoff_s(job.attempts))}
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(QueuedAudit)
+            .where(QueuedAudit.id == job.id, QueuedAudit.locked_by == worker_id, QueuedAudit.status == "running")
+            .values(locked_until=None, last_error=error[:2000], **values)
+        )
+        db.commit()
+    finally:
+        db.close()
+    return values["status"]
+
+
+def reap_expired() -> int:
+    """Dead-letter jobs whose last allowed attempt's lease expired without an outcome."""
+    db = SessionLocal()
+    try:
+        res = db.execute(
+            update(QueuedAudit)
+            .where(
+                QueuedAudit.status == "running",
+                QueuedAudit.locked_until < _now(),
+                QueuedAudit.attempts >= QueuedAudit.max_attempts,
+            )
+            .values(status="dead", finished_at=_now(), last_error="visibility timeout exceeded")
+        )
+        db.commit()
+        return res.rowcount
+    finally:
+        db.close()
@@ -0,0 +1,170 @@
+# app/jobs.py — background audit jobs: run audits off the event loop, poll by job id
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from . import job_queue, metric_store
+from .cache import TTLCache
+from .db import SessionLocal
+from .models import Website, Audit, Subscription
+from .audit.runner import cached_audit, website_snapshot, audit_fields, snapshot_fields
+
+AUDIT_JOB_WORKERS = int(os.getenv("AUDIT_JOB_WORKERS", "8"))
+AUDIT_JOB_TTL_S   = float(os.getenv("AUDIT_JOB_TTL_S", "3600"))
+# "thread": run in this process; "db": enqueue on audits_jobs for `python -m app.worker`
+JOB_BACKEND       = os.getenv("JOB_BACKEND", "thread").lower()
+# Check profile (app.audit.checks.PROFILES) for websites of free-plan users, e.g. "headers"
+FREE_PLAN_PROFILE = os.getenv("FREE_PLAN_AUDIT_PROFILE", "full")
+FREE_PLAN_AUDIT_LIMIT = int(os.getenv("FREE_PLAN_AUDIT_LIMIT", "10"))
+
+_job_pool = ThreadPoolExecutor(max_workers=AUDIT_JOB_WORKERS, thread_name_prefix="audit-job")
+_jobs = TTLCache(maxsize=10000, ttl=AUDIT_JOB_TTL_S)
+
+
+class AuditJob:
+    """One audit submitted to the background executor."""
+    def __init__(self, url: str, user_id: Optional[int] = None, website_id: Optional[int] = None,
+                 job_id: Optional[str] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.url = url
+        self.user_id = user_id
+        self.website_id = website_id
+        self.status = "queued"
+        self.result: Optional[tuple] = None  # (normalized, res) for open audits
+        self.error = ""
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def redirect_url(self) -> str:
+        if self.status != "done":
+            return ""
+        if self.website_id is not None:
+            return f"/auth/audit/{self.website_id}"
+        return f"/audit/open/{self.id}"
+
+    @classmethod
+    def from_row(cls, row) -> "AuditJob":
+        """View of an audits_jobs row; dead-lettered jobs report as failed."""
+        job = cls(row.url, user_id=row.user_id, website_id=row.website_id, job_id=row.id)
+        job.status = {"dead": "failed"}.get(row.status, row.status)
+        job.error = row.last_error or ""
+        if row.result_json:
+            job.result = tuple(json.loads(row.result_json))
+        return job
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "url": self.url,
+            "redirect_url": self.redirect_url,
+            "error": self.error,
+        }
+
+
+# ----------------------------
+# Work
+# ----------------------------
+
+def plan_profile(sub: Optional[Subscription]) -> str:
+    """Check profile for audits of a user with this subscription (None counts as free)."""
+    return FREE_PLAN_PROFILE if not sub or (sub.plan or "free") == "free" else "full"
+
+
+def remaining_audits(sub: Optional[Subscription]) -> Optional[int]:
+    """Audits the user may still run; None when the plan is unlimited (paid)."""
+    if sub and (sub.plan or "free") != "free":
+        return None
+    return max(0, FREE_PLAN_AUDIT_LIMIT - ((sub.audits_used or 0) if sub else 0))
+
+
+def run_website_audit(user_id: int, website_id: int) -> int:
+    """
+    Audit a registered user's Website and persist the Audit row, the
+    Website's last grade / conditional-fetch snapshot and the quota counter.
+    Returns the website id; raises LookupError if the website is not theirs.
+    """
+    db = SessionLocal()
+    try:
+        w = db.query(Website).filter(Website.id == website_id, Website.user_id == user_id).first()
+        if not w:
+            raise LookupError(f"website {website_id} not found")
+
+        sub = db.query(Subscription).filter(Subscription.user_id == user_id).first()
+        normalized, res = cached_audit(w.url, website_snapshot(w), profile=plan_profile(sub))
+
+        audit = Audit(user_id=user_id, website_id=w.id, **audit_fields(normalized, res))
+        db.add(audit); db.flush(); db.refresh(audit)
+        metric_store.save(db, metric_store.metric_rows(
+            audit.id, user_id, w.id, audit.created_at, res["category_scores"], res.get("metrics", {}),
+        ))
+        db.commit()
+
+        w.last_audit_at = audit.created_at
+        w.last_grade = audit.grade
+        for k, v in snapshot_fields(res).items():
+            setattr(w, k, v)
+        db.commit()
+
+        if sub:
+            sub.audits_used = (sub.audits_used or 0) + 1
+            db.commit()
+        return w.id
+    finally:
+        db.close()
+
+
+def _execute(job: AuditJob) -> None:
+    job.status = "running"
+    try:
+        if job.website_id is not None:
+            run_website_audit(job.user_id, job.website_id)
+        else:
+            job.result = cached_audit(job.url)
+        job.status = "done"
+    except Exception as e:
+        job.error = str(e)
+        job.status = "failed"
+        print(f"[jobs] Audit job {job.id} for {job.url} failed: {e}")
+    finally:
+        job.finished_at = time.time()
+
+
+# ----------------------------
+# Submission & lookup
+# ----------------------------
+
+def submit_open_audit(url: str) -> AuditJob:
+    """Queue an open (unsaved) audit; the result stays on the job until it expires."""
+    if JOB_BACKEND == "db":
+        return AuditJob.from_row(job_queue.enqueue("open", url))
+    job = AuditJob(url)
+    _jobs.set(job.id, job)
+    _job_pool.submit(_execute, job)
+    return job
+
+
+def submit_website_audit(user_id: int, website_id: int, url: str) -> AuditJob:
+    """Queue an audit of a registered user's Website."""
+    if JOB_BACKEND == "db":
+        return AuditJob.from_row(job_queue.enqueue("website", url, user_id=user_id, website_id=website_id))
+    job = AuditJob(url, user_id=user_id, website_id=website_id)
+    _jobs.set(job.id, job)
+    _job_pool.submit(_execute, job)
+    return job
+
+
+def get_job(job_id: str, user_id: Optional[int] = None) -> Optional[AuditJob]:
+    """Look a job up; jobs owned by a user are only visible to that user."""
+    if JOB_BACKEND == "db":
+        row = job_queue.fetch(job_id)
+        job = AuditJob.from_row(row) if row is not None else None
+    else:
+        job = _jobs.get(job_id)
+    if job is None or (job.user_id is not None and job.user_id != user_id):
+        return None
+    return job
@@ -2,36 +2,44 @@
 import os
 import json
 import asyncio
+import tempfile
+import time
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
-from urllib.parse import urlparse
 
 from fastapi import FastAPI, Request, Form, Depends
-from fastapi.responses import RedirectResponse, FileResponse
+from fastapi.responses import RedirectResponse, FileResponse, StreamingResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from .db import Base, engine, SessionLocal
 from .models import User, Website, Audit, Subscription
-from .auth import hash_password, verify_password, create_token, decode_token
-from .email_utils import send_verification_email
-from .audit.engine import run_basic_checks
+from .auth import (
+    Overloaded, admit, close_hash_pool, create_token, decode_token, hash_password_async, verify_password_async,
+)
+from .email_utils import send_email, send_verification_email, close_mailer
+from .audit.engine import close_client, close_parse_pool, iter_competitor_analysis, cache_stats as probe_cache_stats
+from .audit.runner import cached_audit, cached_checks, cache_stats as audit_cache_stats
+from .audit.assets import cache_stats as asset_cache_stats
 from .audit.grader import compute_overall, grade_from_score, summarize_200_words
 from .audit.report import render_pdf
-
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from .bulk import QuotaExceeded, parse_url_list, start_bulk_job, get_bulk_job
+from .jobs import submit_open_audit, submit_website_audit, get_job
+from . import metric_store, scheduler, sessions, telemetry
+from .telemetry import (
+    HTTP_REQUEST_SECONDS, PDF_RENDER_SECONDS, SCHEDULER_LAG_SECONDS, SCHEDULER_LEADER, SCHEDULER_TICK_SECONDS,
+    SCHEDULER_ERRORS_TOTAL, CACHE_STAT, observe_timed,
+)
 
 UI_BRAND_NAME = os.getenv("UI_BRAND_NAME", "FF Tech")
 BASE_URL      = os.getenv("BASE_URL", "http://localhost:8000")
 
-SMTP_HOST     = os.getenv("SMTP_HOST")
-SMTP_PORT     = int(os.getenv("SMTP_PORT", "587"))
-SMTP_USER     = os.getenv("SMTP_USER")
-SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+MAX_COMPETITORS = int(os.getenv("MAX_COMPETITORS", "20"))
+# Reverse proxies (Railway, nginx) in front of the app; each appends one X-Forwarded-For entry
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
 
 app = FastAPI()
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -55,6 +63,14 @@ def _ensure_schedule_columns():
                 ALTER TABLE subscriptions
                 ADD COLUMN IF NOT EXISTS email_schedule_enabled BOOLEAN DEFAULT FALSE;
             """))
+            conn.execute(text("""
+                ALTER TABLE subscriptions
+                ADD COLUMN IF NOT EXISTS next_run_at TIMESTAMPTZ;
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_subscriptions_next_run_at
+                ON subscriptions (next_run_at);
+            """))
             conn.commit()
     except Exception:
         pass
@@ -78,8 +94,28 @@ def _ensure_user_columns():
     except Exception:
         pass
 
+def _ensure_website_columns():
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("""
+                ALTER TABLE websites
+                ADD COLUMN IF NOT EXISTS etag VARCHAR(512);
+            """))
+            conn.execute(text("""
+                ALTER TABLE websites
+                ADD COLUMN IF NOT EXISTS last_modified VARCHAR(64);
+            """))
+            conn.execute(text("""
+                ALTER TABLE websites
+                ADD COLUMN IF NOT EXISTS page_snapshot_json TEXT;
+            """))
+            conn.commit()
+    except Exception:
+        pass
+
 _ensure_schedule_columns()
 _ensure_user_columns()
+_ensure_website_columns()
 
 # ---------- DB dependency ----------
 def get_db():
@@ -91,8 +127,12 @@ def get_db():
 
 # ---------- Metrics presenter (human-friendly labels) ----------
 METRIC_LABELS = {
+    "audit_profile": "Check Profile",
     "status_code": "Status Code",
-    "content_length": "Content Length (bytes)",
+    "content_length": "Content Length (decoded bytes)",
+    "transfer_bytes": "Transfer Size (wire bytes)",
+    "body_truncated": "Body Truncated (byte budget)",
+    "charset": "Charset",
     "content_encoding": "Compression (Content-Encoding)",
     "cache_control": "Caching (Cache-Control)",
     "hsts": "HSTS (Strict-Transport-Security)",
@@ -107,12 +147,33 @@ METRIC_LABELS = {
     "canonical_present": "Canonical Link Present",
     "has_https": "Uses HTTPS",
     "robots_allowed": "Robots Allowed",
+    "robots_status": "robots.txt Status",
     "sitemap_present": "Sitemap Present",
     "images_without_alt": "Images Missing alt",
     "image_count": "Image Count",
     "viewport_present": "Viewport Meta Present",
     "html_lang_present": "<html lang> Present",
     "h1_count": "H1 Count",
+    "dns_ms": "DNS Lookup (ms)",
+    "connect_ms": "TCP Connect incl. DNS (ms)",
+    "tls_ms": "TLS Handshake (ms)",
+    "ttfb_ms": "Time to First Byte (ms)",
+    "download_ms": "Download Time (ms)",
+    "connection_reused": "Reused Pooled Connection",
+    "page_fetch_ms": "Page Fetch Time (ms)",
+    "robots_fetch_ms": "robots.txt Fetch Time (ms)",
+    "sitemap_fetch_ms": "Sitemap Probe Time (ms)",
+    "probes_wall_ms": "Audit Network Wall Time (ms)",
+    "not_modified": "Unchanged Since Last Audit (304)",
+    "asset_count": "Subresources (CSS/JS/Images)",
+    "assets_unsized": "Subresources Not Sized",
+    "asset_bytes_css": "Stylesheet Bytes",
+    "asset_bytes_js": "Script Bytes",
+    "asset_bytes_img": "Image Bytes",
+    "asset_bytes_total": "Subresource Bytes",
+    "page_weight_bytes": "Total Page Weight (bytes)",
+    "largest_assets": "Largest Subresources",
+    "asset_probe_ms": "Subresource Sizing Time (ms)",
     "normalized_url": "Normalized URL",
     "error": "Fetch Error",
 }
@@ -123,104 +184,68 @@ def _present_metrics(metrics: dict) -> dict:
         label = METRIC_LABELS.get(k, k.replace("_", " ").title())
         if isinstance(v, bool):
             v = "Yes" if v else "No"
+        elif isinstance(v, list):
+            v = "; ".join(str(x) for x in v)
         out[label] = v
     return out
 
-# ---------- Robust URL & audit helpers ----------
-def _normalize_url(raw: str) -> str:
-    if not raw:
-        return raw
-    s = raw.strip()
-    if not s:
-        return s
-    p = urlparse(s)
-    if not p.scheme:
-        s = "https://" + s
-        p = urlparse(s)
-    if not p.netloc and p.path:
-        s = f"{p.scheme}://{p.path}"
-        p = urlparse(s)
-    path = p.path or "/"
-    return f"{p.scheme}://{p.netloc}{path}"
-
-def _url_variants(u: str) -> list:
-    p = urlparse(u)
-    host = p.netloc
-    path = p.path or "/"
-    scheme = p.scheme
-
-    candidates = [f"{scheme}://{host}{path}"]
-    if host.startswith("www."):
-        candidates.append(f"{scheme}://{host[4:]}{path}")
-    else:
-        candidates.append(f"{scheme}://www.{host}{path}")
-    candidates.append(f"http://{host}{path}")
-    if host.startswith("www."):
-        candidates.append(f"http://{host[4:]}{path}")
-    else:
-        candidates.append(f"http://www.{host}{path}")
-    if not path.endswith("/"):
-        candidates.append(f"{scheme}://{host}{path}/")
-    seen, ordered = set(), []
-    for c in candidates:
-        if c not in seen:
-            ordered.append(c); seen.add(c)
-    return ordered
-
-def _fallback_result(url: str) -> dict:
-    return {
-        "category_scores": {
-            "Performance": 65,
-            "Accessibility": 72,
-            "SEO": 68,
-            "Security": 70,
-            "BestPractices": 66,
-        },
-        "metrics": {
-            "error": "Fetch failed or blocked",
-            "normalized_url": url,
-        },
-        "top_issues": [
-            "Fetch failed; using heuristic baseline.",
-            "Verify URL is publicly accessible and not blocked by WAF/robots.",
-        ],
-    }
-
-def _robust_audit(url: str) -> tuple[str, dict]:
-    base = _normalize_url(url)
-    for candidate in _url_variants(base):
-        try:
-            res = run_basic_checks(candidate)
-            cats = res.get("category_scores") or {}
-            if cats and sum(int(v) for v in cats.values()) > 0:
-                return candidate, res
-        except Exception:
-            continue
-    return base, _fallback_result(base)
-
 # ---------- Session handling ----------
-current_user = None
+def _user(request: Request):
+    """The signed-in, verified User of this request (None when anonymous)."""
+    return getattr(request.state, "user", None)
+
+def _client_ip(request: Request):
+    # Only the entries our own proxies appended (counted from the right) can be
+    # trusted; anything further left was supplied by the client
+    if TRUSTED_PROXY_HOPS > 0:
+        forwarded = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+        if len(forwarded) >= TRUSTED_PROXY_HOPS:
+            return forwarded[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else None
 
 @app.middleware("http")
 async def session_middleware(request: Request, call_next):
-    global current_user
+    request.state.user = None
+    token = request.cookies.get("session_token")
+    if token and not request.url.path.startswith("/static/"):
+        try:
+            hit, user = sessions.cached_user(token)
+            if not hit:
+                user = await run_in_threadpool(sessions.load_user, token)
+            request.state.user = user
+        except Exception as e:
+            print(f"[auth] Session lookup failed: {e!r}")
+    return await call_next(request)
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
     try:
-        token = request.cookies.get("session_token")
-        if token:
-            data = decode_token(token)
-            uid = data.get("uid")
-            if uid:
-                db = SessionLocal()
-                try:
-                    u = db.query(User).filter(User.id == uid).first()
-                    if u and getattr(u, "verified", False):
-                        current_user = u
-                finally:
-                    db.close()
-    except Exception:
-        pass
-    response = await call_next(request)
-    return response
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
+# ---------- Metrics ----------
+def _collect_cache_stats():
+    caches = {"audit_results": audit_cache_stats(), "assets": asset_cache_stats(), **probe_cache_stats()}
+    for cache, stats in caches.items():
+        for stat, value in stats.items():
+            CACHE_STAT.set(value, cache=cache, stat=stat)
+
+telemetry.register_collector(_collect_cache_stats)
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(telemetry.render(), media_type="text/plain; version=0.0.4")
 
 # ---------- Public ----------
 @app.get("/")
@@ -228,17 +253,10 @@ async def index(request: Request):
     return templates.TemplateResponse("index.html", {
         "request": request,
         "UI_BRAND_NAME": UI_BRAND_NAME,
-        "user": current_user
+        "user": _user(request)
     })
 
-@app.post("/audit/open")
-async def audit_open(request: Request):
-    form = await request.form()
-    url = form.get("url")
-    if not url:
-        return RedirectResponse("/", status_code=303)
-
-    normalized, res = _robust_audit(url)
+def _open_audit_context(request: Request, normalized: str, res: dict) -> dict:
     category_scores_dict = res["category_scores"]
     overall = compute_overall(category_scores_dict)
     grade = grade_from_score(overall)
@@ -246,10 +264,10 @@ async def audit_open(request: Request):
     exec_summary = summarize_200_words(normalized, category_scores_dict, top_issues)
     category_scores_list = [{"name": k, "score": int(v)} for k, v in category_scores_dict.items()]
 
-    return templates.TemplateResponse("audit_detail_open.html", {
+    return {
         "request": request,
         "UI_BRAND_NAME": UI_BRAND_NAME,
-        "user": current_user,
+        "user": _user(request),
         "website": {"id": None, "url": normalized},
         "audit": {
             "created_at": datetime.utcnow(),
@@ -260,19 +278,119 @@ async def audit_open(request: Request):
             "metrics": _present_metrics(res.get("metrics", {})),
             "top_issues": top_issues,
         }
-    })
+    }
+
+@app.post("/audit/open")
+async def audit_open(request: Request):
+    form = await request.form()
+    url = form.get("url")
+    if not url:
+        return RedirectResponse("/", status_code=303)
+
+    job = submit_open_audit(url)
+    return RedirectResponse(f"/audit/job/{job.id}", status_code=303)
+
+@app.get("/audit/open/{job_id}")
+async def audit_open_result(job_id: str, request: Request):
+    job = get_job(job_id)
+    if not job or job.status != "done":
+        return RedirectResponse(f"/audit/job/{job_id}" if job else "/", status_code=303)
+    normalized, res = job.result
+    return templates.TemplateResponse("audit_detail_open.html", _open_audit_context(request, normalized, res))
+
+async def _pdf_response(filename: str, *render_args) -> FileResponse:
+    """Render a report into a private temp file, deleted once the response has been sent."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        path = f.name
+    try:
+        await run_in_threadpool(observe_timed, PDF_RENDER_SECONDS, render_pdf, path, UI_BRAND_NAME, *render_args)
+    except Exception:
+        os.remove(path)
+        raise
+    return FileResponse(path, filename=filename, background=BackgroundTask(os.remove, path))
 
 @app.get("/report/pdf/open")
 async def report_pdf_open(url: str):
-    normalized, res = _robust_audit(url)
+    normalized, res = await run_in_threadpool(cached_audit, url)
     cs_list = [{"name": k, "score": int(v)} for k, v in res["category_scores"].items()]
     overall = compute_overall(res["category_scores"])
     grade = grade_from_score(overall)
     top_issues = res.get("top_issues", [])
     exec_summary = summarize_200_words(normalized, res["category_scores"], top_issues)
-    path = "/tmp/certified_audit_open.pdf"
-    render_pdf(path, UI_BRAND_NAME, normalized, grade, int(overall), cs_list, exec_summary)
-    return FileResponse(path, filename=f"{UI_BRAND_NAME}_Certified_Audit_Open.pdf")
+    return await _pdf_response(
+        f"{UI_BRAND_NAME}_Certified_Audit_Open.pdf", normalized, grade, int(overall), cs_list, exec_summary,
+    )
+
+# ---------- Audit jobs ----------
+def _job_for_request(job_id: str, request: Request):
+    user = _user(request)
+    return get_job(job_id, user.id if user else None)
+
+@app.get("/api/jobs/{job_id}")
+async def job_status_api(job_id: str, request: Request):
+    job = _job_for_request(job_id, request)
+    if not job:
+        return JSONResponse({"error": "job not found"}, status_code=404)
+    return JSONResponse(job.to_dict())
+
+@app.get("/audit/job/{job_id}")
+@app.get("/auth/audit/job/{job_id}")
+async def job_status_page(job_id: str, request: Request):
+    job = _job_for_request(job_id, request)
+    if not job:
+        return RedirectResponse("/", status_code=303)
+    if job.status == "done":
+        return RedirectResponse(job.redirect_url, status_code=303)
+    return templates.TemplateResponse("job_status.html", {
+        "request": request,
+        "UI_BRAND_NAME": UI_BRAND_NAME,
+        "user": _user(request),
+        "job": job.to_dict()
+    })
+
+# ---------- Competitor analysis ----------
+def _split_urls(raw) -> list:
+    if isinstance(raw, str):
+        raw = raw.replace(",", "\n").splitlines()
+    return [u.strip() for u in (raw or []) if u and u.strip()]
+
+@app.get("/competitors")
+async def competitors_get(request: Request):
+    return templates.TemplateResponse("competitors.html", {
+        "request": request,
+        "UI_BRAND_NAME": UI_BRAND_NAME,
+        "user": _user(request)
+    })
+
+@app.post("/api/competitors")
+async def competitors_api(request: Request):
+    """
+    Stream a one-page competitor comparison as NDJSON: one line per finished
+    competitor with the partial comparison_table / winners_by_category /
+    deltas_vs_target, the last line being the complete comparison.
+    Accepts JSON {"target": str, "competitors": [str]} or form fields
+    target + competitors (newline or comma separated).
+    """
+    if request.headers.get("content-type", "").startswith("application/json"):
+        payload = await request.json()
+    else:
+        payload = dict(await request.form())
+    target = (payload.get("target") or "").strip()
+    competitors = _split_urls(payload.get("competitors"))[:MAX_COMPETITORS]
+    if not target or not competitors:
+        return JSONResponse({"error": "target and at least one competitor are required"}, status_code=400)
+
+    def rows():
+        for report in iter_competitor_analysis(target, competitors, audit_fn=cached_checks):
+            yield json.dumps({
+                "progress": report["progress"],
+                "comparison_table": report["comparison_table"],
+                "winners_by_category": report["winners_by_category"],
+                "deltas_vs_target": report["deltas_vs_target"],
+                "key_findings": report["key_findings"],
+            }) + "\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
 
 # ---------- Registration & Auth (ONLY /auth/*) ----------
 @app.get("/auth/register")
@@ -280,7 +398,7 @@ async def register_get(request: Request):
     return templates.TemplateResponse("register.html", {
         "request": request,
         "UI_BRAND_NAME": UI_BRAND_NAME,
-        "user": current_user
+        "user": _user(request)
     })
 
 @app.post("/auth/register")
@@ -293,14 +411,22 @@ async def register_post(
 ):
     if password != confirm_password:
         return RedirectResponse("/auth/register?mismatch=1", status_code=303)
+    if not admit("register", _client_ip(request), email):
+        return RedirectResponse("/auth/register?throttled=1", status_code=303)
     if db.query(User).filter(User.email == email).first():
         return RedirectResponse("/auth/login?exists=1", status_code=303)
 
-    u = User(email=email, password_hash=hash_password(password), verified=False, is_admin=False)
+    db.close()  # hand the pooled connection back while waiting on the hash pool
+    try:
+        password_hash = await hash_password_async(password)
+    except Overloaded:
+        return RedirectResponse("/auth/register?throttled=1", status_code=303)
+    u = User(email=email, password_hash=password_hash, verified=False, is_admin=False)
     db.add(u); db.commit(); db.refresh(u)
 
     token = create_token({"uid": u.id, "email": u.email}, expires_minutes=60*24*3)
-    ok = send_verification_email(u.email, token)
+    db.close()
+    ok = await asyncio.wrap_future(send_verification_email(u.email, token))
     if not ok:
         print(f"[auth] Failed to send email to {u.email}. Check SMTP settings.")
     return RedirectResponse("/auth/login?check_email=1", status_code=303)
@@ -313,13 +439,14 @@ async def verify(request: Request, token: str, db: Session = Depends(get_db)):
         if u:
             u.verified = True
             db.commit()
+            sessions.invalidate_user(u.id)
             return RedirectResponse("/auth/login?verified=1", status_code=303)
     except Exception:
         return templates.TemplateResponse("verify.html", {
             "request": request,
             "success": False,
             "UI_BRAND_NAME": UI_BRAND_NAME,
-            "user": current_user
+            "user": _user(request)
         })
     return RedirectResponse("/auth/login", status_code=303)
 
@@ -328,18 +455,15 @@ async def login_get(request: Request):
     return templates.TemplateResponse("login.html", {
         "request": request,
         "UI_BRAND_NAME": UI_BRAND_NAME,
-        "user": current_user
+        "user": _user(request)
     })
 
 # ---------- Magic Login (Passwordless) ----------
-def _send_magic_login_email(to_email: str, token: str) -> bool:
+def _send_magic_login_email(to_email: str, token: str):
     """
-    Send the magic login link via email using the same SMTP settings.
+    Queue the magic login link email on the shared mailer (returns its future).
     Clicking this link will log the user in and redirect to the dashboard.
     """
-    if not (SMTP_HOST and SMTP_USER and SMTP_PASSWORD):
-        return False
-
     login_link = f"{BASE_URL.rstrip('/')}/auth/magic?token={token}"
 
     html_body = f"""
@@ -350,20 +474,7 @@ def _send_magic_login_email(to_email: str, token: str) -> bool:
     <p>This link will expire shortly. If you didn't request it, you can ignore this message.</p>
     """
 
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = f"{UI_BRAND_NAME} — Magic Login Link"
-    msg["From"] = SMTP_USER
-    msg["To"] = to_email
-    msg.attach(MIMEText(html_body, "html"))
-
-    try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.sendmail(SMTP_USER, [to_email], msg.as_string())
-        return True
-    except Exception:
-        return False
+    return send_email(to_email, f"{UI_BRAND_NAME} — Magic Login Link", html_body, kind="magic_link")
 
 @app.post("/auth/magic/request")
 async def magic_request(
@@ -383,7 +494,7 @@ async def magic_request(
 
     # Short expiry for security (e.g., 15 minutes)
     token = create_token({"uid": u.id, "email": u.email, "type": "magic"}, expires_minutes=15)
-    _send_magic_login_email(u.email, token)
+    _send_magic_login_email(u.email, token)  # delivered in the background
 
     return RedirectResponse("/auth/login?magic_sent=1", status_code=303)
 
@@ -392,7 +503,6 @@ async def magic_login(request: Request, token: str, db: Session = Depends(get_db
     """
     Consume the magic login link: decode token, set session cookie, redirect to dashboard.
     """
-    global current_user
     try:
         data = decode_token(token)
         uid = data.get("uid")
@@ -403,7 +513,6 @@ async def magic_login(request: Request, token: str, db: Session = Depends(get_db
         if not u or not getattr(u, "verified", False):
             return RedirectResponse("/auth/login?error=1", status_code=303)
 
-        current_user = u
         session_token = create_token({"uid": u.id, "email": u.email}, expires_minutes=60*24*30)
         resp = RedirectResponse("/auth/dashboard", status_code=303)
         resp.set_cookie(
@@ -426,12 +535,17 @@ async def login_post(
     password: str = Form(...),
     db: Session = Depends(get_db)
 ):
-    global current_user
+    if not admit("login", _client_ip(request), email):
+        return RedirectResponse("/auth/login?throttled=1", status_code=303)
     u = db.query(User).filter(User.email == email).first()
-    if not u or not verify_password(password, u.password_hash) or not u.verified:
+    db.close()  # u stays readable; the pooled connection goes back while hashing
+    try:
+        ok = bool(u) and await verify_password_async(password, u.password_hash)
+    except Overloaded:
+        return RedirectResponse("/auth/login?throttled=1", status_code=303)
+    if not ok or not u.verified:
         return RedirectResponse("/auth/login?error=1", status_code=303)
 
-    current_user = u
     token = create_token({"uid": u.id, "email": u.email}, expires_minutes=60*24*30)
 
     resp = RedirectResponse("/auth/dashboard", status_code=303)
@@ -447,8 +561,7 @@ async def login_post(
 
 @app.get("/auth/logout")
 async def logout(request: Request):
-    global current_user
-    current_user = None
+    sessions.forget(request.cookies.get("session_token"))
     resp = RedirectResponse("/", status_code=303)
     resp.delete_cookie("session_token")
     return resp
@@ -456,7 +569,7 @@ async def logout(request: Request):
 # ---------- Registered audit flows ----------
 @app.get("/auth/dashboard")
 async def dashboard(request: Request, db: Session = Depends(get_db)):
-    global current_user
+    current_user = _user(request)
     if not current_user:
         return RedirectResponse("/auth/login", status_code=303)
 
@@ -489,7 +602,7 @@ async def dashboard(request: Request, db: Session = Depends(get_db)):
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
         "UI_BRAND_NAME": UI_BRAND_NAME,
-        "user": current_user,
+        "user": _user(request),
         "websites": websites,
         "trend": {"labels": trend_labels, "values": trend_values, "average": avg},
         "summary": summary,
@@ -498,13 +611,13 @@ async def dashboard(request: Request, db: Session = Depends(get_db)):
 
 @app.get("/auth/audit/new")
 async def new_audit_get(request: Request):
-    global current_user
+    current_user = _user(request)
     if not current_user:
         return RedirectResponse("/auth/login", status_code=303)
     return templates.TemplateResponse("new_audit.html", {
         "request": request,
         "UI_BRAND_NAME": UI_BRAND_NAME,
-        "user": current_user
+        "user": _user(request)
     })
 
 @app.post("/auth/audit/new")
@@ -514,7 +627,7 @@ async def new_audit_post(
     enable_schedule: str = Form(None),
     db: Session = Depends(get_db)
 ):
-    global current_user
+    current_user = _user(request)
     if not current_user:
         return RedirectResponse("/auth/login", status_code=303)
 
@@ -534,7 +647,7 @@ async def new_audit_post(
 
 @app.get("/auth/audit/run/{website_id}")
 async def run_audit(website_id: int, request: Request, db: Session = Depends(get_db)):
-    global current_user
+    current_user = _user(request)
     if not current_user:
         return RedirectResponse("/auth/login", status_code=303)
 
@@ -542,44 +655,67 @@ async def run_audit(website_id: int, request: Request, db: Session = Depends(get
     if not w:
         return RedirectResponse("/auth/dashboard", status_code=303)
 
-    try:
-        normalized, res = _robust_audit(w.url)
-    except Exception:
-        return RedirectResponse("/auth/dashboard", status_code=303)
-
-    category_scores_dict = res["category_scores"]
-    overall = compute_overall(category_scores_dict)
-    grade = grade_from_score(overall)
-    top_issues = res.get("top_issues", [])
-    exec_summary = summarize_200_words(normalized, category_scores_dict, top_issues)
-
-    category_scores_list = [{"name": k, "score": int(v)} for k, v in category_scores_dict.items()]
-
-    audit = Audit(
-        user_id=current_user.id,
-        website_id=w.id,
-        health_score=int(overall),
-        grade=grade,
-        exec_summary=exec_summary,
-        category_scores_json=json.dumps(category_scores_list),
-        metrics_json=json.dumps(res.get("metrics", {}))
-    )
-    db.add(audit); db.commit(); db.refresh(audit)
+    job = submit_website_audit(current_user.id, w.id, w.url)
+    return RedirectResponse(f"/auth/audit/job/{job.id}", status_code=303)
 
-    w.last_audit_at = audit.created_at
-    w.last_grade = grade
-    db.commit()
+# ---------- Bulk audits ----------
+@app.get("/auth/audit/bulk")
+async def bulk_audit_get(request: Request):
+    current_user = _user(request)
+    if not current_user:
+        return RedirectResponse("/auth/login", status_code=303)
+    return templates.TemplateResponse("bulk_audit.html", {
+        "request": request,
+        "UI_BRAND_NAME": UI_BRAND_NAME,
+        "user": _user(request)
+    })
 
-    sub = db.query(Subscription).filter(Subscription.user_id == current_user.id).first()
-    if sub:
-        sub.audits_used = (sub.audits_used or 0) + 1
-        db.commit()
+@app.post("/auth/audit/bulk")
+async def bulk_audit_post(request: Request):
+    """
+    Submit many URLs at once: JSON list / {"urls": [...]} body, or a form with
+    an uploaded CSV/JSON/text file ("file") or pasted URLs ("urls").
+    Returns the job id and its progress URL right away.
+    """
+    current_user = _user(request)
+    if not current_user:
+        return JSONResponse({"error": "login required"}, status_code=401)
+    try:
+        if request.headers.get("content-type", "").startswith("application/json"):
+            urls = parse_url_list(await request.json())
+        else:
+            form = await request.form()
+            upload = form.get("file")
+            raw = await upload.read() if upload is not None and hasattr(upload, "read") else b""
+            urls = parse_url_list(raw or form.get("urls") or "")
+    except ValueError:
+        return JSONResponse({"error": "could not parse the URL list"}, status_code=400)
+    if not urls:
+        return JSONResponse({"error": "no URLs found"}, status_code=400)
 
-    return RedirectResponse(f"/auth/audit/{w.id}", status_code=303)
+    try:
+        job = await run_in_threadpool(start_bulk_job, current_user.id, urls)
+    except QuotaExceeded as e:
+        return JSONResponse({"error": str(e), "remaining": e.remaining}, status_code=403)
+    return JSONResponse({
+        "job_id": job.id,
+        "total": job.total,
+        "status_url": f"/auth/audit/bulk/{job.id}",
+    }, status_code=202)
+
+@app.get("/auth/audit/bulk/{job_id}")
+async def bulk_audit_status(job_id: str, request: Request):
+    current_user = _user(request)
+    if not current_user:
+        return JSONResponse({"error": "login required"}, status_code=401)
+    job = get_bulk_job(job_id, current_user.id)
+    if not job:
+        return JSONResponse({"error": "job not found"}, status_code=404)
+    return JSONResponse(job.progress())
 
 @app.get("/auth/audit/{website_id}")
 async def audit_detail(website_id: int, request: Request, db: Session = Depends(get_db)):
-    global current_user
+    current_user = _user(request)
     if not current_user:
         return RedirectResponse("/auth/login", status_code=303)
 
@@ -588,14 +724,13 @@ async def audit_detail(website_id: int, request: Request, db: Session = Depends(
     if not w or not a:
         return RedirectResponse("/auth/dashboard", status_code=303)
 
-    category_scores = json.loads(a.category_scores_json) if a.category_scores_json else []
-    metrics_raw = json.loads(a.metrics_json) if a.metrics_json else {}
+    category_scores, metrics_raw = metric_store.load(db, a)
     metrics = _present_metrics(metrics_raw)
 
     return templates.TemplateResponse("audit_detail.html", {
         "request": request,
         "UI_BRAND_NAME": UI_BRAND_NAME,
-        "user": current_user,
+        "user": _user(request),
         "website": w,
         "audit": {
             "created_at": a.created_at,
@@ -609,7 +744,7 @@ async def audit_detail(website_id: int, request: Request, db: Session = Depends(
 
 @app.get("/auth/report/pdf/{website_id}")
 async def report_pdf(website_id: int, request: Request, db: Session = Depends(get_db)):
-    global current_user
+    current_user = _user(request)
     if not current_user:
         return RedirectResponse("/auth/login", status_code=303)
 
@@ -618,16 +753,15 @@ async def report_pdf(website_id: int, request: Request, db: Session = Depends(ge
     if not w or not a:
         return RedirectResponse("/auth/dashboard", status_code=303)
 
-    category_scores = json.loads(a.category_scores_json) if a.category_scores_json else []
-    path = f"/tmp/certified_audit_{website_id}.pdf"
-
-    render_pdf(path, UI_BRAND_NAME, w.url, a.grade, a.health_score, category_scores, a.exec_summary)
-    return FileResponse(path, filename=f"{UI_BRAND_NAME}_Certified_Audit_{website_id}.pdf")
+    category_scores, _ = metric_store.load(db, a, kinds=("category",))
+    return await _pdf_response(
+        f"{UI_BRAND_NAME}_Certified_Audit_{website_id}.pdf", w.url, a.grade, a.health_score, category_scores, a.exec_summary,
+    )
 
 # ---------- Scheduling UI ----------
 @app.get("/auth/schedule")
 async def schedule_get(request: Request, db: Session = Depends(get_db)):
-    global current_user
+    current_user = _user(request)
     if not current_user:
         return RedirectResponse("/auth/login", status_code=303)
 
@@ -641,7 +775,7 @@ async def schedule_get(request: Request, db: Session = Depends(get_db)):
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
         "UI_BRAND_NAME": UI_BRAND_NAME,
-        "user": current_user,
+        "user": _user(request),
         "websites": db.query(Website).filter(Website.user_id == current_user.id).all(),
         "trend": {"labels": [], "values": [], "average": 0},
         "summary": {"grade": "A", "health_score": 88},
@@ -656,7 +790,7 @@ async def schedule_post(
     enabled: str = Form(None),
     db: Session = Depends(get_db)
 ):
-    global current_user
+    current_user = _user(request)
     if not current_user:
         return RedirectResponse("/auth/login", status_code=303)
 
@@ -671,6 +805,7 @@ async def schedule_post(
         sub.timezone = timezone
     if hasattr(sub, "email_schedule_enabled"):
         sub.email_schedule_enabled = bool(enabled)
+    scheduler.reschedule(sub)
     db.commit()
 
     return RedirectResponse("/auth/dashboard", status_code=303)
@@ -681,7 +816,7 @@ async def admin_login_get(request: Request):
     return templates.TemplateResponse("login.html", {
         "request": request,
         "UI_BRAND_NAME": UI_BRAND_NAME,
-        "user": current_user
+        "user": _user(request)
     })
 
 @app.post("/auth/admin/login")
@@ -691,12 +826,17 @@ async def admin_login_post(
     password: str = Form(...),
     db: Session = Depends(get_db)
 ):
-    global current_user
+    if not admit("admin_login", _client_ip(request), email):
+        return RedirectResponse("/auth/admin/login?throttled=1", status_code=303)
     u = db.query(User).filter(User.email == email).first()
-    if not u or not verify_password(password, u.password_hash) or not u.is_admin:
+    db.close()  # u stays readable; the pooled connection goes back while hashing
+    try:
+        ok = bool(u) and await verify_password_async(password, u.password_hash)
+    except Overloaded:
+        return RedirectResponse("/auth/admin/login?throttled=1", status_code=303)
+    if not ok or not u.is_admin:
         return RedirectResponse("/auth/admin/login", status_code=303)
 
-    current_user = u
     token = create_token({"uid": u.id, "email": u.email, "admin": True}, expires_minutes=60*24*30)
 
     resp = RedirectResponse("/auth/admin", status_code=303)
@@ -709,7 +849,7 @@ async def admin_login_post(
 
 @app.get("/auth/admin")
 async def admin_dashboard(request: Request, db: Session = Depends(get_db)):
-    global current_user
+    current_user = _user(request)
     if not current_user or not current_user.is_admin:
         return RedirectResponse("/auth/admin/login", status_code=303)
 
@@ -720,90 +860,86 @@ async def admin_dashboard(request: Request, db: Session = Depends(get_db)):
     return templates.TemplateResponse("admin.html", {
         "request": request,
         "UI_BRAND_NAME": UI_BRAND_NAME,
-        "user": current_user,
+        "user": _user(request),
         "websites": websites,
         "admin_users": users,
         "admin_audits": audits
     })
 
 # ---------- Daily Email Scheduler ----------
-def _send_report_email(to_email: str, subject: str, html_body: str) -> bool:
-    if not (SMTP_HOST and SMTP_USER and SMTP_PASSWORD):
-        return False
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = subject
-    msg["From"]    = SMTP_USER
-    msg["To"]      = to_email
-    msg.attach(MIMEText(html_body, "html"))
-    try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.sendmail(SMTP_USER, [to_email], msg.as_string())
-        return True
-    except Exception:
-        return False
+def _send_daily_summary(db: Session, sub) -> None:
+    """One subscriber's digest: the latest grade of each website and the 30-day average."""
+    user = db.query(User).filter(User.id == sub.user_id).first()
+    if not user or not getattr(user, "verified", False):
+        return
+    websites = db.query(Website).filter(Website.user_id == user.id).all()
+    lines = [
+        f"<h3>Daily Website Audit Summary – {UI_BRAND_NAME}</h3>",
+        f"<p>Hello, {user.email}!</p>",
+        "<p>Here is your daily summary. Download certified PDFs via links below.</p>"
+    ]
+    for w in websites:
+        last = (
+            db.query(Audit)
+            .filter(Audit.website_id == w.id)
+            .order_by(Audit.created_at.desc())
+            .first()
+        )
+        if not last:
+            lines.append(f"<p><b>{w.url}</b>: No audits yet.</p>")
+            continue
+        pdf_link = f"{BASE_URL}/auth/report/pdf/{w.id}"
+        lines.append(
+            f"<p><b>{w.url}</b>: Grade <b>{last.grade}</b>, Health <b>{last.health_score}</b>/100 "
+            f"(<a href=\"{pdf_link}\" target=\"_blank\" rel=\"noopener noreferrer\">Download Certified Report</a>)</p>"
+        )
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    audits_30 = db.query(Audit).filter(
+        Audit.user_id == user.id,
+        Audit.created_at >= thirty_days_ago
+    ).all()
+    if audits_30:
+        avg_score = round(sum(a.health_score for a in audits_30) / len(audits_30), 1)
+        lines.append(f"<hr><p><b>30-day accumulated score:</b> {avg_score}/100</p>")
+    else:
+        lines.append("<hr><p><b>30-day accumulated score:</b> Not enough data yet.</p>")
+    html = "\n".join(lines)
+    # Runs on the scheduler thread, after next_run_at was advanced: wait for
+    # room in a full mail queue rather than dropping the digest for the day
+    send_email(user.email, f"{UI_BRAND_NAME} – Daily Website Audit Summary", html, kind="daily_report", block=True)
 
 async def _daily_scheduler_loop():
+    """
+    Wake on every minute boundary; the process holding the scheduler lease
+    sends the digests that are due (see app/scheduler.py), off the event loop.
+    """
+    loop = asyncio.get_running_loop()
     while True:
+        await asyncio.sleep(scheduler.seconds_to_next_minute())
+        tick_started = loop.time()
+        SCHEDULER_LAG_SECONDS.set(time.time() % 60)
         try:
-            db = SessionLocal()
-            subs = db.query(Subscription).filter(Subscription.active == True).all()
-            now_utc = datetime.utcnow()
-            for sub in subs:
-                if not getattr(sub, "email_schedule_enabled", False):
-                    continue
-                tz_name    = getattr(sub, "timezone", "UTC") or "UTC"
-                daily_time = getattr(sub, "daily_time", "09:00") or "09:00"
-                try:
-                    tz = ZoneInfo(tz_name)
-                except Exception:
-                    tz = ZoneInfo("UTC")
-                local_now = now_utc.replace(tzinfo=ZoneInfo("UTC")).astimezone(tz)
-                hhmm_now  = local_now.strftime("%H:%M")
-                if hhmm_now != daily_time:
-                    continue
-                user = db.query(User).filter(User.id == sub.user_id).first()
-                if not user or not getattr(user, "verified", False):
-                    continue
-                websites = db.query(Website).filter(Website.user_id == user.id).all()
-                lines = [
-                    f"<h3>Daily Website Audit Summary – {UI_BRAND_NAME}</h3>",
-                    f"<p>Hello, {user.email}!</p>",
-                    "<p>Here is your daily summary. Download certified PDFs via links below.</p>"
-                ]
-                for w in websites:
-                    last = (
-                        db.query(Audit)
-                        .filter(Audit.website_id == w.id)
-                        .order_by(Audit.created_at.desc())
-                        .first()
-                    )
-                    if not last:
-                        lines.append(f"<p><b>{w.url}</b>: No audits yet.</p>")
-                        continue
-                    pdf_link = f"{BASE_URL}/auth/report/pdf/{w.id}"
-                    lines.append(
-                        f"<p><b>{w.url}</b>: Grade <b>{last.grade}</b>, Health <b>{last.health_score}</b>/100 "
-                        f"(<a href=\"{pdf_link}\" target=\"_blank\" rel=\"noopener noreferrer\">Download Certified Report</a>)</p>"
-                    )
-                thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-                audits_30 = db.query(Audit).filter(
-                    Audit.user_id == user.id,
-                    Audit.created_at >= thirty_days_ago
-                ).all()
-                if audits_30:
-                    avg_score = round(sum(a.health_score for a in audits_30) / len(audits_30), 1)
-                    lines.append(f"<hr><p><b>30-day accumulated score:</b> {avg_score}/100</p>")
-                else:
-                    lines.append("<hr><p><b>30-day accumulated score:</b> Not enough data yet.</p>")
-                html = "\n".join(lines)
-                _send_report_email(user.email, f"{UI_BRAND_NAME} – Daily Website Audit Summary", html)
-            db.close()
-        except Exception:
-            pass
-        await asyncio.sleep(60)
+            leader = await run_in_threadpool(scheduler.acquire_lease)
+            SCHEDULER_LEADER.set(1 if leader else 0)
+            if leader:
+                await run_in_threadpool(scheduler.run_due, _send_daily_summary)
+        except Exception as e:
+            SCHEDULER_ERRORS_TOTAL.inc(stage="pass")
+            print(f"[scheduler] Daily summary pass failed: {e!r}")
+        finally:
+            SCHEDULER_TICK_SECONDS.observe(loop.time() - tick_started)
 
 @app.on_event("startup")
 async def _start_scheduler():
     asyncio.create_task(_daily_scheduler_loop())
+
+@app.on_event("shutdown")
+async def _close_http_client():
+    close_client()
+    close_parse_pool()
+    close_mailer()
+    close_hash_pool()
+    try:
+        scheduler.release_lease()
+    except Exception as e:
+        print(f"[scheduler] Could not release the lease: {e!r}")
@@ -0,0 +1,205 @@
+# app/metric_store.py — audit category scores and metrics as rows of the narrow `audit_metrics` table
+#
+#   python -m app.metric_store --backfill     # copy older audits' JSON blobs into rows
+import argparse
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+
+from .db import Base, SessionLocal, engine
+from .models import Audit, AuditMetric
+
+BACKFILL_BATCH = 500
+
+
+# ----------------------------
+# Encoding
+# ----------------------------
+
+def _encode(value: Any) -> Tuple[str, Optional[float], Optional[str]]:
+    """(value_type, num_value, text_value) for one metric value."""
+    if value is None:
+        return "null", None, None
+    if isinstance(value, bool):
+        return "bool", 1.0 if value else 0.0, None
+    if isinstance(value, int):
+        return "int", float(value), None
+    if isinstance(value, float):
+        return "float", value, None
+    if isinstance(value, str):
+        return "str", None, value
+    return "json", None, json.dumps(value)
+
+
+def _decode(value_type: str, num_value: Optional[float], text_value: Optional[str]) -> Any:
+    if value_type == "bool":
+        return bool(num_value)
+    if value_type == "int":
+        return int(num_value)
+    if value_type == "float":
+        return num_value
+    if value_type == "str":
+        return text_value
+    if value_type == "json":
+        return json.loads(text_value)
+    return None
+
+
+# ----------------------------
+# Writes
+# ----------------------------
+
+def metric_rows(
+    audit_id: int,
+    user_id: int,
+    website_id: int,
+    created_at: datetime,
+    category_scores: Dict[str, Any],
+    metrics: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """audit_metrics rows for one audit result, ready for a batched INSERT."""
+    common = {"audit_id": audit_id, "user_id": user_id, "website_id": website_id, "created_at": created_at}
+    rows = []
+    for kind, values in (("category", category_scores), ("metric", metrics or {})):
+        for position, (name, value) in enumerate(values.items()):
+            value_type, num_value, text_value = _encode(int(value) if kind == "category" else value)
+            rows.append({
+                **common, "kind": kind, "name": name, "position": position,
+                "value_type": value_type, "num_value": num_value, "text_value": text_value,
+            })
+    return rows
+
+
+def save(db, rows: List[Dict[str, Any]]) -> None:
+    """One executemany INSERT for `rows`; the caller commits with its audits."""
+    if rows:
+        db.execute(insert(AuditMetric), rows)
+
+
+# ----------------------------
+# Reads
+# ----------------------------
+
+def load(db, audit: Audit, kinds: Tuple[str, ...] = ("category", "metric")) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    (category_scores as [{"name", "score"}], metrics dict) of one audit in
+    their original order. Audits stored before audit_metrics existed are
+    decoded from their JSON columns.
+    """
+    rows = db.execute(
+        select(AuditMetric.kind, AuditMetric.name, AuditMetric.value_type, AuditMetric.num_value, AuditMetric.text_value)
+        .where(AuditMetric.audit_id == audit.id, AuditMetric.kind.in_(kinds))
+        .order_by(AuditMetric.kind, AuditMetric.position)
+    ).all()
+    if not rows:
+        return _legacy(audit, kinds)
+    categories: List[Dict[str, Any]] = []
+    metrics: Dict[str, Any] = {}
+    for kind, name, value_type, num_value, text_value in rows:
+        value = _decode(value_type, num_value, text_value)
+        if kind == "category":
+            categories.append({"name": name, "score": value})
+        else:
+            metrics[name] = value
+    return categories, metrics
+
+
+def _legacy(audit: Audit, kinds: Tuple[str, ...]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    categories = json.loads(audit.category_scores_json) if "category" in kinds and audit.category_scores_json else []
+    metrics = json.loads(audit.metrics_json) if "metric" in kinds and audit.metrics_json else {}
+    return categories, metrics
+
+
+# ----------------------------
+# Cross-audit analytics
+# ----------------------------
+
+def _latest_audits(user_id: Optional[int] = None):
+    """Subquery: the newest audit id of every website (optionally one user's)."""
+    q = select(func.max(Audit.id).label("audit_id")).group_by(Audit.website_id)
+    if user_id is not None:
+        q = q.where(Audit.user_id == user_id)
+    return q.subquery()
+
+
+def websites_below(db, category: str, threshold: float, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Websites whose latest audit scored `category` below `threshold`, lowest first."""
+    latest = _latest_audits(user_id)
+    rows = db.execute(
+        select(AuditMetric.website_id, AuditMetric.audit_id, AuditMetric.num_value, AuditMetric.created_at)
+        .join(latest, AuditMetric.audit_id == latest.c.audit_id)
+        .where(AuditMetric.kind == "category", AuditMetric.name == category, AuditMetric.num_value < threshold)
+        .order_by(AuditMetric.num_value)
+    ).all()
+    return [
+        {"website_id": w, "audit_id": a, "score": int(v), "created_at": c}
+        for w, a, v, c in rows
+    ]
+
+
+def metric_average(db, name: str, since: datetime, user_id: Optional[int] = None) -> Optional[float]:
+    """Mean of a numeric metric (e.g. "ttfb_ms") over audits since `since`; None without data."""
+    q = select(func.avg(AuditMetric.num_value)).where(
+        AuditMetric.kind == "metric", AuditMetric.name == name,
+        AuditMetric.created_at >= since, AuditMetric.num_value.is_not(None),
+    )
+    if user_id is not None:
+        q = q.where(AuditMetric.user_id == user_id)
+    avg = db.scalar(q)
+    return float(avg) if avg is not None else None
+
+
+def metric_series(db, website_id: int, name: str, since: Optional[datetime] = None, kind: str = "metric") -> List[Tuple[datetime, Any]]:
+    """(created_at, value) of one metric or category score across a website's audits, oldest first."""
+    q = select(AuditMetric.created_at, AuditMetric.value_type, AuditMetric.num_value, AuditMetric.text_value).where(
+        AuditMetric.website_id == website_id, AuditMetric.kind == kind, AuditMetric.name == name,
+    )
+    if since is not None:
+        q = q.where(AuditMetric.created_at >= since)
+    return [(c, _decode(t, n, s)) for c, t, n, s in db.execute(q.order_by(AuditMetric.created_at)).all()]
+
+
+# ----------------------------
+# Backfill
+# ----------------------------
+
+def backfill(batch_size: int = BACKFILL_BATCH) -> int:
+    """Copy the JSON blobs of audits without audit_metrics rows into rows; returns audits converted."""
+    done = 0
+    last_id = 0
+    db = SessionLocal()
+    try:
+        while True:
+            has_rows = select(AuditMetric.id).where(AuditMetric.audit_id == Audit.id).exists()
+            audits = db.scalars(
+                select(Audit).where(Audit.id > last_id, ~has_rows).order_by(Audit.id).limit(batch_size)
+            ).all()
+            if not audits:
+                return done
+            rows = []
+            for a in audits:
+                categories, metrics = _legacy(a, ("category", "metric"))
+                scores = {c["name"]: c["score"] for c in categories}
+                rows.extend(metric_rows(a.id, a.user_id, a.website_id, a.created_at, scores, metrics))
+            save(db, rows)
+            db.commit()
+            done += len(audits)
+            last_id = audits[-1].id
+            print(f"[metric_store] Backfilled {done} audits")
+    finally:
+        db.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backfill", action="store_true", help="convert audits stored before audit_metrics existed")
+    args = ap.parse_args()
+    Base.metadata.create_all(bind=engine)
+    if args.backfill:
+        print(f"[metric_store] Done: {backfill()} audits converted")
+
+
+if __name__ == "__main__":
+    main()
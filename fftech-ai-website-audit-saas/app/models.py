@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Text, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from .db import Base
 
@@ -22,6 +22,9 @@ class Website(Base):
     url           = Column(String(2048), nullable=False)
     last_audit_at = Column(DateTime(timezone=True), nullable=True)
     last_grade    = Column(String(8), nullable=True)
+    etag          = Column(String(512), nullable=True)
+    last_modified = Column(String(64), nullable=True)
+    page_snapshot_json = Column(Text, nullable=True)
     created_at    = Column(DateTime(timezone=True), server_default=func.now())
 
     user   = relationship("User", back_populates="websites")
@@ -41,6 +44,30 @@ class Audit(Base):
 
     user    = relationship("User", back_populates="audits")
     website = relationship("Website", back_populates="audits")
+    metrics = relationship("AuditMetric", back_populates="audit", cascade="all,delete-orphan", passive_deletes=True)
+
+class AuditMetric(Base):
+    """One category score or raw metric of an audit (see app/metric_store.py)."""
+    __tablename__ = "audit_metrics"
+    id         = Column(Integer, primary_key=True)
+    audit_id   = Column(Integer, ForeignKey("audits.id", ondelete="CASCADE"), nullable=False, index=True)
+    website_id = Column(Integer, nullable=False)                    # denormalized from the audit for filters
+    user_id    = Column(Integer, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)  # the audit's
+    kind       = Column(String(16), nullable=False)               # "category" | "metric"
+    name       = Column(String(64), nullable=False)
+    position   = Column(Integer, nullable=False, default=0)       # order within the audit's result
+    value_type = Column(String(8), nullable=False)                # bool|int|float|str|json|null
+    num_value  = Column(Float, nullable=True)                     # bool/int/float values
+    text_value = Column(Text, nullable=True)                      # str values, lists/dicts as JSON
+
+    audit = relationship("Audit", back_populates="metrics")
+
+    __table_args__ = (
+        Index("ix_audit_metrics_name_value", "kind", "name", "num_value"),
+        Index("ix_audit_metrics_name_created", "kind", "name", "created_at"),
+        Index("ix_audit_metrics_website_name_created", "website_id", "kind", "name", "created_at"),
+    )
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
@@ -52,6 +79,35 @@ class Subscription(Base):
     daily_time             = Column(String(8), default="09:00")
     timezone               = Column(String(64), default="UTC")
     email_schedule_enabled = Column(Boolean, default=False)
+    next_run_at            = Column(DateTime(timezone=True), nullable=True, index=True)  # UTC; see app/scheduler.py
     created_at             = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="subscription")
+
+class QueuedAudit(Base):
+    """One row of the durable audit job queue (see app/job_queue.py)."""
+    __tablename__ = "audits_jobs"
+    id           = Column(String(32), primary_key=True)
+    kind         = Column(String(16), nullable=False)          # "website" | "open"
+    url          = Column(String(2048), nullable=False)
+    user_id      = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    website_id   = Column(Integer, ForeignKey("websites.id"), nullable=True)
+    status       = Column(String(16), nullable=False, default="queued")  # queued|running|done|dead
+    attempts     = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after    = Column(DateTime(timezone=True), nullable=False)
+    locked_by    = Column(String(128), nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error   = Column(Text, nullable=True)
+    result_json  = Column(Text, nullable=True)
+    created_at   = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at  = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (Index("ix_audits_jobs_status_run_after", "status", "run_after"),)
+
+class SchedulerLease(Base):
+    """A named lease held by one process at a time (the daily-email scheduler's leader)."""
+    __tablename__ = "scheduler_leases"
+    name       = Column(String(64), primary_key=True)
+    holder     = Column(String(128), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,196 @@
+# app/scheduler.py — daily-email schedule: indexed next-run times, catch-up and a single-leader lease
+#
+# Each enabled Subscription stores the UTC instant of its next digest in
+# `next_run_at`, so a pass only selects rows that are due instead of
+# converting every subscriber's timezone each minute. Runs missed while no
+# scheduler was up are still sent if they are at most SCHEDULER_CATCHUP_S
+# late. Only the process holding the "daily_email" lease runs passes, so any
+# number of web workers send each digest once.
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from .db import SessionLocal
+from .models import Subscription, SchedulerLease
+from .telemetry import SCHEDULER_ERRORS_TOTAL
+
+SCHEDULER_LEASE_S   = int(os.getenv("SCHEDULER_LEASE_S", "90"))    # > the 60s tick, so the leader renews in time
+SCHEDULER_CATCHUP_S = int(os.getenv("SCHEDULER_CATCHUP_S", "21600"))  # later than this, a missed digest is skipped
+SCHEDULER_BATCH     = int(os.getenv("SCHEDULER_BATCH", "200"))
+SCHEDULER_ID        = os.getenv("SCHEDULER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+LEASE_NAME          = "daily_email"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _utc(dt: datetime) -> datetime:
+    """SQLite hands DateTime(timezone=True) values back naive; they are stored as UTC."""
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def seconds_to_next_minute() -> float:
+    """Sleep this long to wake on the next wall-clock minute boundary."""
+    return 60 - time.time() % 60
+
+
+# ----------------------------
+# Next-run computation
+# ----------------------------
+
+def _zone(tz_name: Optional[str]) -> ZoneInfo:
+    try:
+        return ZoneInfo(tz_name or "UTC")
+    except Exception:
+        return ZoneInfo("UTC")
+
+
+def next_run_after(daily_time: Optional[str], tz_name: Optional[str], after: datetime) -> datetime:
+    """First UTC instant after `after` whose local time in `tz_name` is `daily_time` ("HH:MM")."""
+    tz = _zone(tz_name)
+    try:
+        hour, minute = (int(x) for x in (daily_time or "09:00").split(":", 1))
+    except ValueError:
+        hour, minute = 9, 0
+    local_after = _utc(after).astimezone(tz)
+    for days in range(0, 3):
+        day = local_after.date() + timedelta(days=days)
+        candidate = datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz).astimezone(timezone.utc)
+        if candidate > _utc(after):
+            return candidate
+    return candidate
+
+
+def reschedule(sub: Subscription, now: Optional[datetime] = None) -> None:
+    """Recompute sub.next_run_at from its schedule settings (None when disabled); the caller commits."""
+    if sub.active and sub.email_schedule_enabled:
+        sub.next_run_at = next_run_after(sub.daily_time, sub.timezone, now or _now())
+    else:
+        sub.next_run_at = None
+
+
+# ----------------------------
+# Leader lease
+# ----------------------------
+
+def acquire_lease(holder: str = SCHEDULER_ID, name: str = LEASE_NAME, ttl_s: int = SCHEDULER_LEASE_S) -> bool:
+    """Take or renew the named lease for `holder`; False while another live holder has it."""
+    now = _now()
+    until = now + timedelta(seconds=ttl_s)
+    db = SessionLocal()
+    try:
+        res = db.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name, or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now))
+            .values(holder=holder, expires_at=until)
+        )
+        if res.rowcount == 1:
+            db.commit()
+            return True
+        db.add(SchedulerLease(name=name, holder=holder, expires_at=until))
+        try:
+            db.commit()
+            return True
+        except IntegrityError:  # the row exists and someone else holds it
+            db.rollback()
+            return False
+    finally:
+        db.close()
+
+
+def release_lease(holder: str = SCHEDULER_ID, name: str = LEASE_NAME) -> None:
+    """Give the lease up (shutdown) so another process takes over without waiting for expiry."""
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+            .values(expires_at=_now() - timedelta(seconds=1))
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+# ----------------------------
+# Passes
+# ----------------------------
+
+def _schedule_missing(db, now: datetime) -> None:
+    """Enabled subscriptions without a next run yet (enabled before this column existed)."""
+    subs = db.scalars(select(Subscription).where(
+        Subscription.next_run_at.is_(None),
+        Subscription.active == True,  # noqa: E712
+        Subscription.email_schedule_enabled == True,  # noqa: E712
+    )).all()
+    for sub in subs:
+        reschedule(sub, now - timedelta(minutes=1))  # a run due this very minute still fires
+    if subs:
+        db.commit()
+
+
+def _advance(db, sub, due_at: datetime, now: datetime) -> bool:
+    """Move a due subscription to its next run; False if another scheduler already did."""
+    res = db.execute(
+        update(Subscription)
+        .where(Subscription.id == sub.id, Subscription.next_run_at == due_at)
+        .values(next_run_at=next_run_after(sub.daily_time, sub.timezone, now))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return res.rowcount == 1
+
+
+def run_due(send: Callable[..., None], now: Optional[datetime] = None) -> int:
+    """
+    Send every due digest: `send(db, sub)` is called once per subscription
+    whose next_run_at has passed (`sub` is a row with id, user_id,
+    daily_time, timezone and next_run_at), after its next run was committed
+    (a crash mid-send skips that digest rather than repeating it). Returns
+    how many were sent.
+    """
+    now = now or _now()
+    sent = 0
+    db = SessionLocal()
+    try:
+        _schedule_missing(db, now)
+        while True:
+            subs = db.execute(
+                select(
+                    Subscription.id, Subscription.user_id, Subscription.daily_time,
+                    Subscription.timezone, Subscription.next_run_at,
+                )
+                .where(
+                    Subscription.next_run_at <= now,
+                    Subscription.active == True,  # noqa: E712
+                    Subscription.email_schedule_enabled == True,  # noqa: E712
+                )
+                .order_by(Subscription.next_run_at)
+                .limit(SCHEDULER_BATCH)
+            ).all()
+            if not subs:
+                return sent
+            for sub in subs:
+                due_at = sub.next_run_at
+                if not _advance(db, sub, due_at, now):
+                    continue
+                late = now - _utc(due_at)
+                if late > timedelta(seconds=SCHEDULER_CATCHUP_S):
+                    print(f"[scheduler] Skipped digest for subscription {sub.id}: {late} late")
+                    continue
+                try:
+                    send(db, sub)
+                    sent += 1
+                except Exception as e:
+                    db.rollback()
+                    SCHEDULER_ERRORS_TOTAL.inc(stage="send")
+                    print(f"[scheduler] Digest for subscription {sub.id} failed: {e!r}")
+    finally:
+        db.close()
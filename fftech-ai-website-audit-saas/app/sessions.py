@@ -0,0 +1,76 @@
+# app/sessions.py — resolve the session cookie to a User through a small TTL/LRU cache
+import os
+import threading
+from typing import Dict, Hashable, Optional
+
+from .auth import decode_token
+from .cache import TTLCache
+from .db import SessionLocal
+from .models import User
+
+SESSION_CACHE_SIZE  = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+SESSION_CACHE_TTL_S = float(os.getenv("SESSION_CACHE_TTL_S", "60"))  # bounds staleness across worker processes
+
+_users = TTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL_S)
+_MISS = object()
+
+# Bumped by invalidate_user(): the user's cached entries stop matching and age out
+_generation: Dict[int, int] = {}
+_generation_lock = threading.Lock()
+
+
+def _claims(token: Optional[str]) -> Optional[dict]:
+    if not token:
+        return None
+    try:
+        data = decode_token(token)
+    except Exception:
+        return None
+    return data if data.get("uid") else None
+
+
+def _key(data: dict) -> Hashable:
+    uid = data["uid"]
+    return uid, data.get("iat"), _generation.get(uid, 0)
+
+
+def cached_user(token: Optional[str]):
+    """(hit, user) for a session token without touching the database; user is None when signed out."""
+    data = _claims(token)
+    if data is None:
+        return True, None
+    user = _users.get(_key(data), _MISS)
+    return (False, None) if user is _MISS else (True, user)
+
+
+def load_user(token: str) -> Optional[User]:
+    """Look the token's user up (verified users only) and cache the answer, negative ones included."""
+    data = _claims(token)
+    if data is None:
+        return None
+    key = _key(data)
+    db = SessionLocal()
+    try:
+        u = db.query(User).filter(User.id == data["uid"]).first()
+        user = u if u and getattr(u, "verified", False) else None
+    finally:
+        db.close()
+    _users.set(key, user)
+    return user
+
+
+def forget(token: Optional[str]) -> None:
+    """Drop one session's entry (logout)."""
+    data = _claims(token)
+    if data is not None:
+        _users.pop(_key(data))
+
+
+def invalidate_user(uid: int) -> None:
+    """Forget every cached session of a user whose row changed (verification, admin edits)."""
+    with _generation_lock:
+        _generation[uid] = _generation.get(uid, 0) + 1
+
+
+def cache_stats() -> Dict[str, int]:
+    return _users.stats()
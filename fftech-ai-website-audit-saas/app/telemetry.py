@@ -0,0 +1,186 @@
+# app/telemetry.py — in-process counters/gauges/histograms rendered in the Prometheus text format
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Seconds; covers fast probes (ms) through slow audits and PDF renders
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: List["_Metric"] = []
+_registry_lock = threading.Lock()
+_collectors: List[Callable[[], None]] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic count, optionally per label combination."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, v in items:
+            yield f"{self.name}{_fmt_labels(self.labels, key)} {_fmt_value(v)}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down (last set wins)."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with _sum and _count, per label combination."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for key, row in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                le = 'le="%s"' % _fmt_value(bound)
+                yield f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {cumulative}"
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {row[-1]}"
+            yield f"{self.name}_sum{_fmt_labels(self.labels, key)} {_fmt_value(row[-2])}"
+            yield f"{self.name}_count{_fmt_labels(self.labels, key)} {row[-1]}"
+
+
+def register_collector(fn: Callable[[], None]) -> None:
+    """Run `fn` before every render, e.g. to copy cache stats into gauges."""
+    _collectors.append(fn)
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format (0.0.4)."""
+    for fn in _collectors:
+        try:
+            fn()
+        except Exception as e:
+            print(f"[telemetry] Collector {getattr(fn, '__name__', fn)} failed: {e}")
+    with _registry_lock:
+        metrics = list(_registry)
+    return "\n".join(m.render() for m in metrics) + "\n"
+
+
+# ----------------------------
+# App & audit pipeline metrics
+# ----------------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ["method", "route", "status"])
+AUDIT_SECONDS = Histogram(
+    "audit_duration_seconds", "Wall time of one robust audit (variant race + checks).", ["outcome"])
+AUDITS_TOTAL = Counter(
+    "audits_total", "Audits by outcome: success, fallback (heuristic baseline) or error.", ["outcome"])
+PROBE_SECONDS = Histogram(
+    "audit_probe_duration_seconds", "Per-probe fetch latency inside run_basic_checks.", ["probe"])
+PDF_RENDER_SECONDS = Histogram(
+    "pdf_render_duration_seconds", "Time to render one PDF report.")
+EMAILS_TOTAL = Counter(
+    "emails_total", "Emails by kind and result (sent/failed).", ["kind", "result"])
+AUTH_REJECTED_TOTAL = Counter(
+    "auth_rejected_total", "Password logins/registrations refused by admission control (ip, email, busy).", ["reason"])
+SCHEDULER_LAG_SECONDS = Gauge(
+    "scheduler_loop_lag_seconds", "How late the last daily-scheduler tick started after its minute boundary.")
+SCHEDULER_LEADER = Gauge(
+    "scheduler_leader", "1 while this process holds the daily-scheduler lease, else 0.")
+SCHEDULER_TICK_SECONDS = Histogram(
+    "scheduler_tick_duration_seconds", "Duration of one daily-scheduler pass.")
+SCHEDULER_ERRORS_TOTAL = Counter(
+    "scheduler_errors_total", "Exceptions raised inside the daily-scheduler loop.", ["stage"])
+CACHE_STAT = Gauge(
+    "cache_stat", "Cache counters (hits, misses, evictions, size, ...) by cache.", ["cache", "stat"])
+
+
+def count_email(kind: str, ok: bool) -> bool:
+    """Record an email send result and pass it through."""
+    EMAILS_TOTAL.inc(kind=kind, result="sent" if ok else "failed")
+    return ok
+
+
+def observe_timed(hist: Histogram, fn: Callable, *args, **labels):
+    """Call fn(*args), observing its duration in `hist` (thread-pool friendly)."""
+    with hist.time(**labels):
+        return fn(*args)
@@ -0,0 +1,105 @@
+# app/worker.py — standalone audit worker draining the audits_jobs queue
+#
+#   JOB_BACKEND=db python -m app.worker
+#
+# Run as many of these as needed (one per container/node); they coordinate
+# only through the database, so the web tier just enqueues.
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from . import job_queue
+from .db import Base, engine
+from .audit.runner import cached_audit
+from .jobs import run_website_audit
+
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "8"))
+WORKER_POLL_S      = float(os.getenv("WORKER_POLL_S", "1.0"))
+WORKER_ID          = os.getenv("WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
+
+def execute(row) -> Optional[Any]:
+    """Run one claimed job; returns what to store as its result (open audits only)."""
+    if row.kind == "website":
+        run_website_audit(row.user_id, row.website_id)
+        return None
+    if row.kind == "open":
+        return list(cached_audit(row.url))
+    raise ValueError(f"unknown job kind {row.kind!r}")
+
+
+def _heartbeat(job_id: str, worker_id: str, done: threading.Event) -> None:
+    """Keep renewing the job's lease until `done`, so long audits are not reaped and re-run."""
+    while not done.wait(job_queue.JOB_HEARTBEAT_S):
+        try:
+            if not job_queue.extend(job_id, worker_id):
+                print(f"[worker] Lost the lease on job {job_id}")
+                return
+        except Exception as e:
+            print(f"[worker] Lease renewal for job {job_id} failed: {e}")
+
+
+def _process(row, worker_id: str) -> None:
+    done = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(row.id, worker_id, done), name=f"lease-{row.id[:8]}", daemon=True)
+    beat.start()
+    try:
+        result = execute(row)
+    except Exception as e:
+        status = job_queue.fail(row, worker_id, str(e) or e.__class__.__name__)
+        print(f"[worker] Job {row.id} ({row.url}) attempt {row.attempts} failed: {e} -> {status}")
+        return
+    finally:
+        done.set()
+    if not job_queue.complete(row.id, worker_id, result):
+        print(f"[worker] Job {row.id} finished after its lease expired; result discarded")
+
+
+def run_worker(concurrency: int = WORKER_CONCURRENCY, worker_id: str = WORKER_ID,
+               stop: Optional[threading.Event] = None) -> None:
+    """
+    Claim due jobs whenever a slot is free and run them on `concurrency`
+    threads until `stop` is set; in-flight jobs are finished before returning.
+    """
+    stop = stop or threading.Event()
+    slots = threading.Semaphore(concurrency)
+    print(f"[worker] {worker_id} started (concurrency={concurrency}, db={engine.dialect.name})")
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="audit-worker") as pool:
+        def run(row):
+            try:
+                _process(row, worker_id)
+            finally:
+                slots.release()
+
+        while not stop.is_set():
+            free = 0
+            while slots.acquire(blocking=False):
+                free += 1
+            try:
+                job_queue.reap_expired()
+                rows = job_queue.claim(worker_id, free)
+            except Exception as e:
+                print(f"[worker] Claim failed: {e}")
+                rows = []
+            for _ in range(free - len(rows)):
+                slots.release()
+            for row in rows:
+                pool.submit(run, row)
+            if not rows:
+                stop.wait(WORKER_POLL_S)
+    print(f"[worker] {worker_id} stopped")
+
+
+def main() -> None:
+    Base.metadata.create_all(bind=engine)
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    run_worker(stop=stop)
+
+
+if __name__ == "__main__":
+    main()
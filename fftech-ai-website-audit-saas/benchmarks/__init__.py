@@ -0,0 +1 @@
+# Offline benchmarks for the audit engine; run modules with `python -m benchmarks.<name>`.
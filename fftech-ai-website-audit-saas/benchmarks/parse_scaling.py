@@ -0,0 +1,80 @@
+# parse_scaling.py — throughput of the CPU stage (parse + score) across cores
+#
+#   python -m benchmarks.parse_scaling [--docs 32] [--size-kb 2048] [--max-workers N]
+#
+# Feeds synthetic large HTML documents straight into engine.analyze_page (no
+# network), first inline, then on a thread pool (GIL-bound, shouldn't scale)
+# and on process pools of 1..N workers.
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.audit.engine import analyze_page
+from .server import synthetic_page
+
+
+def fetched_for(body: bytes) -> dict:
+    """A _fetch_stage-shaped input carrying a buffered body."""
+    return {
+        "url": "https://bench.example/",
+        "collect_links": True,
+        "body": body,
+        "content_type": "text/html; charset=utf-8",
+        "not_modified": False,
+        "status": 200,
+        "content_length": len(body),
+        "transfer_bytes": len(body),
+        "headers": {"content-type": "text/html; charset=utf-8", "content-encoding": "gzip"},
+        "truncated": False,
+        "charset": "",
+        "robots_ok": True,
+        "sitemap_ok": True,
+        "timings": {},
+    }
+
+
+def _run(executor, jobs) -> float:
+    start = time.perf_counter()
+    if executor is None:
+        for job in jobs:
+            analyze_page(job)
+    else:
+        list(executor.map(analyze_page, jobs))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=32)
+    ap.add_argument("--size-kb", type=int, default=2048)
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    body = synthetic_page(args.size_kb, images=args.size_kb // 4, tags=args.size_kb)
+    jobs = [fetched_for(body) for _ in range(args.docs)]
+    total_mb = len(body) * args.docs / 1e6
+    print(f"{args.docs} docs x {len(body) / 1024:.0f} KiB, {os.cpu_count()} CPUs\n")
+    print(f"{'mode':<14}{'workers':>8}{'seconds':>10}{'docs/s':>10}{'MB/s':>10}{'speedup':>9}")
+
+    baseline = _run(None, jobs)
+
+    def report(mode, workers, elapsed):
+        print(f"{mode:<14}{workers:>8}{elapsed:>10.2f}{args.docs / elapsed:>10.1f}"
+              f"{total_mb / elapsed:>10.1f}{baseline / elapsed:>8.2f}x")
+
+    report("inline", 1, baseline)
+    workers = sorted({1, 2, 4, 8, 16, args.max_workers} & set(range(1, args.max_workers + 1)))
+    for n in workers:
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            report("threads", n, _run(pool, jobs))
+    ctx = multiprocessing.get_context("spawn")
+    for n in workers:
+        with ProcessPoolExecutor(max_workers=n, mp_context=ctx) as pool:
+            list(pool.map(analyze_page, jobs[:n]))  # start the workers outside the timing
+            report("processes", n, _run(pool, jobs))
+
+
+if __name__ == "__main__":
+    main()
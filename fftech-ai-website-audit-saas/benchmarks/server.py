@@ -0,0 +1,167 @@
+# server.py — local stand-in web server serving synthetic pages for offline benchmarks
+#
+#   with LocalSite() as site:
+#       site.page(kb=200, images=40, gz=1, ttfb_ms=150)   # -> {base}/page/kb=200,images=40,gz=1,ttfb_ms=150
+#
+# Pages are generated from the parameters in their path (the audit runner
+# drops query strings when it normalizes URLs):
+#   kb       approximate body size in KiB (default 50)
+#   images   number of <img> tags, every other one without alt (default 10)
+#   tags     number of extra nested <div><span> blocks (default 100)
+#   gz       1 = gzip the body when the client accepts it
+#   ttfb_ms  delay before the response headers are sent
+#   etag     1 = send an ETag and answer a matching If-None-Match with 304
+# robots.txt and sitemap.xml exist only when the site is started with them;
+# `robots` may also be the robots.txt text to serve, or an HTTP status to
+# answer it with. Every request path is counted in `site.hits`.
+import gzip
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Union
+from urllib.parse import urlparse
+
+
+@lru_cache(maxsize=64)
+def synthetic_page(size_kb: int = 50, images: int = 10, tags: int = 100) -> bytes:
+    """A page of roughly `size_kb` KiB with the tag mix the audit checks inspect."""
+    parts = [
+        '<!doctype html><html lang="en"><head><meta charset="utf-8">'
+        '<title>Synthetic benchmark page</title>'
+        '<meta name="description" content="A synthetic page used to benchmark the audit engine offline.">'
+        '<meta name="viewport" content="width=device-width"><link rel="canonical" href="/">'
+        '<link rel="icon" href="/favicon.ico"><meta property="og:title" content="Bench">'
+        '</head><body><nav><a href="/">Home</a></nav><main><h1>Benchmark</h1>'
+    ]
+    for i in range(images):
+        alt = f' alt="image {i}"' if i % 2 == 0 else ""
+        parts.append(f'<img src="/img/{i}.png"{alt}>')
+    for i in range(tags):
+        parts.append(f'<div class="c{i % 7}"><span>{i}</span></div>')
+    size = sum(len(p) for p in parts)
+    block = (
+        '<section><h2>Section {i}</h2><p>Lorem ipsum dolor sit amet, <b>consectetur</b> '
+        'adipiscing elit, sed do <a href="/page/{i}">eiusmod</a> tempor incididunt.</p>'
+        '<ul><li>one</li><li>two</li><li>three</li></ul></section>'
+    )
+    i = 0
+    while size < size_kb * 1024:
+        b = block.format(i=i)
+        parts.append(b)
+        size += len(b)
+        i += 1
+    parts.append("</main></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+@lru_cache(maxsize=64)
+def _gzipped(size_kb: int, images: int, tags: int) -> bytes:
+    return gzip.compress(synthetic_page(size_kb, images, tags), compresslevel=6)
+
+
+def _params(path: str) -> dict:
+    """'/page/kb=200,gz=1' -> {"kb": 200, "gz": 1}; malformed pairs are ignored."""
+    out = {}
+    for pair in path[len("/page/"):].strip("/").split(","):
+        k, _, v = pair.partition("=")
+        if v.isdigit():
+            out[k] = int(v)
+    return out
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like real servers behind the pooled client
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "text/plain", headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        site = self.server.site
+        p = urlparse(self.path)
+        with site._lock:
+            site.hits[p.path] = site.hits.get(p.path, 0) + 1
+        if p.path == "/robots.txt" and site.robots is not False:
+            if isinstance(site.robots, str):
+                return self._send(200, site.robots.encode())
+            if site.robots is not True:
+                return self._send(site.robots, b"")
+            return self._send(200, f"User-agent: *\nAllow: /\nSitemap: {site.base}/sitemap.xml\n".encode())
+        if p.path == "/sitemap.xml" and site.sitemap:
+            body = (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f"<url><loc>{site.base}/page</loc></url></urlset>"
+            )
+            return self._send(200, body.encode(), "application/xml")
+        if p.path != "/page" and not p.path.startswith("/page/"):
+            return self._send(404, b"not found")
+
+        params = _params(p.path)
+        if params.get("ttfb_ms"):
+            time.sleep(params["ttfb_ms"] / 1000)
+        key = (params.get("kb", 50), params.get("images", 10), params.get("tags", 100))
+        headers = {
+            "Cache-Control": "public, max-age=300",
+            "X-Content-Type-Options": "nosniff",
+            "X-Frame-Options": "DENY",
+        }
+        if params.get("etag"):
+            headers["ETag"] = f'"{hash(key) & 0xffffffff:x}"'
+            if self.headers.get("If-None-Match") == headers["ETag"]:
+                with site._lock:
+                    site.not_modified += 1
+                return self._send(304, b"", "text/html; charset=utf-8", headers)
+        if params.get("gz") and "gzip" in self.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            body = _gzipped(*key)
+        else:
+            body = synthetic_page(*key)
+        self._send(200, body, "text/html; charset=utf-8", headers)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # The audit fetcher hangs up once its byte budget is spent; that's expected
+        pass
+
+
+class LocalSite:
+    """A ThreadingHTTPServer on 127.0.0.1 (random port) running in a daemon thread."""
+    def __init__(self, robots: Union[bool, str, int] = True, sitemap: bool = True):
+        self.robots = robots
+        self.sitemap = sitemap
+        self.hits: Dict[str, int] = {}
+        self.not_modified = 0  # 304 answers sent
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.site = self
+        self.base = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="bench-site", daemon=True)
+
+    def page(self, **params: int) -> str:
+        """URL of a synthetic page with the given generator parameters."""
+        return f"{self.base}/page/" + ",".join(f"{k}={v}" for k, v in params.items())
+
+    def __enter__(self) -> "LocalSite":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
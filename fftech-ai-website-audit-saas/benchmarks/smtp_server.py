@@ -0,0 +1,97 @@
+# smtp_server.py — local stand-in SMTP relay for offline mailer benchmarks and checks
+#
+#   with LocalSMTP(fail_every=10) as smtp:
+#       mailer = Mailer(host="127.0.0.1", port=smtp.port, user="u", password="p", starttls=False)
+#       mailer.send("to@example.com", "Hi", "<p>Hi</p>")
+#       smtp.connections, len(smtp.messages)
+#
+# Speaks just enough ESMTP for smtplib: EHLO/HELO, AUTH PLAIN, MAIL, RCPT,
+# DATA, RSET, NOOP and QUIT (no STARTTLS). With fail_every=N every Nth
+# message is answered "451" after DATA, to exercise retries.
+import socketserver
+import threading
+from email import message_from_bytes
+from typing import List, Tuple
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str) -> None:
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def _data(self) -> bytes:
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                return b"".join(lines)
+            lines.append(line[1:] if line.startswith(b"..") else line)
+
+    def handle(self):
+        smtp = self.server.smtp
+        with smtp._lock:
+            smtp.connections += 1
+        self._reply("220 localhost ESMTP stand-in")
+        rcpts: List[str] = []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            cmd, _, arg = raw.decode("utf-8", "replace").strip().partition(" ")
+            cmd = cmd.upper()
+            if cmd == "EHLO":
+                self._reply("250-localhost")
+                self._reply("250-AUTH PLAIN")
+                self._reply("250 8BITMIME")
+            elif cmd == "HELO":
+                self._reply("250 localhost")
+            elif cmd == "AUTH":
+                self._reply("235 2.7.0 Authentication successful")
+            elif cmd == "MAIL":
+                rcpts = []
+                self._reply("250 OK")
+            elif cmd == "RCPT":
+                rcpts.append(arg.partition(":")[2].strip("<> "))
+                self._reply("250 OK")
+            elif cmd == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                msg = message_from_bytes(self._data())
+                with smtp._lock:
+                    smtp.received += 1
+                    failed = smtp.fail_every and smtp.received % smtp.fail_every == 0
+                    if not failed:
+                        smtp.messages.extend((r, msg["Subject"] or "") for r in rcpts)
+                self._reply("451 4.3.0 Try again later" if failed else "250 OK queued")
+            elif cmd in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            elif cmd == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalSMTP:
+    """A ThreadingTCPServer on 127.0.0.1 (random port) recording accepted (recipient, subject) pairs."""
+    def __init__(self, fail_every: int = 0):
+        self.fail_every = fail_every
+        self.connections = 0
+        self.received = 0
+        self.messages: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.smtp = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="bench-smtp", daemon=True)
+
+    def __enter__(self) -> "LocalSMTP":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,168 @@
+# suite.py — offline benchmarks of the audit engine against a local stand-in web server
+#
+#   python -m benchmarks.suite [--iterations 20] [--concurrency 4] [--only basic] [--out results.json]
+#
+# Two local sites are started (one with robots.txt + sitemap.xml, one without)
+# plus a stand-in SMTP relay, and each scenario is timed for latency percentiles, throughput at the given
+# concurrency and peak Python memory (tracemalloc, one extra call). Results are
+# written as JSON (default: benchmarks/results/<timestamp>.json) to compare runs.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.audit.engine import run_basic_checks, run_competitor_analysis_one_page
+from app.audit.report import render_pdf
+from app.audit.runner import robust_audit
+from app.email_utils import Mailer
+from .server import LocalSite
+from .smtp_server import LocalSMTP
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# (name, site, page parameters) — site "full" serves robots.txt + sitemap.xml, "bare" doesn't
+PAGES: List[Tuple[str, str, Dict[str, int]]] = [
+    ("10kb", "full", {"kb": 10, "images": 5, "tags": 20}),
+    ("10kb-bare", "bare", {"kb": 10, "images": 5, "tags": 20}),
+    ("200kb-images", "full", {"kb": 200, "images": 400, "tags": 500}),
+    ("200kb-gzip", "full", {"kb": 200, "images": 40, "tags": 500, "gz": 1}),
+    ("2mb-tags", "full", {"kb": 2048, "images": 100, "tags": 20000}),
+    ("2mb-gzip", "full", {"kb": 2048, "images": 100, "tags": 2000, "gz": 1}),
+    ("20mb", "full", {"kb": 20480, "images": 100, "tags": 2000}),
+    ("slow-ttfb-300ms", "full", {"kb": 50, "ttfb_ms": 300}),
+]
+
+
+def _percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    i = min(len(sorted_samples) - 1, max(0, round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[i]
+
+
+def measure(fn: Callable[[], Any], iterations: int, concurrency: int) -> Dict[str, Any]:
+    """Latency percentiles and throughput of `iterations` calls on `concurrency` threads, plus peak memory."""
+    fn()  # warm up: connection pool, robots/sitemap caches, generator caches
+
+    latencies: List[float] = []
+
+    def one(_):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(iterations)))
+    wall = time.perf_counter() - wall_start
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    ms = lambda s: round(s * 1000, 2)  # noqa: E731
+    return {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "throughput_per_s": round(iterations / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "mean": ms(sum(latencies) / len(latencies)),
+            "p50": ms(_percentile(latencies, 0.50)),
+            "p90": ms(_percentile(latencies, 0.90)),
+            "p99": ms(_percentile(latencies, 0.99)),
+            "max": ms(latencies[-1]),
+        },
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def _send_batch(mailer: Mailer, n: int) -> int:
+    futures = [mailer.submit(f"user{i}@bench.test", "Daily summary", "<p>summary</p>", kind="bench") for i in range(n)]
+    return sum(f.result() for f in futures)
+
+
+def scenarios(sites: Dict[str, LocalSite], pdf_path: str, smtp: LocalSMTP) -> List[Tuple[str, Callable[[], Any]]]:
+    out: List[Tuple[str, Callable[[], Any]]] = []
+    for name, site, params in PAGES:
+        url = sites[site].page(**params)
+        out.append((f"run_basic_checks/{name}", lambda url=url: run_basic_checks(url)))
+    for name in ("10kb", "slow-ttfb-300ms"):
+        _, site, params = next(p for p in PAGES if p[0] == name)
+        url = sites[site].page(**params)
+        out.append((f"robust_audit/{name}", lambda url=url: robust_audit(url)))
+
+    full = sites["full"]
+    target = full.page(kb=50)
+    competitors = [full.page(kb=kb, images=i) for kb, i in ((10, 5), (100, 50), (200, 100), (500, 20))]
+    out.append(("competitor_analysis/1+4", lambda: run_competitor_analysis_one_page(target, competitors)))
+
+    cats = [{"name": c, "score": s} for c, s in
+            (("Performance", 84), ("Accessibility", 92), ("SEO", 88), ("Security", 61), ("BestPractices", 95))]
+    summary = "Benchmark summary. " * 40
+    out.append(("render_pdf", lambda: render_pdf(pdf_path, "FF Tech", target, "B", 84, cats, summary)))
+
+    mailer = Mailer(host="127.0.0.1", port=smtp.port, user="bench", password="bench", starttls=False)
+    out.append(("mailer/100-messages", lambda: _send_batch(mailer, 100)))
+    return out
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--iterations", type=int, default=20)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--only", default="", help="run scenarios whose name contains this substring")
+    ap.add_argument("--out", default="", help="results file (default: benchmarks/results/<timestamp>.json)")
+    args = ap.parse_args()
+
+    started = datetime.now(timezone.utc)
+    results: Dict[str, Any] = {}
+    with LocalSite(robots=True, sitemap=True) as full, LocalSite(robots=False, sitemap=False) as bare, \
+            LocalSMTP() as smtp, tempfile.TemporaryDirectory() as tmp:
+        print(f"{'scenario':<34}{'ops/s':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'peak KB':>11}")
+        for name, fn in scenarios({"full": full, "bare": bare}, os.path.join(tmp, "bench.pdf"), smtp):
+            if args.only not in name:
+                continue
+            r = results[name] = measure(fn, args.iterations, args.concurrency)
+            lat = r["latency_ms"]
+            print(f"{name:<34}{r['throughput_per_s']:>9}{lat['p50']:>10}{lat['p90']:>10}{lat['p99']:>10}"
+                  f"{r['peak_memory_kb']:>11}")
+
+    report = {
+        "started_at": started.isoformat(),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "env": {k: v for k, v in os.environ.items() if k.startswith(("AUDIT_", "HTTP_", "ASSET_", "MAIL_"))},
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{started:%Y%m%dT%H%M%SZ}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\nwrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# tests/conftest.py — every test runs against a fresh SQLite database
+import os
+import sys
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="fftech-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from app import models  # noqa: E402,F401  (registers the tables)
+from app.db import Base, SessionLocal, engine  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    u = models.User(email="owner@example.com", password_hash="x", verified=True, is_admin=False)
+    db.add(u); db.commit(); db.refresh(u)
+    return u
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import pytest
+
+from app.audit import assets
+
+
+@pytest.fixture(autouse=True)
+def fake_probes(monkeypatch):
+    """Probes that take `delays[host]` seconds and report 1000 bytes, tracking per-host concurrency."""
+    assets._asset_cache.clear()
+    assets._host_busy.clear()
+    monkeypatch.setattr(assets, "ASSET_PER_HOST", 2)
+    lock, running, peak, delays = threading.Lock(), Counter(), Counter(), {}
+
+    def probe(url):
+        host = urlparse(url).netloc
+        with lock:
+            running[host] += 1
+            peak[host] = max(peak[host], running[host])
+        time.sleep(delays.get(host, 0.01))
+        with lock:
+            running[host] -= 1
+        return 1000, "image/png"
+
+    monkeypatch.setattr(assets, "_probe_asset", probe)
+    yield delays, peak
+    assets._asset_cache.clear()
+
+
+def _imgs(host, n, tag=""):
+    return [("img", f"https://{host}/{tag}{i}.png") for i in range(n)]
+
+
+def _wait_idle(timeout=5):
+    deadline = time.monotonic() + timeout
+    while len(assets._host_busy) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_sizes_are_summed_and_per_host_concurrency_is_capped(fake_probes):
+    _, peak = fake_probes
+    result = assets.analyze_assets("https://site.test/", _imgs("cdn.test", 8) + [("css", "/a.css")], html_bytes=500)
+    assert result["asset_count"] == 9 and result["assets_unsized"] == 0
+    assert result["asset_bytes_img"] == 8000 and result["asset_bytes_css"] == 1000
+    assert result["page_weight_bytes"] == 9500
+    assert peak["cdn.test"] == 2
+    assert len(assets._host_busy) == 0
+
+
+def test_a_slow_host_does_not_hold_up_a_fast_one(fake_probes, monkeypatch):
+    delays, peak = fake_probes
+    delays["slow.test"] = 0.3
+    pool = ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(assets, "_asset_pool", pool)
+    # More slow assets than the shared pool has threads: only ASSET_PER_HOST may take them
+    slow = threading.Thread(target=assets.analyze_assets, args=("https://a.test/", _imgs("slow.test", 8)))
+    slow.start()
+    time.sleep(0.05)
+    started = time.perf_counter()
+    fast = assets.analyze_assets("https://b.test/", _imgs("fast.test", 10))
+    elapsed = time.perf_counter() - started
+    assert fast["assets_unsized"] == 0 and elapsed < 0.3
+    assert peak["slow.test"] == 2
+    slow.join(15)
+    pool.shutdown()
+    assert len(assets._host_busy) == 0
+
+
+def test_deadline_leaves_no_slots_behind(fake_probes, monkeypatch):
+    delays, _ = fake_probes
+    delays["slow.test"] = 0.4
+    monkeypatch.setattr(assets, "ASSET_BUDGET_S", 0.2)
+    result = assets.analyze_assets("https://a.test/", _imgs("slow.test", 10))
+    assert result["assets_unsized"] == 10 and result["asset_probe_ms"] < 400
+    _wait_idle()  # the two probes that had started finish and hand their slots back
+    assert len(assets._host_busy) == 0
+    # ...and the host is usable again at full width
+    assert assets._try_acquire("slow.test") and assets._try_acquire("slow.test")
+    assert not assets._try_acquire("slow.test")
+    assets._release("slow.test"); assets._release("slow.test")
+
+
+def test_cached_assets_skip_the_slots(fake_probes):
+    _, peak = fake_probes
+    assets.analyze_assets("https://a.test/", _imgs("cdn.test", 3))
+    peak.clear()
+    again = assets.analyze_assets("https://b.test/", _imgs("cdn.test", 3))
+    assert again["asset_bytes_img"] == 3000 and peak["cdn.test"] == 0
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+
+import pytest
+
+from app import auth
+
+
+@pytest.fixture(autouse=True)
+def empty_buckets(monkeypatch):
+    auth._buckets.clear()
+    monkeypatch.setattr(auth, "LOGIN_IP_BURST", 3)
+    monkeypatch.setattr(auth, "LOGIN_IP_PER_MIN", 60)     # one token per second
+    monkeypatch.setattr(auth, "LOGIN_EMAIL_BURST", 2)
+    monkeypatch.setattr(auth, "LOGIN_EMAIL_PER_MIN", 60)
+    yield
+    auth._buckets.clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(auth.time, "monotonic", lambda: now[0])
+    return now
+
+
+# ---- token buckets ----
+
+def test_ip_bucket_allows_a_burst_then_rejects(clock):
+    assert [auth.admit("login", "1.2.3.4", None) for _ in range(4)] == [True, True, True, False]
+    assert auth.admit("login", "5.6.7.8", None) is True  # other clients are unaffected
+
+
+def test_buckets_refill_over_time(clock):
+    for _ in range(3):
+        auth.admit("login", "1.2.3.4", None)
+    assert auth.admit("login", "1.2.3.4", None) is False
+    clock[0] += 1.0
+    assert auth.admit("login", "1.2.3.4", None) is True
+    assert auth.admit("login", "1.2.3.4", None) is False
+
+
+def test_email_bucket_is_case_insensitive_and_shared_across_ips(clock):
+    assert auth.admit("login", "1.1.1.1", "Victim@Example.com") is True
+    assert auth.admit("login", "2.2.2.2", "victim@example.com ") is True
+    assert auth.admit("login", "3.3.3.3", "VICTIM@example.com") is False
+
+
+def test_ip_rejection_does_not_spend_the_email_token(clock):
+    for _ in range(3):
+        auth.admit("login", "1.2.3.4", None)
+    assert auth.admit("login", "1.2.3.4", "user@example.com") is False
+    assert auth.admit("login", "9.9.9.9", "user@example.com") is True
+    assert auth.admit("login", "9.9.9.9", "user@example.com") is True
+
+
+def test_actions_have_separate_buckets(clock):
+    for _ in range(3):
+        auth.admit("login", "1.2.3.4", None)
+    assert auth.admit("register", "1.2.3.4", None) is True
+
+
+# ---- hashing off the event loop ----
+
+def test_async_hash_round_trip(monkeypatch):
+    monkeypatch.setattr(auth, "ITERATIONS", 1000)
+
+    async def run():
+        stored = await auth.hash_password_async("s3cret")
+        return stored, await auth.verify_password_async("s3cret", stored), await auth.verify_password_async("nope", stored)
+
+    stored, ok, bad = asyncio.run(run())
+    assert stored.startswith("pbkdf2_sha256$1000$") and ok is True and bad is False
+    assert auth.verify_password("s3cret", stored) is True
+
+
+def test_hashing_beyond_the_inflight_limit_is_refused(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(auth, "_hash_slots", threading.BoundedSemaphore(2))
+    monkeypatch.setattr(auth, "hash_password", lambda plain: release.wait(5) and "hashed")
+
+    async def run():
+        first = asyncio.ensure_future(auth.hash_password_async("a"))
+        second = asyncio.ensure_future(auth.hash_password_async("b"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(auth.Overloaded):
+            await auth.hash_password_async("c")
+        release.set()
+        return await first, await second
+
+    assert asyncio.run(run()) == ("hashed", "hashed")
+    # Slots are handed back once the hashes finish
+    assert auth._hash_slots.acquire(blocking=False) and auth._hash_slots.acquire(blocking=False)
+
+
+# ---- client IP behind proxies ----
+
+def _request(xff=None, client="10.0.0.1"):
+    from starlette.requests import Request
+    headers = [(b"x-forwarded-for", xff.encode())] if xff else []
+    return Request({"type": "http", "headers": headers, "client": (client, 1234)})
+
+
+def test_client_ip_ignores_forwarded_for_unless_proxies_are_trusted(monkeypatch):
+    from app import main
+    monkeypatch.setattr(main, "TRUSTED_PROXY_HOPS", 0)
+    assert main._client_ip(_request("6.6.6.6")) == "10.0.0.1"
+
+
+def test_client_ip_takes_the_entry_appended_by_the_trusted_proxy(monkeypatch):
+    from app import main
+    monkeypatch.setattr(main, "TRUSTED_PROXY_HOPS", 1)
+    # The client forged the leftmost entry; our proxy appended the real address
+    assert main._client_ip(_request("6.6.6.6, 203.0.113.7")) == "203.0.113.7"
+    assert main._client_ip(_request()) == "10.0.0.1"
+    monkeypatch.setattr(main, "TRUSTED_PROXY_HOPS", 2)
+    assert main._client_ip(_request("6.6.6.6, 203.0.113.7, 10.1.1.1")) == "203.0.113.7"
+    assert main._client_ip(_request("203.0.113.7")) == "10.0.0.1"
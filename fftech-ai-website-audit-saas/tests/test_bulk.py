@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+
+from app import bulk
+from app.models import Audit, Subscription
+
+
+def _result(score=80):
+    cats = {c: score for c in ("Performance", "Accessibility", "SEO", "Security", "BestPractices")}
+    return {"category_scores": cats, "metrics": {"status_code": 200}, "top_issues": [], "page_snapshot": None}
+
+
+@pytest.fixture
+def paid(db, user):
+    db.add(Subscription(user_id=user.id, plan="pro", active=True, audits_used=0)); db.commit()
+    return user
+
+
+def _wait(job, timeout=10):
+    deadline = time.monotonic() + timeout
+    while job.finished_at is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job.progress()
+
+
+def test_each_job_keeps_at_most_bulk_concurrency_in_flight(paid, db, monkeypatch):
+    monkeypatch.setattr(bulk, "BULK_CONCURRENCY", 3)
+    lock, running, peak = threading.Lock(), [0], [0]
+
+    def audit(url, profile):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return url, _result()
+
+    monkeypatch.setattr(bulk, "cached_audit", audit)
+    urls = [f"https://site{i}.example/" for i in range(20)]
+    progress = _wait(bulk.start_bulk_job(paid.id, urls))
+    assert (progress["done"], progress["failed"], progress["pending"]) == (20, 0, 0)
+    assert peak[0] == 3
+    assert db.query(Audit).count() == 20
+
+
+def test_failed_audits_are_counted_and_the_rest_continue(paid, monkeypatch):
+    monkeypatch.setattr(bulk, "BULK_CONCURRENCY", 2)
+
+    def audit(url, profile):
+        if "bad" in url:
+            raise RuntimeError("boom")
+        return url, _result()
+
+    monkeypatch.setattr(bulk, "cached_audit", audit)
+    urls = ["https://a.example/", "https://bad.example/", "https://b.example/", "https://bad2.example/"]
+    progress = _wait(bulk.start_bulk_job(paid.id, urls))
+    assert (progress["done"], progress["failed"]) == (2, 2)
+
+
+def test_free_plan_quota_is_checked_before_queueing(user, db):
+    with pytest.raises(bulk.QuotaExceeded) as e:
+        bulk.start_bulk_job(user.id, [f"https://site{i}.example/" for i in range(11)])
+    assert e.value.remaining == 10
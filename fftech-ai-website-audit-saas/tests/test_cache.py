@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+
+from app import cache
+from app.cache import SingleFlight, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+
+    class _Time:
+        @staticmethod
+        def monotonic():
+            return now[0]
+
+    monkeypatch.setattr(cache, "time", _Time)
+    return now
+
+
+# ---- TTLCache ----
+
+def test_entries_expire_after_the_ttl(clock):
+    c = TTLCache(ttl=10)
+    c.set("a", 1)
+    c.set("b", 2, ttl=1)
+    clock[0] += 5
+    assert c.get("a") == 1 and c.get("b") is None
+    clock[0] += 5
+    assert c.get("a", "gone") == "gone"
+    assert len(c) == 0
+    assert c.stats()["hits"] == 1 and c.stats()["misses"] == 2
+
+
+def test_falsy_values_are_hits_with_a_sentinel_default():
+    c, miss = TTLCache(), object()
+    c.set("k", None)
+    assert c.get("k", miss) is None and c.get("other", miss) is miss
+
+
+def test_least_recently_used_is_evicted_by_count():
+    c = TTLCache(maxsize=2)
+    c.set("a", 1); c.set("b", 2)
+    c.get("a")
+    c.set("c", 3)
+    assert c.get("b") is None and c.get("a") == 1 and c.get("c") == 3
+    assert c.stats()["evictions"] == 1
+
+
+def test_eviction_by_weight():
+    c = TTLCache(maxsize=100, max_weight=10, weigher=len)
+    c.set("a", "x" * 4); c.set("b", "x" * 4)
+    c.get("a")
+    c.set("c", "x" * 4)  # 12 > 10: the least recently used ("b") goes
+    assert c.get("b") is None and c.get("a") and c.get("c")
+    assert c.stats()["weight"] == 8
+    c.set("huge", "x" * 11)  # heavier than the whole cache: not stored, nothing evicted
+    assert c.get("huge") is None and len(c) == 2
+
+
+def test_replacing_and_popping_keep_the_weight_right():
+    c = TTLCache(max_weight=10, weigher=len)
+    c.set("a", "xxxx")
+    c.set("a", "xx")
+    assert c.stats()["weight"] == 2
+    assert c.pop("a") == "xx" and c.pop("a", "none") == "none"
+    assert c.stats()["weight"] == 0 and c.stats()["size"] == 0
+
+
+# ---- SingleFlight ----
+
+def test_concurrent_callers_share_one_call():
+    flight, started, release = SingleFlight(), threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", work)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(3)]
+    for t in followers:
+        t.start()
+    while flight.coalesced < 3:
+        time.sleep(0.001)
+    release.set()
+    for t in [leader, *followers]:
+        t.join(5)
+    assert calls == [1] and results == ["value"] * 4
+    assert flight.coalesced == 3 and flight.in_flight() == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    flight, started, release = SingleFlight(), threading.Event(), threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            flight.do("k", fail)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    started.wait(5)
+    threads.append(threading.Thread(target=call))
+    threads[1].start()
+    while flight.coalesced < 1:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert errors == ["boom", "boom"] and flight.coalesced == 1
+    assert flight.do("k", lambda: "recovered") == "recovered"  # the failure was not kept
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert [flight.do(k, lambda k=k: k * 2) for k in (1, 2, 1)] == [2, 4, 2]
+    assert flight.coalesced == 0
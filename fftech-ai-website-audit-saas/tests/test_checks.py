@@ -0,0 +1,184 @@
+import pytest
+
+from app.audit import checks, engine
+
+# Expected scores and issues below were produced by the single-function
+# scorer analyze_page used before the check registry, on the same inputs;
+# the "full" profile must keep reproducing them exactly.
+
+POLISHED = (
+    '<!doctype html><html lang="en"><head><title>Acme widgets for every workshop</title>'
+    '<meta name="viewport" content="width=device-width">'
+    '<meta name="description" content="Acme sells hand-made widgets, gadgets and tools for small workshops worldwide.">'
+    '<link rel="canonical" href="https://example.com/"><link rel="icon" href="/favicon.ico">'
+    '<meta property="og:title" content="Acme"><meta property="og:image" content="https://example.com/og.png">'
+    '</head><body><nav><a href="/">Home</a></nav><main><h1>Widgets</h1><img src="a.png" alt="A widget"></main></body></html>'
+)
+HEAVY = (
+    '<html><head><title>Hi</title><meta name="robots" content="NOINDEX, follow">'
+    '<meta name="description" content="' + "x" * 200 + '"></head><body>'
+    + '<img src="i.png">' * 20 + "<p>" + "lorem ipsum " * 35_000 + "</p></body></html>"
+)
+SECURE = {
+    "content-encoding": "br", "cache-control": "max-age=60",
+    "strict-transport-security": "max-age=31536000", "x-content-type-options": "nosniff",
+    "x-frame-options": "DENY", "content-security-policy": "default-src 'self'",
+    "set-cookie": "sid=1; Secure; HttpOnly",
+}
+
+BARE_ISSUES = [
+    "Response not compressed (gzip/br/deflate).",
+    "Missing Cache-Control headers.",
+    "No mobile viewport meta.",
+    "<html lang> missing for language semantics.",
+    "Missing <h1> heading.",
+    "Missing <title> tag.",
+    "Missing meta description.",
+    "Missing canonical link.",
+    "robots.txt disallows crawling this URL (User-agent: *).",
+    "No sitemap.xml discovered.",
+    "Site not served over HTTPS.",
+    "Missing Strict-Transport-Security (HSTS).",
+    "Missing X-Content-Type-Options: nosniff.",
+    "Missing X-Frame-Options (clickjacking risk).",
+    "Missing Content-Security-Policy.",
+    "Missing OpenGraph tags (og:title/og:image).",
+    "No favicon link found.",
+    "No <main> landmark found.",
+    "No <nav> landmark found.",
+]
+
+
+def _fetched(html="", url="https://example.com/", status=200, headers=None, robots_ok=True, sitemap_ok=True,
+             profile="full", timings=None):
+    """A _fetch_stage result with a buffered body, as analyze_page receives it."""
+    body = html.encode()
+    return {
+        "url": url, "profile": profile, "collect_links": False, "collect_assets": False,
+        "body": body, "content_type": "text/html; charset=utf-8",
+        "not_modified": False, "status": status, "content_length": len(body), "transfer_bytes": len(body),
+        "headers": headers or {}, "truncated": False, "charset": "utf-8",
+        "robots_ok": robots_ok, "sitemap_ok": sitemap_ok,
+        "timings": timings or {"ttfb_ms": 0, "download_ms": 0},
+    }
+
+
+def _scores(**scores):
+    return dict(zip(checks.CATEGORIES, (scores[c] for c in checks.CATEGORIES)))
+
+
+# ---- parity of the full profile with the baseline scorer ----
+
+@pytest.mark.parametrize("fetched, expected", [
+    (_fetched("<html><body>hi</body></html>", url="http://example.com/", robots_ok=False, sitemap_ok=False),
+     _scores(Performance=84, Accessibility=70, SEO=42, Security=49, BestPractices=87)),
+    (_fetched(POLISHED, headers=SECURE),
+     _scores(Performance=100, Accessibility=100, SEO=100, Security=100, BestPractices=100)),
+    (_fetched(HEAVY, headers={"content-encoding": "identity", "set-cookie": "sid=1; Secure"}),
+     _scores(Performance=79, Accessibility=42, SEO=62, Security=66, BestPractices=87)),
+    (_fetched("<html><body>missing</body></html>", status=404),
+     _scores(Performance=66, Accessibility=70, SEO=50, Security=71, BestPractices=87)),
+    (_fetched(status=0, robots_ok=False, sitemap_ok=False),
+     _scores(Performance=36, Accessibility=70, SEO=30, Security=71, BestPractices=87)),
+], ids=["bare", "polished", "heavy", "not_found", "unreachable"])
+def test_full_profile_matches_baseline_scores(fetched, expected):
+    assert engine.analyze_page(fetched)["category_scores"] == expected
+
+
+def test_full_profile_reports_issues_in_baseline_order():
+    bare = _fetched("<html><body>hi</body></html>", url="http://example.com/", robots_ok=False, sitemap_ok=False)
+    assert engine.analyze_page(bare)["top_issues"] == BARE_ISSUES
+    assert engine.analyze_page(_fetched(POLISHED, headers=SECURE))["top_issues"] == []
+
+    heavy = engine.analyze_page(_fetched(HEAVY, headers={"set-cookie": "sid=1; Secure"}))["top_issues"]
+    assert heavy[2] == "20 <img> tags without alt attribute."
+    assert "Title length suboptimal (12–70 chars)." in heavy
+    assert "Meta description length suboptimal (40–170 chars)." in heavy
+    assert "Meta robots set to noindex." in heavy
+    assert heavy[-5] == "Cookies missing Secure/HttpOnly flags."
+
+    unreachable = engine.analyze_page(_fetched(status=0))["top_issues"]
+    assert unreachable[0] == "No content received; check availability and payload."
+    assert unreachable[-1] == "HTTP status 0 detected; using heuristic baseline."
+
+
+def test_timings_are_scored_only_when_enabled(monkeypatch):
+    slow = _fetched(POLISHED, headers=SECURE, timings={"ttfb_ms": 2400, "download_ms": 4000})
+    assert engine.analyze_page(dict(slow))["category_scores"]["Performance"] == 100
+
+    monkeypatch.setattr(checks, "SCORE_TIMINGS", True)
+    monkeypatch.setattr(checks, "SLOW_TTFB_MS", 800)
+    monkeypatch.setattr(checks, "SLOW_DOWNLOAD_MS", 1500)
+    result = engine.analyze_page(dict(slow))
+    assert result["category_scores"]["Performance"] == 79
+    assert result["top_issues"] == ["Slow server response (time to first byte 2400 ms).", "Slow page download (4000 ms)."]
+
+
+# ---- profiles ----
+
+def test_required_inputs_per_profile():
+    assert checks.required_inputs(checks.rules_for("full")) == set(checks.INPUTS)
+    assert checks.required_inputs(checks.rules_for("headers")) == {"url", "headers"}
+    assert checks.required_inputs(checks.rules_for("seo")) == {"html", "body", "headers", "robots", "sitemap"}
+    assert checks.required_inputs([]) == set()
+
+
+def test_profiles_keep_registration_order():
+    names = [c.name for c in checks.CHECKS]
+    for profile in checks.PROFILES:
+        rules = [c.name for c in checks.rules_for(profile)]
+        assert rules == [n for n in names if n in rules]
+
+
+def test_headers_profile_scores_only_header_rules():
+    fetched = _fetched(headers={"content-encoding": "gzip"}, url="http://example.com/", profile="headers")
+    del fetched["body"], fetched["content_length"], fetched["robots_ok"], fetched["sitemap_ok"]
+    result = engine.analyze_page(fetched)
+    full = engine.analyze_page(_fetched(POLISHED, headers={"content-encoding": "gzip"}, url="http://example.com/"))
+    assert result["category_scores"] == _scores(
+        Performance=full["category_scores"]["Performance"], Accessibility=checks.BASELINE_SCORE,
+        SEO=checks.BASELINE_SCORE, Security=full["category_scores"]["Security"],
+        BestPractices=checks.BASELINE_SCORE,
+    )
+    assert result["top_issues"] == [i for i in full["top_issues"] if i in result["top_issues"]]
+    assert "title" not in result["metrics"] and "robots_allowed" not in result["metrics"]
+    assert result["metrics"]["audit_profile"] == "headers"
+
+
+def test_seo_profile_leaves_other_categories_at_baseline():
+    full = engine.analyze_page(_fetched(HEAVY, robots_ok=False))
+    seo = engine.analyze_page(_fetched(HEAVY, robots_ok=False, profile="seo"))
+    assert seo["category_scores"]["SEO"] == full["category_scores"]["SEO"] == 47
+    assert all(seo["category_scores"][c] == checks.BASELINE_SCORE for c in checks.CATEGORIES if c != "SEO")
+    assert seo["top_issues"] == [i for i in full["top_issues"] if i in seo["top_issues"]]
+    assert "Missing Content-Security-Policy." not in seo["top_issues"]
+
+
+def test_seo_profile_still_softens_failed_fetches():
+    seo = engine.analyze_page(_fetched("<html><body>missing</body></html>", status=404, profile="seo"))
+    assert seo["category_scores"]["SEO"] == 50
+    assert seo["category_scores"]["Performance"] == max(30, checks.BASELINE_SCORE - 18)
+
+
+def test_unknown_profile_and_inputs_are_rejected():
+    with pytest.raises(ValueError, match="unknown audit profile"):
+        checks.rules_for("nope")
+    with pytest.raises(ValueError, match="unknown audit profile"):
+        engine.run_basic_checks("https://example.com/", profile="nope")
+    with pytest.raises(ValueError, match="unknown check inputs"):
+        checks.check("SEO", "dom")
+
+
+# ---- end to end against a local site ----
+
+def test_headers_profile_agrees_with_full_profile_end_to_end():
+    from benchmarks.server import LocalSite
+
+    with LocalSite(robots=True, sitemap=True) as site:
+        url = site.page(kb=50, images=10, gz=1)
+        full = engine.run_basic_checks(url, collect_assets=False)
+        quick = engine.run_basic_checks(url, collect_assets=False, profile="headers")
+    assert quick["category_scores"]["Performance"] == full["category_scores"]["Performance"]
+    assert quick["category_scores"]["Security"] == full["category_scores"]["Security"]
+    assert "content_length" not in quick["metrics"] and "sitemap_present" not in quick["metrics"]
+    assert full["metrics"]["sitemap_present"] is True and full["metrics"]["robots_allowed"] is True
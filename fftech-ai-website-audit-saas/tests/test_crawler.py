@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+import pytest
+
+from app.audit import crawler, engine
+from benchmarks.server import LocalSite
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    engine._robots_cache.clear()
+    engine._sitemap_cache.clear()
+    yield
+    engine._robots_cache.clear()
+
+
+class _AllowAll:
+    def can_fetch(self, agent, url):
+        return True
+
+
+# ---- frontier ----
+
+def test_site_hosts_pairs_www_and_apex():
+    assert crawler.site_hosts("example.com") == ["example.com", "www.example.com"]
+    assert crawler.site_hosts("www.example.com", "") == ["example.com", "www.example.com"]
+
+
+def test_frontier_dedupes_and_filters(monkeypatch):
+    monkeypatch.setattr(crawler, "_robots_rules", lambda url: _AllowAll())
+    f = crawler.Frontier(crawler.site_hosts("example.com"))
+    assert f.add("https://example.com") is True
+    assert f.add("https://example.com/") is False            # same page once normalized
+    assert f.add("https://www.example.com/a?x=1") is True
+    assert f.add("https://www.example.com/a?x=1#top") is False
+    assert f.add("https://other.com/") is False
+    assert f.add("mailto:someone@example.com") is False
+    assert f.add("https://example.com/brochure.PDF") is False
+    assert f.pending() == 2
+    assert crawler.Frontier.from_dict(json.loads(json.dumps(f.to_dict()))).to_dict() == f.to_dict()
+
+
+def test_frontier_honours_robots_txt():
+    robots = f"User-agent: {crawler.CRAWL_USER_AGENT}\nDisallow: /private/\n"
+    with LocalSite(robots=robots, sitemap=False) as site:
+        f = crawler.Frontier([urlparse(site.base).netloc])
+        assert f.add(f"{site.base}/private/a") is False
+        assert f.add(f"{site.base}/public/a") is True
+
+
+# ---- scheduling ----
+
+def test_per_host_limit_holds_while_other_hosts_proceed(monkeypatch):
+    seed = "http://example.test/"
+    links = [f"http://{h}example.test/p{i}" for h in ("", "www.") for i in range(10)]
+    lock, running, peak = threading.Lock(), Counter(), Counter()
+
+    def audit(url):
+        host = urlparse(url).netloc
+        with lock:
+            running[host] += 1
+            peak[host] = max(peak[host], running[host])
+        time.sleep(0.02)
+        with lock:
+            running[host] -= 1
+        return {"metrics": {"status_code": 200}, "category_scores": {}, "top_issues": [], "links": links}
+
+    monkeypatch.setattr(crawler, "_probe", lambda url: (200, url))
+    monkeypatch.setattr(crawler, "sitemap_urls", lambda base, limit: [])
+    monkeypatch.setattr(crawler, "_robots_rules", lambda url: _AllowAll())
+    monkeypatch.setattr(crawler, "_audit_page", audit)
+    monkeypatch.setattr(crawler, "CRAWL_PER_HOST", 2)
+    monkeypatch.setattr(crawler, "CRAWL_WORKERS", 8)
+
+    report = crawler.crawl_site(seed, max_pages=100)
+    urls = [p["url"] for p in report["pages"]]
+    assert len(urls) == len(set(urls)) == 21
+    assert peak == Counter({"example.test": 2, "www.example.test": 2})
+
+
+def test_max_pages_caps_the_crawl():
+    with LocalSite(robots=True, sitemap=True) as site:
+        report = crawler.crawl_site(site.page(kb=2, images=0, tags=0), max_pages=4)
+    assert report["metrics"]["pages_crawled"] == 4
+    assert len({p["url"] for p in report["pages"]}) == 4
+
+
+# ---- checkpoint and resume ----
+
+def test_interrupted_crawl_resumes_from_its_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(crawler, "CRAWL_WORKERS", 1)
+    monkeypatch.setattr(crawler, "CRAWL_CHECKPOINT_EVERY", 1)
+    path = str(tmp_path / "crawl.json")
+    audited = []
+    real_audit = crawler._audit_page
+
+    def crash_on_second(url):
+        if audited:
+            raise SystemExit("worker killed")
+        audited.append(url)
+        return real_audit(url)
+
+    with LocalSite(robots=True, sitemap=True) as site:
+        seed = site.page(kb=2, images=0, tags=0)
+        monkeypatch.setattr(crawler, "_audit_page", crash_on_second)
+        with pytest.raises(SystemExit):
+            crawler.crawl_site(seed, max_pages=3, checkpoint_path=path)
+        state = json.load(open(path))
+        assert state["seed"] == seed and state["pages_done"] == 1
+        assert [json.loads(line)["url"] for line in open(f"{path}.pages.jsonl")] == audited == [seed]
+
+        resumed = []
+        monkeypatch.setattr(crawler, "_audit_page", lambda url: resumed.append(url) or real_audit(url))
+        report = crawler.crawl_site(seed, max_pages=3, checkpoint_path=path)
+
+    urls = [p["url"] for p in report["pages"]]
+    assert urls[0] == seed and seed not in resumed  # finished before the crash: not audited again
+    assert len(urls) == len(set(urls)) == 3 and len(resumed) == 2
+    assert [json.loads(line)["url"] for line in open(f"{path}.pages.jsonl")] == urls
+    assert json.load(open(path))["pages_done"] == 3
+
+
+def test_pages_after_the_last_checkpoint_are_recrawled(tmp_path, monkeypatch):
+    path = str(tmp_path / "crawl.json")
+    with LocalSite(robots=True, sitemap=True) as site:
+        seed = site.page(kb=2, images=0, tags=0)
+        crawler.crawl_site(seed, max_pages=2, checkpoint_path=path)
+        # Pretend the crash came after one page had been checkpointed
+        state = json.load(open(path))
+        first = json.loads(open(f"{path}.pages.jsonl").readline())
+        state["pages_done"] = 1
+        state["frontier"] = {"allowed_hosts": state["frontier"]["allowed_hosts"],
+                             "queues": {urlparse(seed).netloc: [f"{site.base}/page/kb=3"]},
+                             "seen": [first["url"], f"{site.base}/page/kb=3"]}
+        json.dump(state, open(path, "w"))
+        report = crawler.crawl_site(seed, max_pages=2, checkpoint_path=path)
+    assert [p["url"] for p in report["pages"]] == [first["url"], f"{site.base}/page/kb=3"]
+    assert sum(1 for _ in open(f"{path}.pages.jsonl")) == 2
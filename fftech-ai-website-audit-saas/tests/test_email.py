@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from app import email_utils
+from app.email_utils import Mailer
+from benchmarks.smtp_server import LocalSMTP
+
+
+@pytest.fixture
+def smtp():
+    with LocalSMTP() as server:
+        yield server
+
+
+def _mailer(port, **kw):
+    return Mailer(host="127.0.0.1", port=port, user="u", password="p", starttls=False, backoff_base_s=0, **kw)
+
+
+def test_messages_share_a_pooled_connection(smtp):
+    mailer = _mailer(smtp.port, workers=1)
+    futures = [mailer.submit(f"user{i}@example.com", f"Hi {i}", "<p>Hi</p>") for i in range(5)]
+    assert [f.result(5) for f in futures] == [True] * 5
+    mailer.close()
+    assert smtp.connections == mailer.connections == 1
+    assert sorted(smtp.messages) == sorted((f"user{i}@example.com", f"Hi {i}") for i in range(5))
+
+
+def test_transient_rejections_are_retried():
+    with LocalSMTP(fail_every=2) as smtp:
+        mailer = _mailer(smtp.port, workers=1)
+        assert [mailer.send(f"user{i}@example.com", "Hi", "<p>Hi</p>") for i in range(3)] == [True] * 3
+        mailer.close()
+    assert smtp.received == 5 and len(smtp.messages) == 3
+
+
+def test_gives_up_after_max_attempts():
+    with LocalSMTP(fail_every=1) as smtp:
+        mailer = _mailer(smtp.port, workers=1, max_attempts=2)
+        assert mailer.send("user@example.com", "Hi", "<p>Hi</p>") is False
+        mailer.close()
+    assert smtp.received == 2 and smtp.messages == []
+
+
+def test_submit_without_a_relay_resolves_false():
+    assert Mailer(host="", user="", password="").submit("user@example.com", "Hi", "<p>Hi</p>").result(0) is False
+
+
+def test_full_queue_resolves_false_without_blocking(monkeypatch, smtp):
+    monkeypatch.setattr(email_utils, "MAIL_QUEUE_SIZE", 1)
+    mailer = _mailer(smtp.port, workers=1)
+    release = threading.Event()
+    deliver = mailer._deliver
+    monkeypatch.setattr(mailer, "_deliver", lambda *a: release.wait(5) and deliver(*a))
+
+    first = mailer.submit("a@example.com", "Hi", "<p>Hi</p>")   # taken by the worker, which blocks
+    while not first.running():
+        time.sleep(0.01)
+    queued = mailer.submit("b@example.com", "Hi", "<p>Hi</p>")  # fills the queue
+    dropped = mailer.submit("c@example.com", "Hi", "<p>Hi</p>")
+    assert dropped.done() and dropped.result() is False
+
+    release.set()
+    assert first.result(5) is True and queued.result(5) is True
+    mailer.close()
+
+
+def test_blocking_submit_waits_for_room(monkeypatch, smtp):
+    monkeypatch.setattr(email_utils, "MAIL_QUEUE_SIZE", 1)
+    mailer = _mailer(smtp.port, workers=1)
+    release = threading.Event()
+    deliver = mailer._deliver
+    monkeypatch.setattr(mailer, "_deliver", lambda *a: release.wait(5) and deliver(*a))
+
+    first = mailer.submit("a@example.com", "Hi", "<p>Hi</p>")
+    while not first.running():
+        time.sleep(0.01)
+    mailer.submit("b@example.com", "Hi", "<p>Hi</p>")
+    threading.Timer(0.1, release.set).start()
+    waited = mailer.submit("c@example.com", "Hi", "<p>Hi</p>", block=True)
+    assert waited.result(5) is True
+    mailer.close()
+    assert len(smtp.messages) == 3
+
+
+def test_daily_digest_waits_for_the_mail_queue(db, user, monkeypatch):
+    from app import main
+    from app.models import Subscription
+    calls = []
+    monkeypatch.setattr(main, "send_email", lambda *a, **kw: calls.append((a[0], kw)))
+    sub = Subscription(user_id=user.id, plan="pro", active=True, email_schedule_enabled=True)
+    db.add(sub); db.commit()
+    main._send_daily_summary(db, sub)
+    assert calls == [(user.email, {"kind": "daily_report", "block": True})]
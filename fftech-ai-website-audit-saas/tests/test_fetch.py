@@ -0,0 +1,150 @@
+import pytest
+
+from app.audit import engine
+from app.audit.engine import PageAnalyzer, _HTMLStream
+from benchmarks.server import LocalSite, synthetic_page
+
+
+def _stream(chunks, content_type=""):
+    page = PageAnalyzer()
+    stream = _HTMLStream(page, content_type)
+    for chunk in chunks:
+        stream.write(chunk)
+    stream.close()
+    return page, stream.charset
+
+
+def _split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+# ---- charset detection ----
+
+LATIN1 = '<html><head><title>Café crème – à la carte</title></head><body></body></html>'.replace("–", "-")
+
+
+def test_charset_from_the_content_type_header():
+    page, charset = _stream([LATIN1.encode("latin-1")], "text/html; charset=ISO-8859-1")
+    assert charset == "iso8859-1" and page.title == "Café crème - à la carte"
+
+
+def test_header_charset_wins_over_meta():
+    body = ('<meta charset="utf-8">' + LATIN1).encode("latin-1")
+    page, charset = _stream([body], "text/html; charset=iso-8859-1")
+    assert charset == "iso8859-1" and page.title.startswith("Café")
+
+
+def test_utf8_bom_is_detected_and_stripped():
+    page, charset = _stream([b"\xef\xbb\xbf" + "<title>Zürich</title>".encode()])
+    assert charset == "utf-8-sig" and page.title == "Zürich"
+
+
+def test_meta_charset_split_across_chunks():
+    body = ('<html><head><meta http-equiv="Content-Type" content="text/html; charset=windows-1252">'
+            + LATIN1[len("<html><head>"):]).encode("cp1252")
+    cut = body.index(b"windows") + 3
+    page, charset = _stream([body[:cut], body[cut:cut + 5], body[cut + 5:]])
+    assert charset == "cp1252" and page.title == "Café crème - à la carte"
+    # The same page in small chunks never re-decodes what was already fed
+    assert _stream(_split(body, 7))[0].title == page.title
+
+
+def test_meta_charset_beyond_the_sniff_window_is_ignored():
+    body = b"<!--" + b" " * engine.CHARSET_SNIFF_BYTES + b'--><meta charset="latin-1"><title>x</title>'
+    assert _stream([body])[1] == "utf-8"
+
+
+def test_unknown_charsets_fall_back_to_utf8():
+    page, charset = _stream(["<title>naïve</title>".encode()], "text/html; charset=x-bogus")
+    assert charset == "utf-8" and page.title == "naïve"
+
+
+# ---- body budget ----
+
+@pytest.fixture(scope="module")
+def site():
+    with LocalSite() as s:
+        yield s
+
+
+def _fetch(url):
+    page = PageAnalyzer()
+    result = engine._fetch_page(url, lambda content_type: _HTMLStream(page, content_type))
+    return page, result
+
+
+def test_body_within_budget_is_read_whole(site):
+    page, (status, length, _, _, truncated, charset, _) = _fetch(site.page(kb=20))
+    assert (status, length, truncated, charset) == (200, len(synthetic_page(20)), False, "utf-8")
+    assert page.title == "Synthetic benchmark page"
+
+
+def test_over_budget_uses_content_length_when_uncompressed(site, monkeypatch):
+    monkeypatch.setattr(engine, "MAX_BODY_BYTES", 4096)
+    page, (status, length, _, _, truncated, _, _) = _fetch(site.page(kb=200))
+    assert truncated is True and length == len(synthetic_page(200))
+    assert page.title == "Synthetic benchmark page"  # the head was parsed before the cut
+
+
+def test_compressed_body_is_counted_only_up_to_the_ceiling(site, monkeypatch):
+    monkeypatch.setattr(engine, "MAX_BODY_BYTES", 4096)
+    monkeypatch.setattr(engine, "MAX_COUNT_BYTES", 64 * 1024)
+    _, (_, length, wire, headers, truncated, _, _) = _fetch(site.page(kb=400, gz=1))
+    assert headers["content-encoding"] == "gzip" and truncated is True
+    assert engine.MAX_COUNT_BYTES <= length < len(synthetic_page(400))  # a lower bound, not EOF
+    assert 0 < wire
+
+
+def test_download_stops_at_the_deadline(site, monkeypatch):
+    monkeypatch.setattr(engine, "BODY_DEADLINE_S", 0)
+    monkeypatch.setattr(engine, "STREAM_CHUNK_BYTES", 1024)
+    page, (_, length, _, _, truncated, _, _) = _fetch(site.page(kb=200, gz=1))
+    assert truncated is True and length == 1024
+    assert page.title == "Synthetic benchmark page"  # what did arrive is still analyzed
+
+
+# ---- conditional re-fetch ----
+
+_VOLATILE = {"not_modified", "transfer_bytes", "dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms",
+             "connection_reused", "page_fetch_ms", "robots_fetch_ms", "sitemap_fetch_ms", "probes_wall_ms"}
+
+
+def _stable(metrics):
+    return {k: v for k, v in metrics.items() if k not in _VOLATILE}
+
+
+def test_not_modified_reaudit_reuses_the_snapshot(site):
+    url = site.page(kb=30, images=6, etag=1)
+    first = engine.run_basic_checks(url, collect_assets=False)
+    snapshot = first["page_snapshot"]
+    assert snapshot["url"] == url and snapshot["etag"]
+
+    again = engine.run_basic_checks(url, snapshot=snapshot, collect_assets=False)
+    assert site.not_modified == 1
+    assert again["metrics"]["not_modified"] is True and again["metrics"]["transfer_bytes"] == 0
+    assert _stable(again["metrics"]) == _stable(first["metrics"])
+    assert again["category_scores"] == first["category_scores"]
+    assert again["top_issues"] == first["top_issues"]
+    assert again["page_snapshot"] == snapshot
+
+
+def test_snapshot_of_another_url_is_not_used(site):
+    snapshot = engine.run_basic_checks(site.page(kb=10, etag=1), collect_assets=False)["page_snapshot"]
+    before = site.not_modified
+    other = engine.run_basic_checks(site.page(kb=11, etag=1), snapshot=snapshot, collect_assets=False)
+    assert site.not_modified == before and other["metrics"]["not_modified"] is False
+    assert other["metrics"]["content_length"] == len(synthetic_page(11))
+
+
+def test_snapshot_without_assets_is_not_used_for_an_asset_audit(site, monkeypatch):
+    url = site.page(kb=10, images=0, tags=0, etag=1)
+    snapshot = engine.run_basic_checks(url, collect_assets=False)["page_snapshot"]
+    assert "assets" not in snapshot["facts"]
+    before = site.not_modified
+    result = engine.run_basic_checks(url, snapshot=snapshot, collect_assets=True)
+    assert site.not_modified == before and result["metrics"]["not_modified"] is False
+    assert "assets" in result["page_snapshot"]["facts"]
+
+    again = engine.run_basic_checks(url, snapshot=result["page_snapshot"], collect_assets=True)
+    assert site.not_modified == before + 1
+    assert again["page_snapshot"]["facts"]["assets"] == result["page_snapshot"]["facts"]["assets"]
@@ -0,0 +1,123 @@
+import threading
+from datetime import timedelta
+
+from sqlalchemy import update
+
+from app import job_queue, worker
+from app.db import SessionLocal
+from app.models import QueuedAudit
+
+
+def _set(job_id, **values):
+    db = SessionLocal()
+    try:
+        db.execute(update(QueuedAudit).where(QueuedAudit.id == job_id).values(**values))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_claim_leases_a_due_job_once():
+    job = job_queue.enqueue("open", "https://example.com/")
+    rows = job_queue.claim("w1")
+    assert [r.id for r in rows] == [job.id]
+    assert rows[0].status == "running" and rows[0].locked_by == "w1" and rows[0].attempts == 1
+    assert job_queue.claim("w2") == []
+
+
+def test_claim_skips_jobs_not_yet_due():
+    job = job_queue.enqueue("open", "https://example.com/")
+    _set(job.id, run_after=job_queue._now() + timedelta(minutes=5))
+    assert job_queue.claim("w1") == []
+
+
+def test_concurrent_claims_never_share_a_job():
+    ids = {job_queue.enqueue("open", f"https://example.com/{i}").id for i in range(20)}
+    claimed, lock = [], threading.Lock()
+
+    def drain(worker_id):
+        while True:
+            rows = job_queue.claim(worker_id, 3)
+            if not rows:
+                return
+            with lock:
+                claimed.extend(r.id for r in rows)
+
+    threads = [threading.Thread(target=drain, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(claimed) == sorted(ids)
+
+
+def test_expired_lease_is_reclaimed_and_old_holder_cannot_complete():
+    job = job_queue.enqueue("open", "https://example.com/")
+    job_queue.claim("w1")
+    _set(job.id, locked_until=job_queue._now() - timedelta(seconds=1))
+    rows = job_queue.claim("w2")
+    assert [r.id for r in rows] == [job.id] and rows[0].attempts == 2
+    assert job_queue.complete(job.id, "w1", ["late"]) is False
+    assert job_queue.complete(job.id, "w2", ["ok"]) is True
+    assert job_queue.fetch(job.id).status == "done"
+
+
+def test_extend_renews_only_the_holders_lease():
+    job = job_queue.enqueue("open", "https://example.com/")
+    job_queue.claim("w1")
+    before = job_queue.fetch(job.id).locked_until
+    assert job_queue.extend(job.id, "w2") is False
+    assert job_queue.extend(job.id, "w1") is True
+    assert job_queue.fetch(job.id).locked_until >= before
+
+
+def test_fail_requeues_with_backoff_then_dead_letters():
+    job = job_queue.enqueue("open", "https://example.com/")
+    for attempt in range(1, job_queue.JOB_MAX_ATTEMPTS + 1):
+        _set(job.id, run_after=job_queue._now() - timedelta(seconds=1))
+        (row,) = job_queue.claim("w1")
+        assert row.attempts == attempt
+        status = job_queue.fail(row, "w1", "boom")
+        if attempt < job_queue.JOB_MAX_ATTEMPTS:
+            assert status == "queued"
+            queued = job_queue.fetch(job.id)
+            assert queued.run_after.replace(tzinfo=None) > job_queue._now().replace(tzinfo=None)
+        else:
+            assert status == "dead"
+    dead = job_queue.fetch(job.id)
+    assert dead.status == "dead" and dead.last_error == "boom"
+    assert job_queue.claim("w1") == []
+
+
+def test_backoff_grows_and_is_capped():
+    assert job_queue._backoff_s(1) < job_queue._backoff_s(4)
+    assert job_queue._backoff_s(50) <= job_queue.JOB_BACKOFF_MAX_S * 1.2
+
+
+def test_reap_expired_dead_letters_the_last_attempt():
+    job = job_queue.enqueue("open", "https://example.com/")
+    _set(job.id, attempts=job_queue.JOB_MAX_ATTEMPTS - 1)
+    job_queue.claim("w1")
+    _set(job.id, locked_until=job_queue._now() - timedelta(seconds=1))
+    assert job_queue.reap_expired() == 1
+    assert job_queue.fetch(job.id).status == "dead"
+
+
+def test_worker_heartbeat_keeps_a_long_job_leased(monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_VISIBILITY_TIMEOUT_S", 1)
+    monkeypatch.setattr(job_queue, "JOB_HEARTBEAT_S", 0.2)
+    job = job_queue.enqueue("open", "https://example.com/")
+    (row,) = job_queue.claim("w1")
+    reclaimed = []
+
+    def slow_execute(r):
+        # Long past the visibility timeout: a second worker must not get the job
+        for _ in range(6):
+            threading.Event().wait(0.3)
+            reclaimed.extend(job_queue.claim("w2"))
+        return ["done"]
+
+    monkeypatch.setattr(worker, "execute", slow_execute)
+    worker._process(row, "w1")
+    assert reclaimed == []
+    assert job_queue.fetch(job.id).status == "done"
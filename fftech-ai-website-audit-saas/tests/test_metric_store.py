@@ -0,0 +1,84 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import metric_store
+from app.models import Audit, AuditMetric, Website
+
+
+def _website(db, user, url="https://example.com/"):
+    w = Website(user_id=user.id, url=url)
+    db.add(w); db.commit(); db.refresh(w)
+    return w
+
+
+def _audit(db, user, website, categories, metrics, created_at=None, legacy=False):
+    """An Audit with its metrics stored as rows, or only as JSON blobs when `legacy`."""
+    created_at = created_at or datetime.now(timezone.utc)
+    a = Audit(user_id=user.id, website_id=website.id, health_score=70, grade="B", created_at=created_at)
+    if legacy:
+        a.category_scores_json = json.dumps([{"name": k, "score": v} for k, v in categories.items()])
+        a.metrics_json = json.dumps(metrics)
+    db.add(a); db.flush()
+    if not legacy:
+        metric_store.save(db, metric_store.metric_rows(a.id, user.id, website.id, created_at, categories, metrics))
+    db.commit()
+    return a
+
+
+@pytest.mark.parametrize("value", [None, True, False, 0, 42, -3, 1.5, "", "text", [1, "a"], {"k": [1, 2]}])
+def test_encode_decode_round_trip(value):
+    decoded = metric_store._decode(*metric_store._encode(value))
+    assert decoded == value and type(decoded) is type(value)
+
+
+def test_load_restores_order_and_types(db, user):
+    w = _website(db, user)
+    categories = {"Security": 80, "SEO": 55, "Performance": 91}
+    metrics = {"ttfb_ms": 120, "https": True, "title": "Home", "ratio": 0.25, "issues": ["a", "b"], "missing": None}
+    a = _audit(db, user, w, categories, metrics)
+    cats, loaded = metric_store.load(db, a)
+    assert cats == [{"name": k, "score": v} for k, v in categories.items()]
+    assert loaded == metrics and list(loaded) == list(metrics)
+    assert metric_store.load(db, a, kinds=("category",))[1] == {}
+
+
+def test_load_falls_back_to_legacy_json(db, user):
+    w = _website(db, user)
+    a = _audit(db, user, w, {"SEO": 40}, {"ttfb_ms": 300}, legacy=True)
+    assert metric_store.load(db, a) == ([{"name": "SEO", "score": 40}], {"ttfb_ms": 300})
+    assert metric_store.load(db, a, kinds=("metric",)) == ([], {"ttfb_ms": 300})
+
+
+def test_backfill_converts_legacy_audits_once(db, user):
+    w = _website(db, user)
+    legacy = _audit(db, user, w, {"SEO": 40}, {"ttfb_ms": 300}, legacy=True)
+    _audit(db, user, w, {"SEO": 90}, {"ttfb_ms": 100})
+    rows_before = db.query(AuditMetric).count()
+    assert metric_store.backfill(batch_size=1) == 1
+    assert metric_store.backfill() == 0
+    assert db.query(AuditMetric).count() == rows_before + 2
+    assert db.query(AuditMetric).filter_by(audit_id=legacy.id, name="ttfb_ms").one().num_value == 300
+
+
+def test_websites_below_uses_each_sites_latest_audit(db, user):
+    fixed, still_bad = _website(db, user, "https://a.example/"), _website(db, user, "https://b.example/")
+    _audit(db, user, fixed, {"Security": 30}, {})
+    _audit(db, user, fixed, {"Security": 85}, {})
+    latest_bad = _audit(db, user, still_bad, {"Security": 45}, {})
+    below = metric_store.websites_below(db, "Security", 60)
+    assert [(r["website_id"], r["audit_id"], r["score"]) for r in below] == [(still_bad.id, latest_bad.id, 45)]
+    assert metric_store.websites_below(db, "Security", 60, user_id=user.id + 1) == []
+
+
+def test_metric_average_and_series(db, user):
+    w = _website(db, user)
+    now = datetime.now(timezone.utc)
+    _audit(db, user, w, {"SEO": 50}, {"ttfb_ms": 100}, created_at=now - timedelta(days=10))
+    _audit(db, user, w, {"SEO": 60}, {"ttfb_ms": 200}, created_at=now - timedelta(days=1))
+    _audit(db, user, w, {"SEO": 70}, {"ttfb_ms": 400}, created_at=now)
+    assert metric_store.metric_average(db, "ttfb_ms", now - timedelta(days=2)) == pytest.approx(300)
+    assert metric_store.metric_average(db, "nope", now - timedelta(days=2)) is None
+    assert [v for _, v in metric_store.metric_series(db, w.id, "SEO", kind="category")] == [50, 60, 70]
+    assert [v for _, v in metric_store.metric_series(db, w.id, "ttfb_ms", since=now - timedelta(days=2))] == [200, 400]
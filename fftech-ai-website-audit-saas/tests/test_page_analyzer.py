@@ -0,0 +1,150 @@
+import re
+from html.parser import HTMLParser
+
+import pytest
+
+from app.audit import engine
+from app.audit.engine import PageAnalyzer, _HTMLStream
+
+
+# ---- the extraction PageAnalyzer replaced: every start tag collected, then rescanned ----
+
+class _TagCollector(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.tags = []
+
+    def handle_starttag(self, tag, attrs):
+        self.tags.append((tag.lower(), {k.lower(): (v or "") for k, v in attrs}))
+
+
+def _legacy_facts(text):
+    collector = _TagCollector()
+    try:
+        collector.feed(text)
+    except Exception:
+        pass
+
+    def tags(name):
+        return [a for t, a in collector.tags if t == name]
+
+    m = re.search(r"<title>(.*?)</title>", text, re.IGNORECASE | re.DOTALL)
+    metas, links = tags("meta"), tags("link")
+    meta_desc = meta_robots = ""
+    for a in metas:
+        n, prop = a.get("name", ""), a.get("property", "")
+        if n == "description" or prop == "og:description":
+            meta_desc = a.get("content", "") or meta_desc
+        if n == "robots":
+            meta_robots = a.get("content", "") or meta_robots
+    imgs = tags("img")
+    return {
+        "title": m.group(1).strip() if m else "",
+        "meta_description": meta_desc,
+        "meta_robots": meta_robots,
+        "canonical_present": any(
+            ("canonical" in a.get("rel", "").lower()) and a.get("href", "") for a in links
+        ),
+        "h1_count": len(tags("h1")),
+        "image_count": len(imgs),
+        "images_without_alt": sum(1 for a in imgs if not a.get("alt")),
+        "html_lang_present": any("lang" in a for a in tags("html")),
+        "viewport_present": any(a.get("name", "") == "viewport" for a in metas),
+        "og_title": any(a.get("property", "") == "og:title" for a in metas),
+        "og_image": any(a.get("property", "") == "og:image" for a in metas),
+        "favicon_present": any("icon" in a.get("rel", "").lower() for a in links),
+        "main_present": bool(tags("main")),
+        "nav_present": bool(tags("nav")),
+    }
+
+
+def _facts(html, chunk=None):
+    page = PageAnalyzer()
+    stream = _HTMLStream(page, "text/html; charset=utf-8")
+    data = html.encode()
+    step = chunk or len(data) or 1
+    for i in range(0, len(data), step):
+        stream.write(data[i:i + step])
+    stream.close()
+    return page.facts()
+
+
+def _audit(fetched_page):
+    fetched = {
+        "url": "https://example.com/", "collect_links": False, "collect_assets": False,
+        "not_modified": False, "status": 200, "content_length": 5000, "transfer_bytes": 5000,
+        "headers": {}, "truncated": False, "charset": "utf-8", "robots_ok": True, "sitemap_ok": True,
+        "timings": {}, **fetched_page,
+    }
+    result = engine.analyze_page(fetched)
+    return result["metrics"], result["top_issues"]
+
+
+HEAD = ('<meta name="viewport" content="width=device-width"><link rel="canonical" href="/">'
+        '<link rel="shortcut icon" href="/f.ico"><meta property="og:title" content="x">'
+        '<meta property="og:image" content="/x.png">')
+
+PAGES = {
+    "complete": '<!doctype html><html lang="en"><head><title> Acme Widgets Online </title>' + HEAD
+                + '<meta name="description" content="Widgets for every workshop, made by hand since 1999.">'
+                  '</head><body><nav></nav><main><h1>Hi</h1><img src="a" alt="A"><img src="b"></main></body></html>',
+    "uppercase_tags": '<HTML LANG="de"><HEAD><TITLE>Grosse Seite</TITLE><META NAME="description" CONTENT="Text">'
+                      '<LINK REL="Canonical" HREF="/"></HEAD><BODY><MAIN><H1>A</H1><H1>B</H1><IMG SRC="x" ALT=""></MAIN></BODY></HTML>',
+    "entities_in_attributes": '<html><head><title>Plain</title><meta name="description" content="Tom &amp; Jerry &quot;live&quot; &#8211; tickets">'
+                              '<meta name="robots" content="noindex"></head><body><img src="a" alt="&nbsp;"></body></html>',
+    "last_meta_wins": '<head><title>Meta order</title><meta name="description" content="first">'
+                      '<meta property="og:description" content="second"><meta name="description" content="">'
+                      '<meta name="robots" content="index"><meta name="robots" content="NOINDEX"></head>',
+    "no_head": "<p>Just text, <img src=a alt=b> and <h1>one heading</h1></p>",
+    "empty": "",
+    "truncated_mid_tag": '<html lang="en"><head><title>Shop</title><meta name="description" content="abc',
+    "unclosed_title": '<html><head><title>Never closed',
+}
+
+
+@pytest.mark.parametrize("name", PAGES)
+def test_page_facts_match_the_tag_collector(name):
+    html = PAGES[name]
+    assert _facts(html) == _legacy_facts(html)
+
+
+@pytest.mark.parametrize("name", PAGES)
+def test_facts_do_not_depend_on_chunking(name):
+    html = PAGES[name]
+    assert _facts(html, chunk=7) == _facts(html)
+
+
+@pytest.mark.parametrize("name", PAGES)
+def test_metrics_and_issues_match_the_legacy_extraction(name):
+    html = PAGES[name]
+    new = _audit({"body": html.encode(), "content_type": "text/html; charset=utf-8"})
+    old = _audit({"facts": _legacy_facts(html)})
+    assert new == old
+
+
+# ---- where the title regex was wrong, PageAnalyzer deliberately differs ----
+
+def test_title_with_attributes_is_found():
+    html = '<html><head><title lang="en" id="t">Welcome to Acme</title></head></html>'
+    assert _legacy_facts(html)["title"] == ""
+    assert _facts(html)["title"] == "Welcome to Acme"
+
+
+def test_title_inside_a_script_is_ignored():
+    html = ('<html><head><script>var tpl = "<title>Injected</title>";</script>'
+            '<title>Real title</title></head></html>')
+    assert _legacy_facts(html)["title"] == "Injected"
+    assert _facts(html)["title"] == "Real title"
+
+
+def test_title_entities_are_decoded():
+    html = "<title>Tom &amp; Jerry &#8211; Tickets</title>"
+    assert _legacy_facts(html)["title"] == "Tom &amp; Jerry &#8211; Tickets"
+    assert _facts(html)["title"] == "Tom & Jerry – Tickets"
+    metrics, _ = _audit({"body": html.encode(), "content_type": "text/html"})
+    assert metrics["title_length"] == len("Tom & Jerry – Tickets")
+
+
+def test_only_the_first_title_counts():
+    html = "<title>First</title><svg><title>Icon</title></svg>"
+    assert _facts(html)["title"] == _legacy_facts(html)["title"] == "First"
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from app.audit import checks, engine
+from benchmarks.server import LocalSite
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    engine._robots_cache.clear()
+    yield
+    engine._robots_cache.clear()
+
+
+def _site(robots):
+    return LocalSite(robots=robots, sitemap=False)
+
+
+def _ttl_left(origin):
+    return engine._robots_cache._data[origin][0] - time.monotonic()
+
+
+RULES = "User-agent: *\nDisallow: /private/\n\nUser-agent: fftech-crawler\nDisallow: /\n"
+
+
+def test_served_rules_decide_per_path():
+    with _site(RULES) as site:
+        assert engine._robots_allowed(f"{site.base}/page/kb=1") == (True, 200)
+        assert engine._robots_allowed(f"{site.base}/private/x") == (False, 200)
+        assert engine._robots_rules(site.base).can_fetch("fftech-crawler", f"{site.base}/page") is False
+        assert site.hits["/robots.txt"] == 1  # one fetch per origin while cached
+    assert _ttl_left(site.base) > engine.ROBOTS_CACHE_TTL_S - 5
+
+
+def test_missing_robots_allows_everything():
+    with _site(False) as site:
+        assert engine._robots_allowed(f"{site.base}/page") == (True, 404)
+        assert engine._robots_rules(site.base).can_fetch("*", f"{site.base}/page") is True
+    assert _ttl_left(site.base) > engine.ROBOTS_CACHE_TTL_S - 5
+
+
+@pytest.mark.parametrize("status", [401, 403])
+def test_forbidden_robots_is_no_restriction_for_search_but_stops_our_crawler(status):
+    with _site(status) as site:
+        assert engine._robots_allowed(f"{site.base}/page") == (True, status)
+        assert engine._robots_rules(site.base).can_fetch("*", f"{site.base}/page") is False
+
+
+def test_server_error_is_cached_briefly(monkeypatch):
+    monkeypatch.setattr(engine, "ROBOTS_FAIL_TTL_S", 0.2)
+    with _site(503) as site:
+        assert engine._robots_allowed(f"{site.base}/page") == (True, 503)
+        assert engine._robots_rules(site.base).disallow_all is True
+        assert 0 < _ttl_left(site.base) <= 0.2
+        assert site.hits["/robots.txt"] == 1
+        time.sleep(0.25)
+        site.robots = True  # the server recovered
+        assert engine._robots_allowed(f"{site.base}/page") == (True, 200)
+        assert engine._robots_rules(site.base).disallow_all is False
+        assert site.hits["/robots.txt"] == 2
+
+
+def test_unreachable_host_is_allowed_and_cached_briefly():
+    assert engine._robots_allowed("http://127.0.0.1:1/page") == (True, 0)
+    assert _ttl_left("http://127.0.0.1:1") <= engine.ROBOTS_FAIL_TTL_S
+
+
+# ---- scoring ----
+
+def _seo(status, allowed=True):
+    metrics = {"robots_allowed": allowed, "robots_status": status}
+    rules = [c for c in checks.CHECKS if c.name in ("robots_allowed", "robots_readable")]
+    return checks.score(metrics, None, rules)
+
+
+def test_only_served_disallow_rules_cost_the_crawl_penalty():
+    assert _seo(200) == ({**_seo(200)[0], "SEO": 100}, [])
+    assert _seo(200, allowed=False)[1] == ["robots.txt disallows crawling this URL (User-agent: *)."]
+    assert _seo(403)[1] == [] and _seo(404)[1] == []
+
+
+def test_server_error_is_its_own_issue():
+    cats, issues = _seo(503)
+    assert cats["SEO"] == 92
+    assert issues == ["robots.txt returned HTTP 503; crawlers may pause indexing."]
+
+
+def test_audit_reports_robots_status_end_to_end():
+    with LocalSite(robots=500, sitemap=True) as site:
+        result = engine.run_basic_checks(site.page(kb=5), collect_assets=False, profile="seo")
+    assert result["metrics"]["robots_allowed"] is True and result["metrics"]["robots_status"] == 500
+    assert "robots.txt returned HTTP 500; crawlers may pause indexing." in result["top_issues"]
+    assert not any("disallows crawling" in i for i in result["top_issues"])
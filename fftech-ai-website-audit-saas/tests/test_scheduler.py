@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+
+from app import scheduler
+from app.models import Subscription
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def _subscribe(db, user, daily_time="09:00", tz="UTC", next_run_at=None):
+    sub = Subscription(
+        user_id=user.id, plan="pro", active=True, email_schedule_enabled=True,
+        daily_time=daily_time, timezone=tz, next_run_at=next_run_at,
+    )
+    db.add(sub); db.commit(); db.refresh(sub)
+    return sub
+
+
+# ---- next-run computation ----
+
+def test_next_run_is_later_today_or_tomorrow():
+    assert scheduler.next_run_after("09:00", "UTC", _utc(2026, 3, 1, 8, 0)) == _utc(2026, 3, 1, 9, 0)
+    assert scheduler.next_run_after("09:00", "UTC", _utc(2026, 3, 1, 9, 0)) == _utc(2026, 3, 2, 9, 0)
+
+
+def test_next_run_follows_the_local_timezone_across_dst():
+    # New York: 09:00 is 14:00 UTC in winter (EST) and 13:00 UTC after 8 March 2026 (EDT)
+    assert scheduler.next_run_after("09:00", "America/New_York", _utc(2026, 3, 7, 15, 0)) == _utc(2026, 3, 8, 13, 0)
+    assert scheduler.next_run_after("09:00", "America/New_York", _utc(2026, 3, 6, 15, 0)) == _utc(2026, 3, 7, 14, 0)
+
+
+def test_bad_schedule_settings_fall_back():
+    assert scheduler.next_run_after("nonsense", "Not/AZone", _utc(2026, 3, 1, 0, 0)) == _utc(2026, 3, 1, 9, 0)
+
+
+def test_reschedule_clears_disabled_subscriptions(db, user):
+    sub = _subscribe(db, user)
+    sub.email_schedule_enabled = False
+    scheduler.reschedule(sub, _utc(2026, 3, 1))
+    assert sub.next_run_at is None
+
+
+# ---- leader lease ----
+
+def test_only_one_holder_until_release_or_expiry():
+    assert scheduler.acquire_lease("a") is True
+    assert scheduler.acquire_lease("a") is True  # renewal
+    assert scheduler.acquire_lease("b") is False
+    scheduler.release_lease("a")
+    assert scheduler.acquire_lease("b") is True
+    assert scheduler.acquire_lease("a", ttl_s=60) is False
+
+
+def test_expired_lease_can_be_taken_over():
+    assert scheduler.acquire_lease("a", ttl_s=-1) is True
+    assert scheduler.acquire_lease("b") is True
+    assert scheduler.acquire_lease("a") is False
+
+
+# ---- passes ----
+
+def test_run_due_sends_once_and_advances(db, user):
+    now = _utc(2026, 3, 1, 9, 0, 30)
+    _subscribe(db, user, next_run_at=_utc(2026, 3, 1, 9, 0))
+    sent = []
+    assert scheduler.run_due(lambda _db, row: sent.append(row.user_id), now) == 1
+    assert sent == [user.id]
+    assert scheduler.run_due(lambda _db, row: sent.append(row.user_id), now) == 0
+    db.expire_all()
+    assert db.query(Subscription).one().next_run_at.replace(tzinfo=timezone.utc) == _utc(2026, 3, 2, 9, 0)
+
+
+def test_advance_race_has_a_single_winner(db, user):
+    due = _utc(2026, 3, 1, 9, 0)
+    sub = _subscribe(db, user, next_run_at=due)
+    now = due + timedelta(seconds=5)
+    assert scheduler._advance(db, sub, due, now) is True
+    assert scheduler._advance(db, sub, due, now) is False
+
+
+def test_missed_runs_are_caught_up_within_the_window(db, user, monkeypatch):
+    monkeypatch.setattr(scheduler, "SCHEDULER_CATCHUP_S", 3600)
+    _subscribe(db, user, next_run_at=_utc(2026, 3, 1, 9, 0))
+    sent = []
+    assert scheduler.run_due(lambda _db, row: sent.append(row.id), _utc(2026, 3, 1, 9, 30)) == 1
+
+
+def test_runs_missed_beyond_the_window_are_skipped(db, user, monkeypatch):
+    monkeypatch.setattr(scheduler, "SCHEDULER_CATCHUP_S", 3600)
+    _subscribe(db, user, next_run_at=_utc(2026, 3, 1, 9, 0))
+    sent = []
+    assert scheduler.run_due(lambda _db, row: sent.append(row.id), _utc(2026, 3, 1, 12, 0)) == 0
+    db.expire_all()
+    assert db.query(Subscription).one().next_run_at.replace(tzinfo=timezone.utc) == _utc(2026, 3, 2, 9, 0)
+
+
+def test_subscriptions_without_next_run_are_scheduled(db, user):
+    _subscribe(db, user, daily_time="09:00")
+    sent = []
+    assert scheduler.run_due(lambda _db, row: sent.append(row.id), _utc(2026, 3, 1, 9, 0, 20)) == 1
+
+
+def test_a_failing_send_does_not_stop_the_pass(db, user):
+    from app.models import User
+    other = User(email="second@example.com", password_hash="x", verified=True)
+    db.add(other); db.commit()
+    due = _utc(2026, 3, 1, 9, 0)
+    _subscribe(db, user, next_run_at=due)
+    _subscribe(db, other, next_run_at=due)
+
+    def send(_db, row):
+        if row.user_id == user.id:
+            raise RuntimeError("smtp down")
+
+    assert scheduler.run_due(send, due + timedelta(seconds=10)) == 1
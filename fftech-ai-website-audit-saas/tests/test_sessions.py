@@ -0,0 +1,71 @@
+import pytest
+
+from app import sessions
+from app.auth import create_token
+from app.models import User
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    sessions._users.clear()
+    yield
+    sessions._users.clear()
+
+
+def _token(user):
+    return create_token({"uid": user.id, "email": user.email})
+
+
+def test_miss_then_hit_without_a_query(user, monkeypatch):
+    token = _token(user)
+    assert sessions.cached_user(token) == (False, None)
+    assert sessions.load_user(token).id == user.id
+
+    monkeypatch.setattr(sessions, "SessionLocal", lambda: pytest.fail("cache hit must not query"))
+    hit, cached = sessions.cached_user(token)
+    assert hit and cached.id == user.id
+
+
+def test_invalid_or_missing_tokens_are_anonymous_hits():
+    assert sessions.cached_user(None) == (True, None)
+    assert sessions.cached_user("not-a-jwt") == (True, None)
+    assert sessions.load_user("not-a-jwt") is None
+
+
+def test_unverified_users_are_cached_as_anonymous(db):
+    u = User(email="new@example.com", password_hash="x", verified=False)
+    db.add(u); db.commit(); db.refresh(u)
+    token = _token(u)
+    assert sessions.load_user(token) is None
+    assert sessions.cached_user(token) == (True, None)
+
+
+def test_invalidate_user_drops_every_cached_session(db, user):
+    first, second = _token(user), create_token({"uid": user.id, "email": user.email, "admin": True})
+    sessions.load_user(first)
+    sessions.load_user(second)
+    sessions.invalidate_user(user.id)
+    assert sessions.cached_user(first)[0] is False
+    assert sessions.cached_user(second)[0] is False
+
+
+def test_verification_is_seen_after_invalidation(db):
+    u = User(email="pending@example.com", password_hash="x", verified=False)
+    db.add(u); db.commit(); db.refresh(u)
+    token = _token(u)
+    assert sessions.load_user(token) is None
+
+    u.verified = True
+    db.commit()
+    assert sessions.cached_user(token) == (True, None)  # stale until invalidated
+    sessions.invalidate_user(u.id)
+    assert sessions.cached_user(token)[0] is False
+    assert sessions.load_user(token).id == u.id
+
+
+def test_forget_drops_only_that_session(user):
+    token = _token(user)
+    sessions.load_user(token)
+    sessions.forget(token)
+    assert sessions.cached_user(token) == (False, None)
+    sessions.forget("not-a-jwt")  # no-op